@@ -0,0 +1,59 @@
+"""Compare the row-wise and vectorized bulk payout paths.
+
+Run from the repository root:
+
+    python benchmarks/bench_bulk_payout.py --rows 400000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incentive_sim.payout_engine import simulate_payout, simulate_payouts  # noqa: E402
+
+KPIS = ["Revenue", "Pipeline", "CSAT", "Collections", "NewLogos"]
+
+
+def make_workforce(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {
+        "Employee": [f"E{i:07d}" for i in range(n_rows)],
+        "Target Payout": rng.integers(50, 200, n_rows) * 1000,
+    }
+    n_kpis = rng.integers(1, len(KPIS) + 1, n_rows)
+    data["KPIs"] = [KPIS[:k] for k in n_kpis]
+    for j, kpi in enumerate(KPIS):
+        data[f"{kpi}_Achievement"] = rng.normal(100, 15, n_rows).round(1)
+        data[f"{kpi}_Weight"] = np.where(j < n_kpis, 1 / n_kpis, np.nan)
+    return pd.DataFrame(data)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = make_workforce(args.rows)
+    old, old_s = timed(lambda d: d.apply(simulate_payout, axis=1), df)
+    new, new_s = timed(simulate_payouts, df)
+
+    np.testing.assert_allclose(new.to_numpy(), old.to_numpy(dtype=float), rtol=1e-12)
+    print(f"rows:        {args.rows:,}")
+    print(f"df.apply:    {old_s:8.3f} s")
+    print(f"vectorized:  {new_s:8.3f} s")
+    print(f"speedup:     {old_s / new_s:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Measure process-pool speedup of bulk payouts against the single-process path.
+
+Run from the repository root:
+
+    python benchmarks/bench_parallel.py --rows 2000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_bulk_payout import make_workforce, timed  # noqa: E402
+from incentive_sim.parallel import DEFAULT_SHARD_ROWS, parallel_simulate_payouts  # noqa: E402
+from incentive_sim.payout_engine import simulate_payouts  # noqa: E402
+from incentive_sim.slab_plan import DEFAULT_PLAN  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--shard-rows", type=int, default=DEFAULT_SHARD_ROWS)
+    args = parser.parse_args()
+
+    df = make_workforce(args.rows)
+    serial, serial_s = timed(simulate_payouts, df)
+    print(f"rows:        {args.rows:,}  (cpus: {os.cpu_count()})")
+    print(f"serial:      {serial_s:8.3f} s")
+
+    totals = set()
+    for workers in args.workers:
+        (payouts, total), seconds = timed(
+            lambda d: parallel_simulate_payouts(d, DEFAULT_PLAN, workers=workers, shard_rows=args.shard_rows), df
+        )
+        np.testing.assert_allclose(payouts.iloc[:, 0].to_numpy(), serial.to_numpy(), rtol=1e-12)
+        totals.add(total.iloc[0])
+        print(f"workers={workers:<3}  {seconds:8.3f} s  speedup {serial_s / seconds:5.2f}x")
+    # Shard boundaries do not depend on the worker count, so neither does the total.
+    assert len(totals) == 1, totals
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Run the benchmark suite without asv and check it against a saved baseline.
+
+    python benchmarks/run_suite.py --max-rows 100000 --save baseline.json
+    python benchmarks/run_suite.py --max-rows 100000 --baseline baseline.json --threshold 1.25
+
+Each `time_*` method reports its best wall time over --repeat runs, and each
+`peakmem_*` method its peak traced allocation (tracemalloc). With --baseline,
+the exit status is 1 if any benchmark is slower, or allocates more, than
+threshold x its baseline value.
+"""
+import argparse
+import fnmatch
+import inspect
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+
+def load_suite(max_rows):
+    os.environ["INCENTIVE_SIM_BENCH_MAX_ROWS"] = str(max_rows)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import suite
+
+    return suite
+
+
+def benchmarks(suite, pattern):
+    for cls_name, cls in inspect.getmembers(suite, inspect.isclass):
+        if cls.__module__ != suite.__name__:
+            continue
+        methods = [name for name in dir(cls) if name.startswith(("time_", "peakmem_"))]
+        for param in getattr(cls, "params", [None]):
+            for method in methods:
+                name = f"{cls_name}.{method}" + (f"[{param}]" if param is not None else "")
+                if fnmatch.fnmatch(name, pattern):
+                    yield name, cls, method, param
+
+
+def measure(cls, method, param, repeat):
+    args = () if param is None else (param,)
+    bench = cls()
+    if hasattr(bench, "setup"):
+        bench.setup(*args)
+    fn = getattr(bench, method)
+    try:
+        if method.startswith("peakmem_"):
+            tracemalloc.start()
+            try:
+                fn(*args)
+                return {"peak_bytes": tracemalloc.get_traced_memory()[1]}
+            finally:
+                tracemalloc.stop()
+        fn(*args)  # warm-up
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(*args)
+            best = min(best, time.perf_counter() - start)
+        return {"seconds": best}
+    finally:
+        if hasattr(bench, "teardown"):
+            bench.teardown(*args)
+
+
+def regressions(results, baseline, threshold, min_seconds):
+    """(name, metric, baseline, current) for every result beyond threshold x baseline."""
+    found = []
+    for name, result in results.items():
+        for metric, value in result.items():
+            old = baseline.get(name, {}).get(metric)
+            if old is None:
+                continue
+            floor = min_seconds if metric == "seconds" else 0
+            if max(value, floor) > threshold * max(old, floor):
+                found.append((name, metric, old, value))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-rows", type=int, default=100_000, help="Largest workforce size to run (up to 10000000)")
+    parser.add_argument("--filter", default="*", help="Glob over benchmark names, e.g. 'BulkPayouts.*'")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier --save to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Allowed slowdown / memory growth factor (default: 1.25)")
+    parser.add_argument("--min-seconds", type=float, default=0.001, help="Timings below this are treated as equal (default: 0.001)")
+    args = parser.parse_args(argv)
+
+    suite = load_suite(args.max_rows)
+    results = {}
+    for name, cls, method, param in benchmarks(suite, args.filter):
+        try:
+            results[name] = measure(cls, method, param, args.repeat)
+        except NotImplementedError:
+            continue
+        value = results[name]
+        shown = f"{value['seconds'] * 1000:10.2f} ms" if "seconds" in value else f"{value['peak_bytes'] / 2**20:10.1f} MB"
+        print(f"{name:<55} {shown}", flush=True)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline, args.threshold, args.min_seconds)
+        for name, metric, old, new in found:
+            print(f"REGRESSION {name} {metric}: {old:.6g} -> {new:.6g} ({new / old if old else float('inf'):.2f}x)", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
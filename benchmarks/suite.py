@@ -0,0 +1,163 @@
+"""Benchmark suite for the simulator hot paths, in airspeed velocity (asv) layout.
+
+`time_*` methods are timed and `peakmem_*` methods report peak memory.
+Run it with asv (`asv run`, `asv continuous --factor 1.25 main HEAD`) or
+with the stdlib runner next to this file:
+
+    python benchmarks/run_suite.py --save baseline.json
+    python benchmarks/run_suite.py --baseline baseline.json --threshold 1.25
+
+Workforce sizes go from 1k to 10M employees; sizes above
+INCENTIVE_SIM_BENCH_MAX_ROWS (default 1,000,000) are skipped.
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incentive_sim.accrual import simulate_accrual  # noqa: E402
+from incentive_sim.cb_grid import PayoutGrid, build_grid  # noqa: E402
+from incentive_sim.formula import PayoutFormula  # noqa: E402
+from incentive_sim.kpi_table import kpi_component_payouts  # noqa: E402
+from incentive_sim.payout_engine import get_multiplier, get_multipliers, simulate_payout, simulate_payouts  # noqa: E402
+from incentive_sim.region_payouts import compute_region_payouts  # noqa: E402
+from incentive_sim.synthetic import REGIONS, make_kpi_table, make_region_kpi_table, make_workforce  # noqa: E402
+
+SEED = 20240601
+MAX_ROWS = int(os.environ.get("INCENTIVE_SIM_BENCH_MAX_ROWS", 1_000_000))
+SIZES = [n for n in (1_000, 10_000, 100_000, 1_000_000, 10_000_000) if n <= MAX_ROWS]
+# Row-wise reference paths are only timed where they finish in seconds.
+SCALAR_SIZES = [n for n in SIZES if n <= 10_000]
+
+
+class Multipliers:
+    params = SIZES
+    param_names = ["employees"]
+
+    def setup(self, n):
+        self.achievement = np.random.default_rng(SEED).normal(100, 15, n)
+
+    def time_get_multipliers(self, n):
+        get_multipliers(self.achievement)
+
+
+class ScalarMultipliers:
+    params = SCALAR_SIZES
+    param_names = ["employees"]
+
+    def setup(self, n):
+        self.achievement = np.random.default_rng(SEED).normal(100, 15, n).tolist()
+
+    def time_get_multiplier(self, n):
+        [get_multiplier(a) for a in self.achievement]
+
+
+class BulkPayouts:
+    params = SIZES
+    param_names = ["employees"]
+    timeout = 600
+
+    def setup(self, n):
+        self.df = make_workforce(n, seed=SEED)
+
+    def time_simulate_payouts(self, n):
+        simulate_payouts(self.df)
+
+    def peakmem_simulate_payouts(self, n):
+        simulate_payouts(self.df)
+
+    def time_simulate_payouts_formula(self, n):
+        # A custom formula should cost the same as the hand-coded one.
+        simulate_payouts(self.df, formula=PayoutFormula("min(ach / target, 1.5) * weight * slab(ach)"))
+
+
+class RowwisePayouts:
+    params = SCALAR_SIZES
+    param_names = ["employees"]
+
+    def setup(self, n):
+        self.df = make_workforce(n, seed=SEED, kpi_lists=True)
+
+    def time_simulate_payout(self, n):
+        self.df.apply(simulate_payout, axis=1)
+
+
+class RegionPayouts:
+    params = SIZES
+    param_names = ["rows"]
+    timeout = 600
+
+    def setup(self, n):
+        self.kpi_df = make_region_kpi_table(n, seed=SEED)
+        self.targets = {region: 100_000 for region in REGIONS}
+
+    def time_compute_region_payouts(self, n):
+        compute_region_payouts(self.kpi_df, self.targets)
+
+    def peakmem_compute_region_payouts(self, n):
+        compute_region_payouts(self.kpi_df, self.targets)
+
+
+class CBGrid:
+    # Roles per region; 5 regions x 12 bands x 3 KPIs each.
+    params = [10, 100, 400]
+    param_names = ["roles"]
+
+    def setup(self, n_roles):
+        self.dims = (REGIONS, [f"Role {i}" for i in range(n_roles)], [f"B{i}" for i in range(12)])
+        self.weights = {"Revenue": 40, "Pipeline": 30, "CSAT": 30}
+        self.base, self.headcount = build_grid(*self.dims, self.weights)
+        self.grid = PayoutGrid(self.base, 100_000, headcount=self.headcount)
+        rng = np.random.default_rng(SEED)
+        rows = rng.choice(len(self.base), size=min(50, len(self.base)), replace=False)
+        # Alternating between two editor states patches the same 50 rows on every call.
+        self.states = [{"edited_rows": {int(i): {"Achieved %": float(a)} for i, a in zip(rows, rng.normal(100, 10, len(rows)))}}, {}]
+        self.calls = 0
+
+    def time_build_grid(self, n_roles):
+        build_grid(*self.dims, self.weights)
+
+    def time_payout_grid(self, n_roles):
+        PayoutGrid(self.base, 100_000, headcount=self.headcount)
+
+    def peakmem_payout_grid(self, n_roles):
+        PayoutGrid(self.base, 100_000, headcount=self.headcount)
+
+    def time_apply_delta(self, n_roles):
+        self.calls += 1
+        self.grid.apply_delta(self.states[self.calls % 2])
+
+    def time_drill_down(self, n_roles):
+        self.grid.cube.pivot("Role", "KPI", Region=REGIONS[0])
+
+
+class KpiTable:
+    params = [4, 100, 10_000]
+    param_names = ["kpis"]
+
+    def setup(self, n):
+        self.kpi_df = make_kpi_table(n, seed=SEED)
+
+    def time_kpi_component_payouts(self, n):
+        kpi_component_payouts(self.kpi_df, 50_000.0)
+
+
+class Accrual:
+    # 12 monthly periods x 3 KPIs per employee, quarterly true-ups.
+    params = [n for n in SIZES if n <= 1_000_000]
+    param_names = ["employees"]
+    timeout = 600
+
+    def setup(self, n):
+        rng = np.random.default_rng(SEED)
+        self.achievement = rng.normal(100, 15, (n, 3, 12))
+        self.weight = np.array([0.5, 0.3, 0.2])
+        self.target = rng.uniform(50_000, 200_000, n)
+
+    def time_simulate_accrual(self, n):
+        simulate_accrual(self.achievement, self.weight, self.target, kpis=["Revenue", "Pipeline", "CSAT"], annual_cap=2.0)
+
+    def peakmem_simulate_accrual(self, n):
+        simulate_accrual(self.achievement, self.weight, self.target, kpis=["Revenue", "Pipeline", "CSAT"], annual_cap=2.0)
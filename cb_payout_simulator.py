@@ -4,6 +4,19 @@ import pandas as pd
 import numpy as np
 import io
 
+from incentive_sim.budget_solver import cb_budget_model, show_budget_solver
+from incentive_sim.cb_grid import GROUP_KEYS, PayoutGrid, build_grid
+from incentive_sim.formula import GRID_FORMULA, GRID_VARIABLES, FormulaError, compile_formula
+from incentive_sim.headcount_projection import MAX_BINS, project_payouts, projection_summary
+from incentive_sim.instrument import StageTimer, enable_json_logging, profiling_default
+from incentive_sim.jobs import JOB_STORE, show_jobs
+from incentive_sim.monte_carlo import show_budget_risk
+from incentive_sim.result_view import get_view, show_result_view
+from incentive_sim.result_cache import RESULT_CACHE, memoize, state_cached
+from incentive_sim.scenario_store import shared_store, show_scenario_store
+from incentive_sim.slab_plan import DEFAULT_PLAN, load_plan
+from incentive_sim.writers import MIME_TYPES, cached_export, export_formats
+
 st.set_page_config(page_title="C&B Payout Simulation", layout="wide")
 st.title("💼 Corp C&B Incentive Budget Simulator with Headcount Scaling")
 
@@ -18,28 +31,36 @@ roles = st.sidebar.multiselect("Roles", ["Field Sales", "Inside Sales", "Sales M
 bands = st.sidebar.multiselect("Bands", ["B3", "B4", "B5"], default=["B4"])
 scenarios = st.sidebar.selectbox("Performance Scenario", ["Expected", "Optimistic", "Conservative"])
 target_incentive = st.sidebar.number_input("Target Incentive Amount (₹)", value=100000, step=10000)
+plan_file = st.sidebar.file_uploader("Multiplier Grid (YAML/CSV, optional)", type=["yaml", "yml", "csv"])
+plan = load_plan(plan_file) if plan_file else None
+formula_text = st.sidebar.text_input(
+    "Payout formula (optional)", placeholder=GRID_FORMULA,
+    help="Weighted score per KPI row as a share of the target incentive, e.g. min(ach / target, 1.5) * weight * slab(ach). "
+         f"Variables: {', '.join(GRID_VARIABLES)}; slab(x) is the plan's multiplier at achievement x%.",
+)
+try:
+    formula = compile_formula(formula_text, GRID_VARIABLES)
+except FormulaError as e:
+    st.sidebar.error(f"⚠️ {e}")
+    formula = None
+if formula is not None:
+    st.sidebar.caption("The formula drives the grid and its totals; goal-seek, projection and Monte Carlo keep the standard formula.")
+st.sidebar.caption(RESULT_CACHE.summary())
+profile = st.sidebar.checkbox("⏱️ Profile stages", value=profiling_default())
+trace_memory = profile and st.sidebar.checkbox("Trace peak memory (slower)", value=False)
+if profile:
+    enable_json_logging()
+timer = StageTimer(enabled=profile, trace_memory=trace_memory, context={"app": "cb_payout_simulator"})
+show_jobs()
 
-# Generate editable table
-rows = []
-for region in regions:
-    for role in roles:
-        for band in bands:
-            rows.extend([
-                {
-                    "Region": region,
-                    "Role": role,
-                    "Band": band,
-                    "KPI": kpi,
-                    "Target %": 100,
-                    "Achieved %": 100,
-                    "Weight %": weight,
-                    "Multiplier": 1.0,
-                    "Employees": 10 if kpi == "Revenue" else np.nan  # only one row per combo needs employee count
-                }
-                for kpi, weight in zip(["Revenue", "Pipeline", "CSAT"], [40, 30, 30])
-            ])
-
-df = pd.DataFrame(rows)
+
+# Generate editable table: one categorical row per Region x Role x Band x KPI,
+# with headcount kept per Region/Role/Band group
+with timer.stage("build_grid") as stage:
+    df, headcount = build_grid(regions, roles, bands, {"Revenue": 40, "Pipeline": 30, "CSAT": 30}, employees=10)
+    # Blank except on added rows, where it sets the headcount of a group the headcount table does not list
+    df["Employees"] = np.nan
+    stage["rows"] = len(df)
 
 # Apply scenario adjustments
 if scenarios == "Optimistic":
@@ -50,28 +71,136 @@ elif scenarios == "Conservative":
     df["Multiplier"] = 0.8
 
 st.subheader("📋 KPI Input Grid")
-edited = st.data_editor(df, use_container_width=True, num_rows="dynamic", key="editor")
-
-# Fill missing 'Employees' downward by group
-edited["Employees"] = edited.groupby(["Region", "Role", "Band"])["Employees"].transform("first").fillna(0)
+with timer.stage("render_editor", rows=len(df)):
+    st.data_editor(
+        df, use_container_width=True, num_rows="dynamic", key="editor",
+        column_config={"Employees": st.column_config.NumberColumn(
+            "Employees", min_value=0, help="Headcount of a new group on added rows; listed groups use the headcount table below",
+        )},
+    )
+st.subheader("👥 Headcount by Group")
+st.data_editor(headcount.reset_index(), use_container_width=True, disabled=GROUP_KEYS, key="headcount_editor")
 
-# Calculate payouts
-edited["Score"] = (edited["Achieved %"] / edited["Target %"]) * edited["Multiplier"]
-edited["Weighted Score"] = edited["Score"] * (edited["Weight %"] / 100)
-edited["Payout per Employee"] = edited["Weighted Score"] * target_incentive
-edited["Total Payout"] = edited["Payout per Employee"] * edited["Employees"]
+# Keep the computed grid across reruns and recompute only the rows edited since the last one
+grid_signature = (tuple(regions), tuple(roles), tuple(bands), scenarios, target_incentive, getattr(plan_file, "file_id", None), formula and formula.expression)
+try:
+    if st.session_state.get("grid_signature") != grid_signature:
+        with timer.stage("compute_grid", rows=len(df)):
+            st.session_state.payout_grid = PayoutGrid(df, target_incentive, plan, headcount=headcount, formula=formula)
+        st.session_state.grid_signature = grid_signature
+    payout_grid = st.session_state.payout_grid
+    with timer.stage("apply_edits") as stage:
+        stage["rows"] = len(payout_grid.apply_delta(st.session_state.get("editor")))
+        payout_grid.apply_headcount_delta(st.session_state.get("headcount_editor"))
+except FormulaError as e:
+    st.session_state.pop("grid_signature", None)
+    st.error(f"⚠️ {e}")
+    st.stop()
+edited = payout_grid.frame
+# Everything derived from the grid below is kept per version, so reruns that leave the grid
+# alone (widget changes, background job polling) reuse it instead of rebuilding and rehashing it
+grid_version = (grid_signature, payout_grid.version)
 
 # Show final results
 st.subheader("📊 Simulated Total Payouts by Group")
-st.dataframe(edited, use_container_width=True)
-total_budget = edited["Total Payout"].sum()
+with timer.stage("render_results", rows=len(edited)):
+    view = get_view(st.session_state, "results_view", edited, grid_version)
+    show_result_view(view, "results")
+total_budget = payout_grid.grand_total
 st.success(f"💰 Total Simulated Incentive Budget: ₹{total_budget:,.0f}")
 
+# Drill-down and pivot read precomputed subtotals from the roll-up cube
+st.subheader("🔎 Budget Drill-down")
+cube = payout_grid.cube
+filters = {}
+for col, dim in zip(st.columns(len(cube.dims)), cube.dims):
+    choice = col.selectbox(dim, ["All"] + cube.members(dim), key=f"drill_{dim}")
+    if choice != "All":
+        filters[dim] = choice
+st.metric("Selected Budget", f"₹{cube.total(**filters):,.0f}", help=f"{cube.rows(**filters)} grid rows")
+pivot_rows, pivot_cols = st.columns(2)
+index_dim = pivot_rows.selectbox("Pivot rows", cube.dims, index=0)
+column_dim = pivot_cols.selectbox("Pivot columns", [dim for dim in cube.dims if dim != index_dim], index=2)
+remaining = {dim: value for dim, value in filters.items() if dim not in (index_dim, column_dim)}
+st.dataframe(cube.pivot(index_dim, column_dim, **remaining).style.format("₹{:,.0f}"), use_container_width=True)
+
 # Download
-csv = edited.to_csv(index=False).encode("utf-8")
-st.download_button(
-    label="⬇️ Download Simulation as CSV",
-    data=csv,
-    file_name="cb_payout_simulation_scaled.csv",
-    mime="text/csv"
-)
+# Serialized only when a download is requested, so grid edits never pay for it
+fmt = st.selectbox("Download Format", export_formats(len(edited)))
+if st.button("📦 Prepare Download"):
+    with timer.stage(f"export_{fmt}", rows=len(edited)):
+        try:
+            data = cached_export(edited, fmt)
+        except (ValueError, ImportError) as e:
+            data = None
+            st.error(f"⚠️ Could not export {fmt.upper()}: {e}")
+    if data is not None:
+        st.download_button(
+            label=f"⬇️ Download Simulation as {fmt.upper()}",
+            data=data,
+            file_name=f"cb_payout_simulation_scaled.{fmt}",
+            mime=MIME_TYPES[fmt]
+        )
+
+# Saved scenarios: inputs and results stored once per content hash, diffed per group
+st.subheader("🗂️ Saved Scenarios")
+with st.expander("Save this run or compare saved runs"):
+    params = {"scenario": scenarios, "target_incentive": target_incentive, "plan": plan, "formula": formula}
+    opened = show_scenario_store(
+        shared_store(), "cb_payout_simulator", payout_grid.inputs, edited, params,
+        GROUP_KEYS, "Total Payout", "scenarios", version=grid_version,
+    )
+    if opened is not None:
+        st.dataframe(opened.results(), use_container_width=True)
+
+# Budget goal-seek
+st.subheader("🎯 Budget Goal-Seek")
+with st.expander("Solve the target incentive or slab multipliers for a budget"):
+    model = state_cached(st.session_state, "goal_seek_model", grid_version, lambda: cb_budget_model(edited, target_incentive, plan))
+    show_budget_solver(model, "goal_seek", total_budget)
+
+# Employee-level projection: price slabs per person instead of at the group average
+st.subheader("👥 Employee-Level Projection")
+with st.expander("Spread each group's achievement across its employees"):
+    spread = st.number_input("Std. deviation of individual Achieved % (points)", min_value=0.0, value=10.0, step=1.0, key="projection_sd")
+    bins = st.number_input("Max points per group and KPI", min_value=10, max_value=5000, value=MAX_BINS, step=10)
+    achievements_file = st.file_uploader("Actual achievements (CSV: Region, Role, Band, KPI, Achievement %), optional", type=["csv"])
+    projection_plan = plan
+    if plan is None and st.checkbox("Price employees on the standard 90/100/110 slabs instead of the Multiplier column", key="projection_slabs"):
+        projection_plan = DEFAULT_PLAN
+
+    def project():
+        achievements = pd.read_csv(achievements_file) if achievements_file else None
+        with timer.stage("project_headcount", rows=len(edited)):
+            return memoize(project_payouts)(edited, target_incentive, projection_plan, {"*": {"dist": "normal", "sd": spread}}, achievements, bins)
+
+    projection_version = (grid_version, spread, bins, getattr(achievements_file, "file_id", None), projection_plan is DEFAULT_PLAN)
+    projected = state_cached(st.session_state, "projection", projection_version, project)
+    scalar_total, projected_total = projected["Scalar Payout"].sum(), projected["Projected Payout"].sum()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("At Group Average", f"₹{scalar_total:,.0f}")
+    col2.metric("Employee-Level", f"₹{projected_total:,.0f}")
+    col3.metric("Convexity Gap", f"₹{projected_total - scalar_total:,.0f}")
+    if projection_plan is None:
+        st.caption("Each employee keeps the row's Multiplier, so 'At Group Average' is the grid budget; upload a multiplier grid to see slab convexity.")
+    else:
+        st.caption(f"Slabs from {projection_plan.name}; the grid budget above is ₹{total_budget:,.0f}. Groups without actuals use a normal spread around their Achieved %.")
+    st.dataframe(projection_summary(projected), use_container_width=True)
+
+# Budget risk (Monte Carlo)
+
+st.subheader("🎲 Budget Risk Simulation")
+with st.expander("Simulate P50 / P90 / P99 budget exposure"):
+    # Runs in the background; the page polls for progress and can cancel, and the same
+    # grid and settings from any session reattach to the finished result.
+    show_budget_risk(edited, target_incentive, plan, key="mc", timer=timer, background=True, version=grid_version)
+
+# Stage timings (opt-in)
+if profile:
+    with st.sidebar.expander("⏱️ Stage timings", expanded=True):
+        st.dataframe(timer.frame(), hide_index=True, use_container_width=True)
+        st.caption(f"Total: {timer.total_seconds():.3f} s")
+        mc_job = JOB_STORE.get(st.session_state.get("mc_job"))
+        if mc_job is not None and mc_job.timer is not None and mc_job.timer.records:
+            st.caption(f"Background job stages ({mc_job.name})")
+            st.dataframe(mc_job.timer.frame(), hide_index=True, use_container_width=True)
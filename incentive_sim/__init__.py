@@ -0,0 +1,8 @@
+"""Incentive payout calculation core shared by the Streamlit simulators and the CLI.
+
+Nothing in this package imports Streamlit. Import the submodules directly
+(e.g. `incentive_sim.payout_engine`); the package itself stays empty so the
+CLI starts without loading pandas.
+"""
+
+__version__ = "0.1.0"
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+from .slab_plan import DEFAULT_PLAN
+
+ACCRUAL_COLUMNS = ["Employee", "Period", "KPI", "Achievement %", "Weight", "Target Payout"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+class AccrualSchedule:
+    """Per-employee, per-period YTD entitlement, booked accrual and accrual deltas.
+
+    Arrays are (employees x periods) except `ytd_achievement`, which keeps
+    the KPI axis: (employees x KPIs x periods).
+    """
+
+    def __init__(self, periods, ytd_achievement, entitlement, booked, accrual, true_up, employees=None):
+        self.periods = list(periods)
+        self.ytd_achievement = ytd_achievement
+        self.entitlement = entitlement
+        self.booked = booked
+        self.accrual = accrual
+        self.true_up = true_up
+        self.employees = employees
+
+    def period_totals(self):
+        """Accrual, cumulative booking and YTD entitlement summed over employees, per period."""
+        return pd.DataFrame({
+            "Accrual": self.accrual.sum(axis=0),
+            "Booked YTD": self.booked.sum(axis=0),
+            "Entitlement YTD": self.entitlement.sum(axis=0),
+            "True-up": self.true_up,
+        }, index=pd.Index(self.periods, name="Period"))
+
+    def employee_accruals(self):
+        """Accrual deltas as an (employees x periods) frame."""
+        return pd.DataFrame(self.accrual, index=self.employees, columns=pd.Index(self.periods, name="Period"))
+
+
+def true_up_periods(n_periods, true_up_every=3, periods_per_year=None):
+    """Boolean mask of true-up periods: every `true_up_every`-th period, and always the year's last.
+
+    With `periods_per_year` above `n_periods` the periods are the start of a
+    year, so the last of them is only a true-up if the cadence says so.
+    """
+    year = n_periods if periods_per_year is None else int(periods_per_year)
+    flags = (np.arange(year) + 1) % max(int(true_up_every), 1) == 0
+    flags[-1] = True
+    return flags[:n_periods]
+
+
+def _year_shares(n_periods, period_share=None, periods_per_year=None):
+    # Share of the annual target in each period of the year, which must have at least `n_periods`.
+    if period_share is None:
+        period_share = np.ones(n_periods if periods_per_year is None else int(periods_per_year))
+    share = np.asarray(period_share, dtype=float)
+    if periods_per_year is not None and len(share) != periods_per_year:
+        raise ValueError(f"period_share has {len(share)} entries for a {periods_per_year}-period year")
+    if len(share) < n_periods:
+        raise ValueError(f"{n_periods} periods of achievement for a {len(share)}-period year")
+    return share / share.sum()
+
+
+def simulate_accrual(achievement, weight, target, kpis=None, plan=DEFAULT_PLAN, period_share=None,
+                     true_up_every=3, annual_cap=None, periods=None, employees=None, periods_per_year=None):
+    """Time-phased payout accrual over an (employees x KPIs x periods) achievement array.
+
+    `achievement` is % of each period's target, `weight` the KPI weights
+    (employees x KPIs, or one row for everyone) and `target` the annual
+    target payout per employee. The periods are the first ones of a plan
+    year of `periods_per_year` periods (by default exactly the given ones);
+    `period_share` splits the annual target across all periods of that year
+    (equal by default), so a year-to-date array is not taken for a full year.
+
+    YTD achievement is the target-weighted cumulative average of the period
+    achievements. The YTD entitlement applies `plan`'s slabs to it, pro-rated
+    by the share of the year elapsed and capped at `annual_cap` x target.
+    Between true-ups each period books a provisional accrual at multiplier
+    1.0; every true-up period (and the year's last) books the entitlement.
+    Deltas can be negative where a true-up reverses over-accrual.
+    """
+    achievement = np.asarray(achievement, dtype=float)
+    n, k, t = achievement.shape
+    weight = np.broadcast_to(np.asarray(weight, dtype=float), (n, k))
+    target = np.broadcast_to(np.asarray(target, dtype=float), (n,))
+    kpis = list(kpis) if kpis is not None else [str(j) for j in range(k)]
+    year_share = _year_shares(t, period_share, periods_per_year)
+    share = year_share[:t]
+    cum_share = np.cumsum(share)
+
+    # Period achievement weighted by period target share; cumulated in place along the period axis.
+    ytd = achievement * share
+    provisional = np.einsum("nkt,nk->nt", ytd, weight) / 100
+    np.cumsum(ytd, axis=2, out=ytd)
+    ytd /= cum_share
+
+    score = np.zeros((n, t))
+    for j, kpi in enumerate(kpis):
+        score += weight[:, j, None] * (ytd[:, j, :] / 100) * plan.multipliers(kpi, ytd[:, j, :])
+    entitlement = score * cum_share * target[:, None]
+    cap = None if annual_cap is None else annual_cap * target[:, None]
+    if cap is not None:
+        np.minimum(entitlement, cap, out=entitlement)
+
+    # Booked YTD = entitlement at the last true-up + provisional accruals since.
+    flags = true_up_periods(t, true_up_every, len(year_share))
+    last = np.maximum.accumulate(np.where(flags, np.arange(t), -1))
+    cum_provisional = np.cumsum(provisional * target[:, None], axis=1)
+    zero = np.zeros((n, 1))
+    at_true_up = np.concatenate([zero, entitlement], axis=1)[:, last + 1]
+    provisional_before = np.concatenate([zero, cum_provisional], axis=1)[:, last + 1]
+    booked = at_true_up + cum_provisional - provisional_before
+    if cap is not None:
+        np.minimum(booked, cap, out=booked)
+    accrual = np.diff(booked, axis=1, prepend=0.0)
+    return AccrualSchedule(
+        periods if periods is not None else range(1, t + 1), ytd, entitlement, booked, accrual, flags, employees,
+    )
+
+
+def default_period_order(periods):
+    """Distinct period labels in calendar order when they are month names (Jan, February, ...), else sorted.
+
+    Sorting suits labels such as "2024-01" or "Q1"; a fiscal year that wraps
+    around December still needs its order given explicitly.
+    """
+    labels = list(pd.unique(pd.Series(periods)))
+    months = [str(label)[:3].title() for label in labels]
+    if all(month in MONTHS for month in months):
+        return [label for _, label in sorted(zip((MONTHS.index(m) for m in months), labels))]
+    try:
+        return sorted(labels)
+    except TypeError:
+        return sorted(labels, key=str)
+
+
+def accrual_arrays(df, periods=None):
+    """Dense accrual inputs from a long table with the ACCRUAL_COLUMNS.
+
+    Returns a dict of `simulate_accrual` keyword arguments. Periods keep
+    their order of appearance unless `periods` gives it; (employee, KPI,
+    period) cells missing from the table count as 0% achievement.
+    """
+    emp_codes, employees = pd.factorize(df["Employee"])
+    kpi_codes, kpis = pd.factorize(df["KPI"])
+    if periods is None:
+        period_codes, periods = pd.factorize(df["Period"])
+    else:
+        period_codes = pd.Index(periods).get_indexer(df["Period"])
+        if (period_codes < 0).any():
+            raise ValueError(f"Period '{df['Period'][period_codes < 0].iloc[0]}' is not in the period order")
+    n, k, t = len(employees), len(kpis), len(periods)
+    achievement = np.zeros((n, k, t))
+    achievement[emp_codes, kpi_codes, period_codes] = df["Achievement %"].fillna(0).to_numpy(dtype=float)
+    weight = np.zeros((n, k))
+    weight[emp_codes, kpi_codes] = df["Weight"].fillna(0).to_numpy(dtype=float)
+    target = np.zeros(n)
+    target[emp_codes] = df["Target Payout"].to_numpy(dtype=float)
+    return {
+        "achievement": achievement,
+        "weight": weight,
+        "target": target,
+        "kpis": list(kpis),
+        "periods": list(periods),
+        "employees": pd.Index(employees, name="Employee"),
+    }
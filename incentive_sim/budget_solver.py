@@ -0,0 +1,313 @@
+import time
+
+import numpy as np
+
+from .slab_plan import DEFAULT_KPI
+from .sweep import bonus_penalty_payout
+
+
+class BudgetSolution:
+    """Parameter values found by `solve_budget` and the total payout they produce."""
+
+    def __init__(self, parameters, total, target, method, evaluations, seconds, converged):
+        self.parameters = parameters
+        self.total = total
+        self.target = target
+        self.method = method
+        self.evaluations = evaluations
+        self.seconds = seconds
+        self.converged = converged
+
+    @property
+    def gap(self):
+        """Total payout minus the target budget."""
+        return self.total - self.target
+
+    def to_dict(self):
+        return {
+            **self.parameters,
+            "total_payout": self.total,
+            "target_budget": self.target,
+            "gap": self.gap,
+            "method": self.method,
+            "evaluations": self.evaluations,
+            "seconds": round(self.seconds, 6),
+            "converged": self.converged,
+        }
+
+
+class BonusPenaltyModel:
+    """Total payout of the bonus-and-penalty scheme (streamlit_incentive_simulator (2).py).
+
+    `avg_score` is one score for `employees` people, or an array of
+    per-employee scores. Duplicate scores are collapsed to (score, count)
+    pairs once, so each evaluation costs one call on the distinct scores.
+    """
+
+    # +1: total rises with the parameter, -1: total falls.
+    monotone = {
+        "base_incentive": 1,
+        "bonus_amount": 1,
+        "underperformance_penalty": -1,
+        "threshold_bonus_score": -1,
+        "penalty_threshold": -1,
+    }
+
+    def __init__(self, avg_score, base_incentive, threshold_bonus_score, bonus_amount,
+                 underperformance_penalty, penalty_threshold, employees=1):
+        scores = np.atleast_1d(np.asarray(avg_score, dtype=float))
+        self.scores, counts = np.unique(scores[np.isfinite(scores)], return_counts=True)
+        self.counts = counts * employees
+        self.parameters = {
+            "base_incentive": float(base_incentive),
+            "threshold_bonus_score": float(threshold_bonus_score),
+            "bonus_amount": float(bonus_amount),
+            "underperformance_penalty": float(underperformance_penalty),
+            "penalty_threshold": float(penalty_threshold),
+        }
+
+    def bounds(self, name):
+        if name in ("threshold_bonus_score", "penalty_threshold"):
+            return (0.0, 200.0)
+        return (0.0, max(10 * self.parameters[name], 100_000.0))
+
+    def total(self, **values):
+        p = {**self.parameters, **values}
+        payout = bonus_penalty_payout(
+            self.scores, p["base_incentive"], p["threshold_bonus_score"], p["bonus_amount"],
+            p["underperformance_penalty"], p["penalty_threshold"],
+        )
+        return float(payout @ self.counts)
+
+
+class _SlabTerms:
+    """Payout of one slab grid's share of the elements, with replaceable multipliers.
+
+    Without a floor or cap the payout is linear in the slab multipliers and
+    accelerators, so it reduces to per-slab sums computed once and each
+    evaluation costs a dot product over the slabs.
+    """
+
+    def __init__(self, grid, achievement, value):
+        self.grid = grid
+        idx = np.searchsorted(grid.thresholds, achievement, side="right")
+        offset = achievement - grid.starts[idx]
+        if grid.floor is None and grid.cap is None:
+            slots = len(grid.base)
+            self.base_sum = np.bincount(idx, weights=value, minlength=slots)
+            self.slope_sum = np.bincount(idx, weights=value * offset, minlength=slots)
+        else:
+            self.idx, self.offset, self.value = idx, offset, value
+            self.base_sum = None
+
+    def total(self, base, slope, scale, scale_before_clip=False):
+        """Payout at multipliers `base` + `slope` x offset, times `scale`.
+
+        The floor and cap bound the slab multiplier and `scale` multiplies the
+        clamped value, unless `scale_before_clip`, where the scaled multiplier
+        is clamped (a scale of the plan's multipliers rather than a payout scale).
+        """
+        if self.base_sum is not None:
+            return scale * float(base @ self.base_sum + slope @ self.slope_sum)
+        mult = base[self.idx] + slope[self.idx] * self.offset
+        if scale_before_clip:
+            return float(np.clip(scale * mult, self.grid.floor, self.grid.cap) @ self.value)
+        return scale * float(np.clip(mult, self.grid.floor, self.grid.cap) @ self.value)
+
+
+class SlabBudgetModel:
+    """Total payout as a function of a slab plan's multipliers and a linear scale.
+
+    The payout is Σ value × multiplier(KPI, achievement) × scale over a long
+    table of (KPI, achievement %, value) elements, where `value` is what the
+    element pays at multiplier 1 and scale 1. Slab parameters are named
+    "<KPI> slab <from>" ("default slab <from>" for the plan's default grid)
+    and start at the plan's multipliers. Without a plan, the fixed
+    `multiplier` array is used and only the scale can be solved for.
+
+    The scale multiplies the payout after slab floors and caps apply; with
+    `scale_before_clip` it scales the multipliers themselves, so a capped
+    slab stays at its cap however large the scale.
+    """
+
+    def __init__(self, kpi_labels, achievement, value, plan=None, multiplier=None, scale_name="multiplier_scale", scale=1.0,
+                 scale_before_clip=False):
+        kpi_labels = np.asarray(kpi_labels, dtype=object)
+        achievement = np.asarray(achievement, dtype=float)
+        value = np.asarray(value, dtype=float)
+        keep = np.isfinite(achievement) & np.isfinite(value)
+        self.scale_name = scale_name
+        self.scale_before_clip = scale_before_clip
+        self.parameters = {scale_name: float(scale)}
+        self.monotone = {scale_name: 1}
+        self._terms = []
+        if plan is None:
+            mult = np.asarray(multiplier, dtype=float)
+            keep &= np.isfinite(mult)
+            self._fixed = float(value[keep] @ mult[keep])
+            return
+        self._fixed = 0.0
+        grid_keys = np.array([kpi if kpi in plan.grids else DEFAULT_KPI for kpi in kpi_labels], dtype=object)
+        for key, grid in plan.grids.items():
+            rows = keep & (grid_keys == key)
+            if not rows.any():
+                continue
+            label = "default" if key == DEFAULT_KPI else key
+            names = [f"{label} slab {float(slab['from']):g}" for slab in grid.slabs]
+            for name, slab in zip(names, grid.slabs):
+                self.parameters[name] = float(slab["multiplier"])
+                self.monotone[name] = 1
+            self._terms.append((_SlabTerms(grid, achievement[rows], value[rows]), names))
+        missing = keep & ~np.isin(grid_keys, list(plan.grids))
+        if missing.any():
+            raise KeyError(f"Plan '{plan.name}' has no slab grid for KPI '{kpi_labels[missing][0]}'")
+
+    def bounds(self, name):
+        return (0.0, max(10 * self.parameters[name], 5.0))
+
+    def total(self, **values):
+        p = {**self.parameters, **values}
+        scale = p[self.scale_name]
+        total = scale * self._fixed
+        for terms, names in self._terms:
+            # Slot 0 is the zero slab below the first threshold.
+            base = np.concatenate([[0.0], [p[name] for name in names]])
+            total += terms.total(base, terms.grid.slope, scale, self.scale_before_clip)
+        return total
+
+
+def bulk_budget_model(df, plan):
+    """`SlabBudgetModel` for a bulk employee table under a slab plan (incentive_simulator.py).
+
+    `multiplier_scale` scales every multiplier of the plan at once, before
+    slab floors and caps apply.
+    """
+    from .plan_compare import WorkforceInputs
+
+    inputs = WorkforceInputs(df)
+    value = inputs.target[:, None] * inputs.ratio * inputs.weight
+    rows, cols = np.nonzero(inputs.used)
+    labels = np.asarray(inputs.kpis, dtype=object)[cols]
+    return SlabBudgetModel(labels, inputs.achievement[rows, cols], value[rows, cols], plan=plan, scale_before_clip=True)
+
+
+def cb_budget_model(rows, target_incentive, plan=None):
+    """`SlabBudgetModel` for a computed C&B grid (`PayoutGrid.frame`); the scale is `target_incentive`."""
+    ratio = (rows["Achieved %"] / rows["Target %"]).to_numpy(dtype=float)
+    value = ratio * rows["Weight %"].to_numpy(dtype=float) / 100 * rows["Employees"].to_numpy(dtype=float)
+    return SlabBudgetModel(
+        rows["KPI"].to_numpy(dtype=object), ratio * 100, value, plan=plan,
+        multiplier=rows["Multiplier"].to_numpy(dtype=float),
+        scale_name="target_incentive", scale=target_incentive,
+    )
+
+
+def _bisect(model, name, target, lo, hi, rtol, max_iter):
+    """Bisection on a monotone parameter; stops within `rtol` of the target.
+
+    Thresholds make the total a step function; then the bracket shrinks onto
+    the step and the end that stays within budget is returned.
+    """
+    direction = model.monotone[name]
+    f_lo, f_hi = model.total(**{name: lo}) - target, model.total(**{name: hi}) - target
+    evaluations = 2
+    if direction * f_lo > 0 or direction * f_hi < 0:
+        raise ValueError(
+            f"Budget {target:,.0f} is not reachable by {name} in [{lo:g}, {hi:g}] "
+            f"(totals {f_lo + target:,.0f} to {f_hi + target:,.0f})"
+        )
+    # Keep `under` on the side of the bracket whose total is at or below the target.
+    under, over = (lo, hi) if direction > 0 else (hi, lo)
+    f_under = f_lo if direction > 0 else f_hi
+    converged = abs(f_under) <= rtol * abs(target)
+    while not converged and evaluations < max_iter:
+        mid = (under + over) / 2
+        if mid in (under, over):
+            break
+        f_mid = model.total(**{name: mid}) - target
+        evaluations += 1
+        if f_mid <= 0:
+            under, f_under = mid, f_mid
+        else:
+            over = mid
+        converged = abs(f_under) <= rtol * abs(target)
+    return {name: under}, evaluations, converged
+
+
+def _optimize(model, names, target, bounds, rtol, max_iter):
+    """Smallest relative change to `names` that meets the budget (SLSQP), via SciPy."""
+    from scipy.optimize import minimize
+
+    x0 = np.array([model.parameters[name] for name in names])
+    scale = np.where(x0 != 0, np.abs(x0), [hi - lo for lo, hi in bounds])
+    counter = {"evaluations": 0}
+
+    def total(x):
+        counter["evaluations"] += 1
+        return model.total(**dict(zip(names, x)))
+
+    result = minimize(
+        lambda x: float(np.sum(((x - x0) / scale) ** 2)),
+        np.clip(x0, [lo for lo, _ in bounds], [hi for _, hi in bounds]),
+        jac=lambda x: 2 * (x - x0) / scale ** 2,
+        method="SLSQP",
+        bounds=bounds,
+        constraints=[{"type": "eq", "fun": lambda x: (total(x) - target) / target}],
+        options={"maxiter": max_iter, "ftol": rtol ** 2},
+    )
+    found = dict(zip(names, (float(v) for v in result.x)))
+    converged = abs(model.total(**found) - target) <= max(rtol, 1e-6) * abs(target)
+    return found, counter["evaluations"] + 1, converged
+
+
+def solve_budget(model, target, solve_for, bounds=None, rtol=1e-9, max_iter=200):
+    """Find values of the `solve_for` parameters that make `model.total()` equal `target`.
+
+    A single parameter the total is monotone in is solved by bisection over
+    `bounds` (default `model.bounds(name)`). Several parameters are solved
+    with SciPy's SLSQP as the smallest relative change from the current
+    values that meets the budget; the other parameters keep their values.
+    """
+    names = [solve_for] if isinstance(solve_for, str) else list(solve_for)
+    unknown = [name for name in names if name not in model.parameters]
+    if unknown:
+        raise KeyError(f"Unknown parameter(s) {unknown}, expected some of {list(model.parameters)}")
+    bounds = [tuple(map(float, (bounds or {}).get(name) or model.bounds(name))) for name in names]
+    started = time.perf_counter()
+    if len(names) == 1 and names[0] in model.monotone:
+        found, evaluations, converged = _bisect(model, names[0], target, *bounds[0], rtol, max_iter)
+        method = "bisection"
+    else:
+        found, evaluations, converged = _optimize(model, names, target, bounds, rtol, max_iter)
+        method = "slsqp"
+    parameters = {**model.parameters, **found}
+    return BudgetSolution(
+        parameters, model.total(**found), float(target), method, evaluations,
+        time.perf_counter() - started, converged,
+    )
+
+
+def show_budget_solver(model, key, current_total, currency="₹"):
+    """Render a goal-seek panel in Streamlit: target budget in, parameter values out."""
+    import streamlit as st
+
+    target = st.number_input(f"Target Budget ({currency})", min_value=0.0, value=float(round(current_total)), step=100_000.0, key=f"{key}_target")
+    names = st.multiselect(
+        "Solve for", list(model.parameters), default=list(model.parameters)[:1], key=f"{key}_params",
+        help="One parameter is solved exactly by bisection; several by the smallest relative change that meets the budget (needs SciPy).",
+    )
+    if not names or not st.button("🎯 Solve", key=f"{key}_solve"):
+        return None
+    try:
+        solution = solve_budget(model, target, names)
+    except (ValueError, ImportError) as e:
+        st.error(str(e))
+        return None
+    changed = {name: (model.parameters[name], solution.parameters[name]) for name in names}
+    st.table({"Parameter": list(changed), "Current": [v[0] for v in changed.values()], "Solved": [v[1] for v in changed.values()]})
+    message = st.success if solution.converged else st.warning
+    message(
+        f"Total payout {currency}{solution.total:,.0f} vs target {currency}{target:,.0f} "
+        f"({solution.method}, {solution.evaluations} evaluations, {solution.seconds * 1000:.0f} ms)"
+    )
+    return solution
@@ -0,0 +1,225 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from .payout_engine import KPI_DELIMITER
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Columns kept alongside the payout inputs when reads are projected.
+ID_COLUMNS = ("Employee",)
+INPUT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".feather": "feather", ".arrow": "feather"}
+
+ACHIEVEMENT_SUFFIX = "_Achievement"
+WEIGHT_SUFFIX = "_Weight"
+
+# Accepts the legacy list literal "['Revenue', 'Pipeline']" as well as the
+# compact "Revenue|Pipeline" (or comma / semicolon separated) encodings.
+_KPI_SPLIT = re.compile(r"[|,;]")
+_KPI_STRIP = " \t'\"[]()"
+
+
+def kpis_from_headers(columns):
+    """KPI names that have both an `_Achievement` and a `_Weight` column."""
+    columns = list(columns)
+    return [
+        col[: -len(ACHIEVEMENT_SUFFIX)]
+        for col in columns
+        if col.endswith(ACHIEVEMENT_SUFFIX)
+        and col[: -len(ACHIEVEMENT_SUFFIX)] + WEIGHT_SUFFIX in columns
+    ]
+
+
+def parse_kpi_list(text):
+    """Split one encoded KPI list into names without evaluating it."""
+    names = (name.strip(_KPI_STRIP) for name in _KPI_SPLIT.split(str(text)))
+    return [name for name in names if name]
+
+
+def encode_kpi_column(values, known_kpis):
+    """Intern a column of encoded KPI lists as a categorical of "A|B" strings.
+
+    Only the distinct raw strings are parsed, so the cost is independent of
+    the number of rows.
+    """
+    codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+    canonical = []
+    for raw in uniques:
+        names = parse_kpi_list(raw)
+        unknown = [name for name in names if name not in known_kpis]
+        if unknown:
+            raise ValueError(
+                f"KPIs {unknown} have no matching {ACHIEVEMENT_SUFFIX}/{WEIGHT_SUFFIX} columns"
+            )
+        canonical.append(KPI_DELIMITER.join(names))
+    # Different spellings of the same list collapse onto one category.
+    canonical_codes, categories = pd.factorize(pd.Index(canonical, dtype=object))
+    codes = np.where(codes >= 0, canonical_codes[codes], -1) if len(canonical) else codes
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def kpi_column_from_values(df, kpis):
+    """Per-row KPI list derived from which `_Achievement` cells are filled."""
+    present = df[[kpi + ACHIEVEMENT_SUFFIX for kpi in kpis]].notna().to_numpy()
+    bits = present @ (1 << np.arange(len(kpis), dtype=np.int64))
+    uniques, codes = np.unique(bits, return_inverse=True)
+    categories = [
+        KPI_DELIMITER.join(kpi for j, kpi in enumerate(kpis) if mask >> j & 1)
+        for mask in uniques
+    ]
+    return pd.Categorical.from_codes(codes.reshape(-1), categories=categories)
+
+
+def payout_input_columns(columns):
+    """`Target Payout` and the `<KPI>_Achievement` / `<KPI>_Weight` columns present in `columns`."""
+    kpis = kpis_from_headers(columns)
+    wanted = {"Target Payout"} | {kpi + suffix for kpi in kpis for suffix in (ACHIEVEMENT_SUFFIX, WEIGHT_SUFFIX)}
+    return [col for col in columns if col in wanted]
+
+
+def projected_columns(columns, keep=ID_COLUMNS):
+    """Columns to load for a payout run: the payout inputs, `KPIs` and any `keep` columns."""
+    wanted = set(payout_input_columns(columns)) | {"KPIs"} | set(keep)
+    return [col for col in columns if col in wanted]
+
+
+def smallest_lossless_dtype(values):
+    """int16/int32 for integral data, float32 when it round-trips exactly, else the current dtype."""
+    values = np.asarray(values)
+    if values.dtype.kind not in "if" or len(values) == 0:
+        return values.dtype
+    integral = values.dtype.kind == "i" or (not np.isnan(values).any() and np.array_equal(values, np.round(values)))
+    if integral:
+        low, high = values.min(), values.max()
+        for dtype in (np.int16, np.int32):
+            if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+                return np.dtype(dtype)
+    if values.dtype.kind == "f" and values.dtype.itemsize > 4:
+        if np.array_equal(values.astype(np.float32).astype(values.dtype), values, equal_nan=True):
+            return np.dtype(np.float32)
+    return values.dtype
+
+
+def downcast_payout_inputs(df):
+    """Store payout input columns in the smallest dtype that holds them without loss."""
+    dtypes = {col: smallest_lossless_dtype(df[col].to_numpy()) for col in payout_input_columns(df.columns)}
+    return df.astype({col: dtype for col, dtype in dtypes.items() if dtype != df[col].dtype})
+
+
+def prepare_bulk_frame(df):
+    """Intern the `KPIs` column of a raw bulk table as a categorical.
+
+    If the table has no `KPIs` column, each row uses the KPIs whose
+    achievement is filled in.
+    """
+    kpis = kpis_from_headers(df.columns)
+    if "KPIs" in df.columns:
+        values = df["KPIs"]
+        first = values.dropna().head(1)
+        if len(first) and isinstance(first.iloc[0], (list, tuple, np.ndarray)):
+            # List-typed columns (e.g. Parquet list<string>) use the compact encoding.
+            values = values.map(lambda kpis: KPI_DELIMITER.join(kpis) if kpis is not None else None)
+        df["KPIs"] = encode_kpi_column(values, set(kpis))
+    else:
+        df["KPIs"] = kpi_column_from_values(df, kpis)
+    return df
+
+
+def input_format(source):
+    """"csv", "parquet" or "feather" from the file name of a path or upload."""
+    name = str(getattr(source, "name", source)).lower()
+    for suffix, fmt in INPUT_FORMATS.items():
+        if name.endswith(suffix):
+            return fmt
+    raise ValueError(f"Unsupported input '{name}', expected one of {sorted(INPUT_FORMATS)}")
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def input_columns(source):
+    """Column names of a bulk file, read from its header or schema only."""
+    fmt = input_format(source)
+    _rewind(source)
+    if fmt == "csv":
+        names = list(pd.read_csv(source, nrows=0).columns)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        names = pq.read_schema(source).names
+    else:
+        import pyarrow as pa
+
+        names = pa.ipc.open_file(source).schema.names
+    _rewind(source)
+    return names
+
+
+def read_bulk_csv(source, engine=CSV_ENGINE):
+    """Load a bulk budgeting CSV ready for `simulate_payouts`."""
+    return prepare_bulk_frame(pd.read_csv(source, engine=engine))
+
+
+def read_bulk_table(source, project=True, keep=ID_COLUMNS, downcast=True):
+    """Load a bulk CSV, Parquet or Feather/Arrow IPC file ready for `simulate_payouts`.
+
+    With `project`, only the payout inputs, `KPIs` and the `keep` columns
+    are read from disk. With `downcast`, numeric inputs are stored in the
+    smallest dtype that holds them exactly.
+    """
+    fmt = input_format(source)
+    columns = projected_columns(input_columns(source), keep) if project else None
+    _rewind(source)
+    if fmt == "csv":
+        df = pd.read_csv(source, engine=CSV_ENGINE, usecols=columns)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        df = pq.read_table(source, columns=columns).to_pandas()
+    else:
+        import pyarrow.feather as feather
+
+        df = feather.read_table(source, columns=columns).to_pandas()
+    df = prepare_bulk_frame(df)
+    return downcast_payout_inputs(df) if downcast else df
+
+
+def iter_bulk_chunks(source, chunksize=DEFAULT_CHUNKSIZE, columns=None):
+    """Yield prepared frames of about `chunksize` rows from a CSV, Parquet or Feather file.
+
+    `source` is a path or a file object; uploads are told apart by their
+    `.name`. Payout inputs are cast to float so every chunk of a file shares
+    one schema.
+    """
+    fmt = input_format(source)
+    _rewind(source)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        frames = (batch.to_pandas() for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize, columns=columns))
+    elif fmt == "feather":
+        import pyarrow as pa
+
+        reader = pa.ipc.open_file(source)
+        batches = (reader.get_batch(i).select(columns or reader.schema.names) for i in range(reader.num_record_batches))
+        # Record batches are zero-copy sliced down to the chunk size.
+        frames = (
+            batch.slice(start, chunksize).to_pandas()
+            for batch in batches
+            for start in range(0, batch.num_rows, chunksize)
+        )
+    else:
+        # The pyarrow CSV engine cannot read in chunks, so this uses the C parser.
+        frames = pd.read_csv(source, chunksize=chunksize, usecols=columns)
+    for frame in frames:
+        frame = frame.astype({col: float for col in payout_input_columns(frame.columns)})
+        yield prepare_bulk_frame(frame)
@@ -0,0 +1,284 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+
+from .rollup import ROLLUP_DIMENSIONS, RollupCube
+from .slab_plan import DEFAULT_PLAN
+
+GROUP_KEYS = ["Region", "Role", "Band"]
+NUMERIC_COLUMNS = ["Target %", "Achieved %", "Weight %", "Multiplier", "Employees"]
+
+
+def group_key(values):
+    # NaN never equals itself, so blank dimension cells are keyed as None.
+    return tuple(None if pd.isna(v) else v for v in values)
+
+
+def build_grid(regions, roles, bands, kpi_weights, employees=10, target=100.0, achieved=100.0, multiplier=1.0):
+    """Region x Role x Band x KPI input grid and its per-group headcount.
+
+    Dimension columns are categorical and every row comes straight from
+    `pd.MultiIndex.from_product`, so no per-row Python dicts are built.
+    Headcount is returned as a separate Series indexed by Region/Role/Band
+    rather than padded onto the KPI rows.
+    """
+    kpis = list(kpi_weights)
+    index = pd.MultiIndex.from_product([regions, roles, bands, kpis], names=GROUP_KEYS + ["KPI"])
+    n = len(index)
+    grid = pd.DataFrame({
+        name: pd.Categorical.from_codes(codes, categories=level)
+        for name, codes, level in zip(index.names, index.codes, index.levels)
+    })
+    grid["Target %"] = np.full(n, target, dtype=float)
+    grid["Achieved %"] = np.full(n, achieved, dtype=float)
+    grid["Weight %"] = np.tile(np.asarray([kpi_weights[kpi] for kpi in kpis], dtype=float), n // max(len(kpis), 1))
+    grid["Multiplier"] = np.full(n, multiplier, dtype=float)
+    groups = pd.MultiIndex.from_product([regions, roles, bands], names=GROUP_KEYS)
+    headcount = pd.Series(np.full(len(groups), employees, dtype=float), index=groups, name="Employees")
+    return grid, headcount
+
+
+def formula_values(rows, target_incentive):
+    """`GRID_VARIABLES` of a block of grid rows, as arrays for a `PayoutFormula`."""
+    return {
+        "ach": rows["Achieved %"].to_numpy(dtype=float),
+        "target": rows["Target %"].to_numpy(dtype=float),
+        "weight": rows["Weight %"].to_numpy(dtype=float) / 100,
+        "mult": rows["Multiplier"].to_numpy(dtype=float),
+        "target_incentive": float(target_incentive),
+    }
+
+
+def compute_payouts(rows, target_incentive, plan=None, formula=None):
+    """Fill the derived payout columns for a block of grid rows.
+
+    `rows["Employees"]` must already hold the group headcount on every row.
+    A `PayoutFormula` over `GRID_VARIABLES` replaces the `Weighted Score`
+    (payout as a share of the target incentive); its `slab(x)` reads the
+    row's KPI grid in `plan`, or the standard slabs.
+    """
+    if plan is not None:
+        rows["Multiplier"] = plan.multipliers_for(rows["KPI"], rows["Achieved %"] / rows["Target %"] * 100)
+    rows["Score"] = (rows["Achieved %"] / rows["Target %"]) * rows["Multiplier"]
+    if formula is None:
+        rows["Weighted Score"] = rows["Score"] * (rows["Weight %"] / 100)
+    else:
+        slab_plan = plan or DEFAULT_PLAN
+        rows["Weighted Score"] = formula.evaluate(
+            formula_values(rows, target_incentive),
+            slab=lambda ach: slab_plan.multipliers_for(rows["KPI"], np.broadcast_to(ach, (len(rows),))),
+            shape=(len(rows),),
+        )
+    rows["Payout per Employee"] = rows["Weighted Score"] * target_incentive
+    rows["Total Payout"] = rows["Payout per Employee"] * rows["Employees"]
+    return rows
+
+
+class PayoutGrid:
+    """C&B payout grid that patches results from `st.data_editor` deltas.
+
+    The editor state (`edited_rows` / `added_rows` / `deleted_rows`) is
+    cumulative, so each call to `apply_delta` diffs it against the state
+    applied last time and recomputes only the rows that changed, plus the
+    other rows of any group whose headcount moved. Group totals, the grand
+    total and the Region/Role/Band/KPI roll-up `cube` are patched rather than
+    re-summed.
+
+    Headcount comes from the per-group `headcount` Series when one is given
+    (see `build_grid`); otherwise, and for groups the Series does not list
+    (e.g. added rows of a new group), from the first non-blank `Employees`
+    cell of each group's rows.
+    """
+
+    def __init__(self, base, target_incentive, plan=None, headcount=None, formula=None):
+        self.base = base.reset_index(drop=True).astype({col: float for col in NUMERIC_COLUMNS if col in base})
+        self.target_incentive = target_incentive
+        self.plan = plan
+        self.formula = formula
+        self.headcount = headcount
+        self._headcount = {} if headcount is None else {group_key(key): value for key, value in headcount.items()}
+        self._headcount_edited = {}
+        self._headcount_input = dict(enumerate(self.base["Employees"])) if "Employees" in self.base else {}
+        self._edited = {}
+        self._added = []
+        self._deleted = set()
+        # Bumped whenever `rows` change, so views over the frame know to refresh.
+        self.version = 0
+
+        rows = self.base.copy()
+        if headcount is None:
+            rows["Employees"] = rows.groupby(GROUP_KEYS, dropna=False, observed=True)["Employees"].transform("first").fillna(0)
+        else:
+            groups = pd.MultiIndex.from_frame(rows[GROUP_KEYS].astype(object))
+            rows["Employees"] = headcount.reindex(groups).fillna(0).to_numpy(dtype=float)
+        self.rows = compute_payouts(rows, target_incentive, plan, formula)
+
+        leaves = self._leaves(self.rows)
+        self._members = {}
+        for label, leaf in zip(self.rows.index, leaves):
+            self._members.setdefault(leaf[:len(GROUP_KEYS)], []).append(label)
+        sums = self.rows.groupby(GROUP_KEYS, dropna=False, sort=False, observed=True).agg(
+            ppe=("Payout per Employee", "sum"), employees=("Employees", "first")
+        )
+        keys = [group_key(key) for key in sums.index]
+        self._group_ppe = dict(zip(keys, sums["ppe"]))
+        self._group_employees = dict(zip(keys, sums["employees"]))
+        self._group_total = {key: self._group_ppe[key] * self._group_employees[key] for key in self._group_ppe}
+        self.grand_total = float(sum(self._group_total.values()))
+
+        self.cube = RollupCube.from_frame(self.rows.fillna({"Total Payout": 0.0}), ROLLUP_DIMENSIONS)
+        self._cube_cells = {
+            label: (leaf, 0.0 if pd.isna(total) else float(total))
+            for label, leaf, total in zip(self.rows.index, leaves, self.rows["Total Payout"])
+        }
+
+    @staticmethod
+    def _keys(rows):
+        return [group_key(values) for values in zip(*(rows[key] for key in GROUP_KEYS))]
+
+    @staticmethod
+    def _leaves(rows):
+        # GROUP_KEYS is a prefix of ROLLUP_DIMENSIONS, so a leaf prefix is the group key.
+        return [group_key(values) for values in zip(*(rows[dim] for dim in ROLLUP_DIMENSIONS))]
+
+    def _cube_set(self, label, leaf=None, total=0.0):
+        """Replace a row's contribution to the cube; `leaf=None` just removes it."""
+        old = self._cube_cells.pop(label, None)
+        if old is not None:
+            self.cube.add(old[0], -old[1], rows=-1)
+        if leaf is not None:
+            total = 0.0 if pd.isna(total) else float(total)
+            self.cube.add(leaf, total)
+            self._cube_cells[label] = (leaf, total)
+
+    @property
+    def frame(self):
+        return self.rows
+
+    @property
+    def inputs(self):
+        """Current input columns, with `Employees` holding the headcount in effect for each row's group."""
+        columns = [col for col in self.base.columns if col != "Employees"] + ["Employees"]
+        return self.rows[columns]
+
+    @property
+    def group_totals(self):
+        index = pd.MultiIndex.from_tuples(list(self._group_total), names=GROUP_KEYS)
+        return pd.Series(list(self._group_total.values()), index=index, name="Total Payout")
+
+    # --- Delta handling ---
+    def apply_headcount_delta(self, state):
+        """Bring group headcounts in line with a `st.data_editor` over `headcount.reset_index()`."""
+        edited = {int(i): dict(values) for i, values in ((state or {}).get("edited_rows") or {}).items()}
+        changed = sorted(i for i in set(edited) | set(self._headcount_edited) if edited.get(i) != self._headcount_edited.get(i))
+        self._headcount_edited = edited
+        self.version += bool(changed)
+        for i in changed:
+            key = group_key(self.headcount.index[i])
+            self._headcount[key] = edited.get(i, {}).get("Employees", self.headcount.iloc[i])
+            if key in self._members:
+                self._refresh_group(key)
+        return changed
+
+    def apply_delta(self, state):
+        """Bring the grid in line with a `st.data_editor` widget state."""
+        state = state or {}
+        edited = {int(i): dict(values) for i, values in (state.get("edited_rows") or {}).items()}
+        added = list(state.get("added_rows") or [])
+        deleted = {int(i) for i in state.get("deleted_rows") or []}
+
+        changed = {i for i in set(edited) | set(self._edited) if edited.get(i) != self._edited.get(i)}
+        changed |= deleted ^ self._deleted
+        n = len(self.base)
+        for j in range(max(len(added), len(self._added))):
+            old = self._added[j] if j < len(self._added) else None
+            new = added[j] if j < len(added) else None
+            if old != new:
+                changed.add(n + j)
+
+        self._edited, self._added, self._deleted = edited, added, deleted
+        if changed:
+            self.version += 1
+            self._patch(sorted(changed))
+        return sorted(changed)
+
+    def _raw_row(self, label):
+        """Current user input for a row label, or None if the row no longer exists."""
+        n = len(self.base)
+        if label < n:
+            if label in self._deleted:
+                return None
+            row = self.base.iloc[label].to_dict()
+            row.update(self._edited.get(label, {}))
+            return row
+        j = label - n
+        if j >= len(self._added) or (label in self._deleted):
+            return None
+        row = dict.fromkeys(self.base.columns, np.nan)
+        row.update(self._added[j])
+        return row
+
+    def _patch(self, labels):
+        dirty = set()
+        for label in labels:
+            if label in self.rows.index:
+                key = group_key(self.rows.loc[label, GROUP_KEYS])
+                self._members[key].remove(label)
+                self._headcount_input.pop(label, None)
+                self._cube_set(label)
+                dirty.add(key)
+
+        new_rows = {label: row for label in labels if (row := self._raw_row(label)) is not None}
+        stale = [label for label in labels if label not in new_rows and label in self.rows.index]
+        if stale:
+            self.rows = self.rows.drop(index=stale)
+
+        if new_rows:
+            block = pd.DataFrame.from_dict(new_rows, orient="index")[list(self.base.columns)]
+            block = block.astype({col: float for col in NUMERIC_COLUMNS if col in block})
+            for label, key in zip(block.index, self._keys(block)):
+                bisect.insort(self._members.setdefault(key, []), label)
+                # Read from the raw row: grids built without an `Employees` column still take one on added rows.
+                employees = new_rows[label].get("Employees", np.nan)
+                self._headcount_input[label] = np.nan if employees is None else float(employees)
+                dirty.add(key)
+            for col in self.rows.columns[self.rows.dtypes == "category"]:
+                new = block[col].dropna().unique()
+                new = new[~pd.Index(new).isin(self.rows[col].cat.categories)]
+                if len(new):
+                    self.rows[col] = self.rows[col].cat.add_categories(new)
+            block["Employees"] = 0.0
+            block = compute_payouts(block, self.target_incentive, self.plan, self.formula)
+            for label in block.index:
+                self.rows.loc[label, block.columns] = block.loc[label]
+            if not self.rows.index.is_monotonic_increasing:
+                self.rows = self.rows.sort_index()
+
+        for key in dirty:
+            self._refresh_group(key)
+
+    def _refresh_group(self, key):
+        """Recompute headcount and totals for one group from its member rows."""
+        members = self._members.get(key, [])
+        old_total = self._group_total.pop(key, 0.0)
+        if not members:
+            self._members.pop(key, None)
+            self._group_ppe.pop(key, None)
+            self._group_employees.pop(key, None)
+            self.grand_total -= old_total
+            return
+        if key in self._headcount:
+            headcount = self._headcount[key]
+            headcount = 0.0 if pd.isna(headcount) else float(headcount)
+        else:
+            headcount = next((h for h in (self._headcount_input.get(m) for m in members) if pd.notna(h)), 0.0)
+        self.rows.loc[members, "Employees"] = headcount
+        self.rows.loc[members, "Total Payout"] = self.rows.loc[members, "Payout per Employee"] * headcount
+        block = self.rows.loc[members]
+        for label, leaf, total in zip(members, self._leaves(block), block["Total Payout"]):
+            self._cube_set(label, leaf, total)
+        self._group_ppe[key] = self.rows.loc[members, "Payout per Employee"].sum()
+        self._group_employees[key] = headcount
+        self._group_total[key] = self._group_ppe[key] * headcount
+        self.grand_total += self._group_total[key] - old_total
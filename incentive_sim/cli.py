@@ -0,0 +1,164 @@
+"""Headless batch runner for the incentive simulators.
+
+    incentive-sim run plan.yaml --input employees.parquet
+    incentive-sim run plans/*.yaml --input employees.csv --output-dir results/
+    incentive-sim compare plan_set.yaml --input employees.parquet
+
+The input is read once in chunks and every plan is evaluated on each chunk,
+so results stream to disk without holding the whole table in memory. A JSON
+summary line per plan is printed to stdout. `compare` loads the whole table,
+evaluates plans of any shape (see plan_compare) side by side and prints one
+JSON line of cost and distribution statistics per plan.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# pandas and NumPy are imported inside the commands so `--help` and argument
+# errors return immediately.
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="incentive-sim", description="Run incentive payout simulations without Streamlit.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Simulate payouts for a bulk employee file under one or more slab plans")
+    run.add_argument("plans", nargs="+", help="Slab plan files (.yaml, .yml or .csv)")
+    run.add_argument("--input", "-i", required=True, help="Employee file (.csv, .parquet, .feather or .arrow)")
+    run.add_argument("--output", "-o", help="Output file (.csv, .parquet, .feather or .arrow); only valid with a single plan")
+    run.add_argument("--output-dir", default=".", help="Directory for <plan>_payouts.<format> when --output is not given")
+    run.add_argument("--format", choices=["csv", "parquet", "feather"], default="csv", help="Output format used with --output-dir")
+    run.add_argument("--project", action="store_true", help="Read only Employee, Target Payout, KPIs and <KPI>_* columns")
+    run.add_argument("--chunksize", type=int, default=100_000, help="Rows per chunk (default: 100000)")
+    run.add_argument("--profile", action="store_true", help="Log per-chunk read/simulate/write timings as JSON lines on stderr")
+    run.add_argument("--profile-memory", action="store_true", help="With --profile, also trace peak allocations per stage (slower)")
+    run.add_argument("--workers", type=int, default=1, help="Worker processes; each chunk is sharded across them (default: 1)")
+    run.add_argument("--formula", help="Per-KPI payout term as an expression over ach, target, weight and slab(ach) (default: 'ach / 100 * weight * slab(ach)')")
+    run.set_defaults(func=run_plans)
+
+    compare = subparsers.add_parser("compare", help="Compare the cost and payout distribution of several plans of any shape")
+    compare.add_argument("plans", nargs="+", help="Plan set files (.yaml with a 'plans:' list) or slab plan files")
+    compare.add_argument("--input", "-i", required=True, help="Employee file (.csv, .parquet, .feather or .arrow)")
+    compare.add_argument("--baseline", help="Plan name the deltas are taken against (default: the first plan)")
+    compare.add_argument("--output", "-o", help="Also write per-employee payouts, one column per plan")
+    compare.set_defaults(func=compare_plan_files)
+    return parser
+
+
+def output_paths(args):
+    if args.output:
+        if len(args.plans) > 1:
+            raise SystemExit("incentive-sim: --output takes a single plan; use --output-dir for several")
+        return [args.output]
+    paths = [
+        os.path.join(args.output_dir, f"{os.path.splitext(os.path.basename(plan))[0]}_payouts.{args.format}")
+        for plan in args.plans
+    ]
+    if len(set(paths)) < len(paths):
+        raise SystemExit("incentive-sim: plan files with the same name would overwrite each other's output")
+    os.makedirs(args.output_dir, exist_ok=True)
+    return paths
+
+
+def run_plans(args):
+    from .bulk_loader import input_columns, iter_bulk_chunks, projected_columns
+    from .formula import FormulaError, compile_formula
+    from .instrument import StageTimer, enable_json_logging
+    from .payout_engine import simulate_payouts
+    from .slab_plan import load_plan
+    from .writers import ResultWriter
+
+    if args.workers < 1:
+        raise SystemExit("incentive-sim: --workers must be at least 1")
+    if args.profile:
+        enable_json_logging()
+    timer = StageTimer(enabled=args.profile, trace_memory=args.profile_memory, context={"command": "run", "input": args.input})
+    started = time.perf_counter()
+    try:
+        formula = compile_formula(args.formula)
+    except FormulaError as e:
+        raise SystemExit(f"incentive-sim: {e}")
+    plans = [load_plan(path) for path in args.plans]
+    writers = [ResultWriter(path) for path in output_paths(args)]
+    totals = [0.0] * len(plans)
+    pool = None
+    try:
+        if args.workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            from .parallel import parallel_simulate_payouts
+
+            pool = ProcessPoolExecutor(max_workers=args.workers)
+            shard_rows = -(-args.chunksize // args.workers)
+        columns = projected_columns(input_columns(args.input)) if args.project else None
+        chunks = iter_bulk_chunks(args.input, args.chunksize, columns)
+        while True:
+            with timer.stage("read") as stage:
+                chunk = next(chunks, None)
+                stage["rows"] = 0 if chunk is None else len(chunk)
+            if chunk is None:
+                break
+            with timer.stage("simulate", rows=len(chunk) * len(plans)):
+                if pool is not None:
+                    payouts, _ = parallel_simulate_payouts(chunk, plans, shard_rows=shard_rows, executor=pool, formula=formula)
+                    payouts = [payouts.iloc[:, i] for i in range(len(plans))]
+                else:
+                    payouts = [simulate_payouts(chunk, plan, formula) for plan in plans]
+            with timer.stage("write", rows=len(chunk) * len(plans)):
+                for i, writer in enumerate(writers):
+                    result = chunk.assign(**{"Simulated Payout": payouts[i]})
+                    totals[i] += float(result["Simulated Payout"].sum())
+                    writer.write(result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        for writer in writers:
+            writer.close()
+
+    elapsed = time.perf_counter() - started
+    for path, plan, writer, total in zip(args.plans, plans, writers, totals):
+        print(json.dumps({
+            "plan": path,
+            "plan_name": plan.name,
+            "output": writer.path,
+            "rows": writer.rows,
+            "total_payout": total,
+            "seconds": round(elapsed, 3),
+        }))
+    return 0
+
+
+def compare_plan_files(args):
+    from .bulk_loader import read_bulk_table
+    from .plan_compare import compare_plans, load_plan_set
+    from .writers import ResultWriter
+
+    started = time.perf_counter()
+    plans = [plan for path in args.plans for plan in load_plan_set(path)]
+    df = read_bulk_table(args.input)
+    comparison = compare_plans(df, plans, baseline=args.baseline)
+    if args.output:
+        writer = ResultWriter(args.output)
+        try:
+            writer.write(df[df.columns.intersection(["Employee"])].join(comparison.payouts))
+        finally:
+            writer.close()
+    elapsed = time.perf_counter() - started
+    for name, row in comparison.summary().iterrows():
+        print(json.dumps({"plan_name": name, "rows": len(df), **{k: float(v) for k, v in row.items()}, "seconds": round(elapsed, 3)}))
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"incentive-sim: error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
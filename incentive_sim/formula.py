@@ -0,0 +1,221 @@
+import ast
+import functools
+
+import numpy as np
+
+# Functions a formula may call, each applied elementwise over whole columns. Each
+# takes only its inputs, so no argument can reach a ufunc's `out=`.
+FUNCTIONS = {
+    "min": lambda *args: functools.reduce(np.minimum, args),
+    "max": lambda *args: functools.reduce(np.maximum, args),
+    "abs": lambda x: np.abs(x),
+    "clip": lambda x, lo, hi: np.clip(x, lo, hi),
+    "where": lambda cond, a, b: np.where(cond, a, b),
+    "floor": lambda x: np.floor(x),
+    "ceil": lambda x: np.ceil(x),
+    "round": lambda x, decimals=0: np.round(x, decimals),
+    "sqrt": lambda x: np.sqrt(x),
+    "log": lambda x: np.log(x),
+    "exp": lambda x: np.exp(x),
+}
+# (fewest, most) arguments of each function; None means any number.
+ARITY = {
+    "min": (2, None), "max": (2, None), "abs": (1, 1), "clip": (3, 3), "where": (3, 3), "floor": (1, 1),
+    "ceil": (1, 1), "round": (1, 2), "sqrt": (1, 1), "log": (1, 1), "exp": (1, 1),
+}
+# Largest `round` decimals; anything beyond is below float precision for payouts.
+MAX_DECIMALS = 10
+# `slab(x)`: the plan's slab multiplier for achievement % x, supplied by the caller.
+SLAB = "slab"
+# Variables of a bulk table, one value per (employee, KPI).
+BULK_VARIABLES = {
+    "ach": "KPI achievement % of target",
+    "target": "100, the target achievement %",
+    "weight": "KPI weight as a fraction",
+}
+# Variables of a C&B grid, one value per grid row.
+GRID_VARIABLES = {
+    "ach": "Achieved %",
+    "target": "Target %",
+    "weight": "Weight % as a fraction",
+    "mult": "Multiplier",
+    "target_incentive": "target incentive per employee",
+}
+# The hand-coded formulas, written as expressions.
+BULK_FORMULA = "ach / 100 * weight * slab(ach)"
+GRID_FORMULA = "ach / target * mult * weight"
+
+_BINARY = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY = (ast.UAdd, ast.USub, ast.Not)
+_COMPARE = (ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq)
+
+
+class FormulaError(ValueError):
+    """A payout formula that does not parse or uses something outside the allowed set."""
+
+
+class _Vectorize(ast.NodeTransformer):
+    """Rewrite the scalar-looking parts of a formula into elementwise NumPy calls.
+
+    `a if c else b` becomes `where(c, a, b)`, `and`/`or`/`not` become logical
+    ufuncs and chained comparisons `a < b < c` become `(a < b) & (b < c)`.
+    Integer constants become floats, so `9 ** 9 ** 9` overflows instead of
+    running as an unbounded integer power; only `round`'s decimals stay integers.
+    """
+
+    def visit_Constant(self, node):
+        return ast.copy_location(ast.Constant(value=float(node.value)), node)
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id == "round" and len(node.args) == 2:
+            node.args[0] = self.visit(node.args[0])
+            return node
+        return self.generic_visit(node)
+
+    @staticmethod
+    def _call(name, *args):
+        return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=list(args), keywords=[])
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return self._call("__where", node.test, node.body, node.orelse)
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        name = "__and" if isinstance(node.op, ast.And) else "__or"
+        return functools.reduce(lambda left, right: self._call(name, left, right), node.values)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        return self._call("__not", node.operand) if isinstance(node.op, ast.Not) else node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        operands = [node.left] + node.comparators
+        parts = [
+            ast.Compare(left=left, ops=[op], comparators=[right])
+            for left, op, right in zip(operands, node.ops, operands[1:])
+        ]
+        return functools.reduce(lambda left, right: self._call("__and", left, right), parts)
+
+
+class PayoutFormula:
+    """A user payout formula, validated and compiled once, evaluated over whole columns.
+
+    The expression may use numbers, the given `variables`, arithmetic
+    (+ - * / // % **), comparisons, `and`/`or`/`not`, `a if cond else b`,
+    the `FUNCTIONS` and `slab(x)`. Anything else (attributes, indexing,
+    strings, lambdas, other names) is rejected with a `FormulaError` when the
+    formula is built. The compiled code runs once per evaluation on NumPy
+    arrays, never per row.
+    """
+
+    def __init__(self, expression, variables=BULK_VARIABLES):
+        self.expression = expression.strip()
+        self.variables = dict(variables)
+        try:
+            tree = ast.parse(self.expression, mode="eval")
+        except SyntaxError as e:
+            raise FormulaError(f"Formula does not parse: {e.msg} (column {e.offset})") from None
+        self.names = set()
+        self._validate(tree.body)
+        self.uses_slab = SLAB in self.names
+        tree = ast.fix_missing_locations(_Vectorize().visit(tree))
+        self._code = compile(tree, "<payout formula>", "eval")
+
+    def __repr__(self):
+        return f"PayoutFormula({self.expression!r})"
+
+    def __reduce__(self):
+        # Code objects do not pickle; process pool workers recompile from the text.
+        return type(self), (self.expression, self.variables)
+
+    def to_dict(self):
+        return {"expression": self.expression}
+
+    def _validate(self, node):
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise FormulaError(f"Only numbers are allowed as constants, not {node.value!r}")
+        elif isinstance(node, ast.Name):
+            if node.id not in self.variables:
+                raise FormulaError(f"Unknown variable '{node.id}'; expected one of {sorted(self.variables)}")
+            self.names.add(node.id)
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, _BINARY):
+            self._validate(node.left)
+            self._validate(node.right)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, _UNARY):
+            self._validate(node.operand)
+        elif isinstance(node, ast.Compare) and all(isinstance(op, _COMPARE) for op in node.ops):
+            for child in [node.left] + node.comparators:
+                self._validate(child)
+        elif isinstance(node, ast.BoolOp):
+            for child in node.values:
+                self._validate(child)
+        elif isinstance(node, ast.IfExp):
+            for child in (node.test, node.body, node.orelse):
+                self._validate(child)
+        elif isinstance(node, ast.Call):
+            name = node.func.id if isinstance(node.func, ast.Name) else None
+            if name not in FUNCTIONS and name != SLAB:
+                raise FormulaError(f"Unknown function '{ast.unparse(node.func)}'; expected one of {sorted(FUNCTIONS) + [SLAB]}")
+            if node.keywords or any(isinstance(arg, ast.Starred) for arg in node.args):
+                raise FormulaError(f"'{name}' takes plain positional arguments only")
+            if name == SLAB and len(node.args) != 1:
+                raise FormulaError("slab() takes one argument, the achievement %")
+            fewest, most = ARITY.get(name, (1, 1))
+            if len(node.args) < fewest or (most is not None and len(node.args) > most):
+                expected = f"at least {fewest}" if most is None else (f"{fewest}" if fewest == most else f"{fewest} to {most}")
+                raise FormulaError(f"{name}() takes {expected} argument(s), got {len(node.args)}")
+            args = node.args
+            if name == "round" and len(args) == 2:
+                decimals = args[1]
+                if not (isinstance(decimals, ast.Constant) and type(decimals.value) is int and 0 <= decimals.value <= MAX_DECIMALS):
+                    raise FormulaError(f"round() decimals must be a whole number from 0 to {MAX_DECIMALS}")
+                args = args[:1]
+            self.names.add(name)
+            for child in args:
+                self._validate(child)
+        else:
+            raise FormulaError(f"'{ast.unparse(node)}' is not allowed in a payout formula")
+
+    def evaluate(self, values, slab=None, shape=None):
+        """Evaluate over arrays of variable values; returns a float array of `shape`.
+
+        `values` maps variable names to arrays (or scalars) that broadcast
+        together; only the variables the formula uses are needed. `slab` maps
+        an achievement array to multipliers and is required when the formula
+        calls `slab()`. `shape` defaults to the broadcast shape of the values.
+        """
+        missing = sorted(name for name in self.names & set(self.variables) if name not in values)
+        if missing:
+            raise FormulaError(f"No values given for {missing}")
+        if self.uses_slab and slab is None:
+            raise FormulaError("This formula calls slab() but no slab plan was given")
+        namespace = {name: values[name] for name in self.names & set(self.variables)}
+        namespace.update(FUNCTIONS)
+        namespace.update(
+            __where=lambda cond, a, b: np.where(cond, a, b),
+            __and=lambda a, b: np.logical_and(a, b),
+            __or=lambda a, b: np.logical_or(a, b),
+            __not=lambda a: np.logical_not(a),
+        )
+        if slab is not None:
+            namespace[SLAB] = slab
+        try:
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                result = eval(self._code, {"__builtins__": {}}, namespace)
+            if shape is None:
+                shape = np.broadcast_shapes(*(np.shape(namespace[name]) for name in self.names & set(self.variables)))
+            return np.broadcast_to(np.asarray(result, dtype=float), shape)
+        except FormulaError:
+            raise
+        except (ArithmeticError, ValueError, TypeError) as e:
+            raise FormulaError(f"Formula '{self.expression}' failed on these inputs: {e}") from e
+
+
+def compile_formula(expression, variables=BULK_VARIABLES):
+    """`PayoutFormula` for a non-blank expression, else None (use the hand-coded formula)."""
+    if expression is None or isinstance(expression, PayoutFormula):
+        return expression
+    return PayoutFormula(expression, variables) if expression.strip() else None
@@ -0,0 +1,176 @@
+from functools import lru_cache
+from math import erfc, sqrt
+
+import numpy as np
+import pandas as pd
+
+from .cb_grid import GROUP_KEYS
+from .monte_carlo import DEFAULT_DISTRIBUTION
+
+# Cells with more people than this are evaluated on this many points instead.
+MAX_BINS = 200
+CELL_KEYS = GROUP_KEYS + ["KPI"]
+
+
+@lru_cache(maxsize=None)
+def _normal_table():
+    """Standard normal CDF on a fine grid of z <= 0, for vectorized CDF and quantile lookups."""
+    z = np.linspace(-8.5, 0.0, 17_001)
+    return z, np.array([0.5 * erfc(-v / sqrt(2)) for v in z])
+
+
+def _norm_cdf(x):
+    z, cdf = _normal_table()
+    x = np.asarray(x, dtype=float)
+    return np.where(x <= 0, np.interp(x, z, cdf), 1 - np.interp(-x, z, cdf))
+
+
+def _norm_ppf(u):
+    z, cdf = _normal_table()
+    u = np.asarray(u, dtype=float)
+    return np.where(u <= 0.5, np.interp(u, cdf, z), -np.interp(1 - u, cdf, z))
+
+
+def _spec_functions(spec, mean):
+    """CDF and quantile function of achievement % for cells with the given means."""
+    dist = spec.get("dist", "normal")
+    if dist == "normal":
+        sd = float(spec.get("sd", DEFAULT_DISTRIBUTION["sd"]))
+        if sd <= 0:
+            return (lambda x: (x >= mean[:, None]).astype(float)), (lambda u: np.broadcast_to(mean[:, None], u.shape))
+        return (lambda x: _norm_cdf((x - mean[:, None]) / sd)), (lambda u: mean[:, None] + sd * _norm_ppf(u))
+    if dist == "empirical":
+        # Deviations from the historical mean, re-centred on each cell's mean (as in monte_carlo).
+        history = np.sort(np.asarray(spec["history"], dtype=float))
+        history = history[~np.isnan(history)]
+        offsets = history - history.mean()
+        levels = (np.arange(len(offsets)) + 0.5) / len(offsets)
+        return (lambda x: np.interp(x - mean[:, None], offsets, levels, left=0.0, right=1.0)), (lambda u: mean[:, None] + np.interp(u, levels, offsets))
+    raise ValueError(f"Projection supports 'normal' and 'empirical' distributions, not '{dist}'")
+
+
+def _synthetic_points(cells, mean, headcount, specs, spec_codes, max_bins, thresholds):
+    """(cell, achievement %, people) points spread around each cell's mean.
+
+    A cell of N people gets min(N, max_bins) equal-probability slices of its
+    distribution, each standing for N / points people and evaluated at its
+    median, so a cell of 50k costs as much as one of `max_bins`. Slices that
+    straddle a slab threshold are split there, so a slab step never falls
+    inside a slice.
+    """
+    n_points = np.minimum(headcount[cells], max_bins).astype(np.int64)
+    out_cells, out_ach, out_people = [], [], []
+    for n in np.unique(n_points[n_points > 0]):
+        rows = cells[n_points == n]
+        for code in np.unique(spec_codes[rows]):
+            members = rows[spec_codes[rows] == code]
+            cdf, ppf = _spec_functions(specs[code], mean[members])
+            edges = np.broadcast_to(np.linspace(0.0, 1.0, n + 1), (len(members), n + 1))
+            edges = np.sort(np.concatenate([edges, cdf(thresholds[None, :])], axis=1), axis=1)
+            width = np.diff(edges, axis=1)
+            ach = np.maximum(ppf(edges[:, :-1] + width / 2), 0.0)
+            out_cells.append(np.repeat(members, width.shape[1]))
+            out_ach.append(ach.ravel())
+            out_people.append((width * headcount[members, None]).ravel())
+    if not out_cells:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+    return np.concatenate(out_cells), np.concatenate(out_ach), np.concatenate(out_people)
+
+
+def _observed_points(cell, ach, max_bins, edges_extra):
+    """Individual achievements, with cells above `max_bins` people histogram-binned.
+
+    Bins share one edge grid of `max_bins` steps over the observed range,
+    with the plan's slab thresholds added as edges so no bin straddles a
+    threshold; each bin is evaluated at the mean achievement of its members.
+    """
+    counts = np.bincount(cell)
+    large = counts[cell] > max_bins
+    points = [(cell[~large], ach[~large], np.ones((~large).sum()))]
+    if large.any():
+        lo, hi = ach[large].min(), ach[large].max()
+        edges = np.union1d(np.linspace(lo, hi, max_bins + 1)[1:-1], edges_extra)
+        slot = np.searchsorted(edges, ach[large], side="right")
+        key = cell[large] * (len(edges) + 1) + slot
+        uniq, inverse, people = np.unique(key, return_inverse=True, return_counts=True)
+        mean = np.bincount(inverse, weights=ach[large]) / people
+        points.append((uniq // (len(edges) + 1), mean, people.astype(float)))
+    return tuple(np.concatenate(parts) for parts in zip(*points))
+
+
+def project_payouts(rows, target_incentive, plan=None, distributions=None, achievements=None, max_bins=MAX_BINS):
+    """Price each grid row on a distribution of individual achievements.
+
+    The scalar grid pays every person in a group the payout at the group's
+    `Achieved %`, which misprices convex slabs. Here each (group, KPI) row is
+    expanded into its people: the observed `Achievement %` values from
+    `achievements` (a long table with Region/Role/Band/KPI columns) where
+    given, otherwise `Employees` synthetic people spread around `Achieved %`
+    by `distributions` (KPI -> {"dist": "normal", "sd": ...} or
+    {"dist": "empirical", "history": [...]}, "*" for the default). Observed
+    values are in the unit of `Achieved %` and are divided by the cell's
+    `Target %` like it. Large cells are binned to at most about `max_bins`
+    points. Slab multipliers come from `plan`, per person; without a plan
+    every person keeps the row's `Multiplier`, as the grid prices it.
+
+    Returns a copy of `rows` with `Projected Employees`, `Scalar Payout`
+    (everyone at the mean, priced the same way; the grid's `Total Payout`
+    when there is no plan), `Projected Payout` and `Convexity Gap`
+    (projected minus scalar).
+    """
+    distributions = distributions or {}
+    rows = rows.reset_index(drop=True)
+    target_pct = rows["Target %"].to_numpy(dtype=float)
+    ratio = rows["Achieved %"].to_numpy(dtype=float) / target_pct * 100
+    weight = rows["Weight %"].to_numpy(dtype=float) / 100
+    headcount = np.nan_to_num(np.round(rows["Employees"].to_numpy(dtype=float)))
+    valid = np.isfinite(ratio) & np.isfinite(weight)
+    kpi = rows["KPI"].to_numpy(dtype=object)
+
+    fixed = None if plan is not None else rows["Multiplier"].to_numpy(dtype=float)
+    thresholds = np.unique(np.concatenate([grid.thresholds for grid in plan.grids.values()])) if plan is not None else np.empty(0)
+    observed = np.zeros(len(rows), dtype=bool)
+    parts = []
+    if achievements is not None and len(achievements):
+        keys = pd.MultiIndex.from_frame(rows[CELL_KEYS].astype(object))
+        cell = keys.get_indexer(pd.MultiIndex.from_frame(achievements[CELL_KEYS].astype(object)))
+        ach = achievements["Achievement %"].to_numpy(dtype=float)
+        keep = (cell >= 0) & np.isfinite(ach)
+        cell, ach = cell[keep], ach[keep]
+        keep = valid[cell]
+        cell, ach = cell[keep], ach[keep] / target_pct[cell[keep]] * 100
+        observed[cell] = True
+        parts.append(_observed_points(cell, ach, max_bins, thresholds))
+        headcount = np.where(observed, np.bincount(cell, minlength=len(rows)), headcount)
+
+    synthetic = np.flatnonzero(valid & ~observed & (headcount > 0))
+    kpi_codes, kpis = pd.factorize(pd.Series(kpi))
+    specs = [distributions.get(k, distributions.get("*", DEFAULT_DISTRIBUTION)) for k in kpis]
+    parts.append(_synthetic_points(synthetic, ratio, headcount, specs, kpi_codes, max_bins, thresholds))
+    cell, ach, people = (np.concatenate(p) for p in zip(*parts))
+
+    if plan is None:
+        mult, scalar_mult = fixed[cell], fixed
+    else:
+        # Per KPI code rather than `multipliers_for`, which would factorize millions of labels.
+        mult = np.empty_like(ach)
+        point_codes = kpi_codes[cell]
+        for code, name in enumerate(kpis):
+            members = point_codes == code
+            mult[members] = plan.multipliers(name, ach[members])
+        scalar_mult = plan.multipliers_for(kpi, np.nan_to_num(ratio))
+    score = ach / 100 * mult
+    projected = np.bincount(cell, weights=score * people * weight[cell], minlength=len(rows)) * target_incentive
+    scalar = ratio / 100 * scalar_mult * weight * headcount * target_incentive
+
+    out = rows.copy()
+    out["Projected Employees"] = headcount
+    out["Scalar Payout"] = np.where(valid, scalar, np.nan)
+    out["Projected Payout"] = np.where(valid, projected, np.nan)
+    out["Convexity Gap"] = out["Projected Payout"] - out["Scalar Payout"]
+    return out
+
+
+def projection_summary(projected):
+    """Scalar vs projected payout per Region/Role/Band group."""
+    return projected.groupby(GROUP_KEYS, observed=True, sort=False)[["Scalar Payout", "Projected Payout", "Convexity Gap"]].sum()
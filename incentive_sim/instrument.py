@@ -0,0 +1,179 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+LOGGER = logging.getLogger("incentive_sim.stages")
+
+# Setting INCENTIVE_SIM_PROFILE=1 switches stage timing on by default.
+PROFILE_ENV = "INCENTIVE_SIM_PROFILE"
+
+# tracemalloc is process-wide and shared by every timer (sessions, job threads):
+# it runs while any timer has a top-level stage open and stops when the last closes.
+# `_trace_overlaps` counts the times a timer started tracing while another was tracing.
+_TRACE_LOCK = threading.Lock()
+_trace_users = 0
+_trace_owned = False
+_trace_overlaps = 0
+
+
+def profiling_default():
+    return os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes", "on")
+
+
+def enable_json_logging(stream=None):
+    """Send stage records to `stream` (stderr by default), once per process."""
+    if not any(getattr(h, "_incentive_sim", False) for h in LOGGER.handlers):
+        handler = logging.StreamHandler(stream)
+        handler._incentive_sim = True
+        LOGGER.addHandler(handler)
+    LOGGER.setLevel(logging.INFO)
+
+
+def _start_trace():
+    global _trace_users, _trace_owned, _trace_overlaps
+    with _TRACE_LOCK:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _trace_owned = True
+        elif _trace_users > 0:
+            _trace_overlaps += 1
+        _trace_users += 1
+
+
+def _tracing_alone(since):
+    """Whether this timer has been the only one tracing since `_trace_overlaps` was `since`."""
+    with _TRACE_LOCK:
+        return _trace_users == 1 and _trace_overlaps == since
+
+
+def _stop_trace():
+    global _trace_users, _trace_owned
+    with _TRACE_LOCK:
+        _trace_users -= 1
+        # Tracing someone else started (e.g. `python -X tracemalloc`) is left running.
+        if _trace_users == 0 and _trace_owned:
+            tracemalloc.stop()
+            _trace_owned = False
+
+
+def max_rss_mb():
+    """Peak resident set size of this process so far, or None where unavailable."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return rss / 1024 ** 2 if sys.platform == "darwin" else rss / 1024
+
+
+class _Frame:
+    def __init__(self, name, start_bytes, overlaps=None):
+        self.name = name
+        self.start_bytes = start_bytes
+        self.peak_bytes = start_bytes
+        self.overlaps = overlaps
+
+
+class StageTimer:
+    """Opt-in per-stage wall time, peak memory and row counts.
+
+        timer = StageTimer(enabled=True)
+        with timer.stage("parse", rows=len(df)):
+            ...
+
+    Each finished stage is appended to `records` and logged as one JSON line
+    on the `incentive_sim.stages` logger, with the process's max RSS so far.
+    With `trace_memory`, `peak_mb` is the tracemalloc high-water mark above
+    the stage's starting allocation. Tracing runs only while a top-level stage
+    of some timer is open, but it slows allocation-heavy Python code (CSV
+    writing, Streamlit rendering) several-fold, so it is off by default.
+    Stages nest, and a parent's peak includes its children. tracemalloc keeps
+    one high-water mark for the whole process and every stage resets it, so
+    a stage that overlaps a traced stage of another timer (other sessions,
+    background jobs) could under-report; its `peak_mb` is left empty.
+    """
+
+    def __init__(self, enabled=True, trace_memory=False, context=None, logger=LOGGER):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.context = dict(context or {})
+        self.logger = logger
+        self.records = []
+        self._stack = []
+        self._tracing = False
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Time the enclosed block; `rows` may also be set later via the yielded dict."""
+        if not self.enabled:
+            yield {}
+            return
+        info = {"rows": rows}
+        frame = self._enter(name)
+        started = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self._exit(frame, time.perf_counter() - started, info.get("rows"))
+
+    def _enter(self, name):
+        tracing = False
+        if self.trace_memory:
+            overlaps = _trace_overlaps
+            if not self._stack:
+                _start_trace()
+                self._tracing = True
+            tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1].peak_bytes = max(self._stack[-1].peak_bytes, peak)
+            tracemalloc.reset_peak()
+            frame = _Frame(name, current, overlaps)
+        else:
+            frame = _Frame(name, None)
+        self._stack.append(frame)
+        return frame
+
+    def _exit(self, frame, seconds, rows):
+        self._stack.pop()
+        peak_mb = None
+        if frame.start_bytes is not None and tracemalloc.is_tracing() and _tracing_alone(frame.overlaps):
+            peak = max(frame.peak_bytes, tracemalloc.get_traced_memory()[1])
+            peak_mb = (peak - frame.start_bytes) / 1024 ** 2
+            if self._stack:
+                self._stack[-1].peak_bytes = max(self._stack[-1].peak_bytes, peak)
+        if not self._stack and self._tracing:
+            _stop_trace()
+            self._tracing = False
+
+        record = {
+            **self.context,
+            "stage": ".".join([f.name for f in self._stack] + [frame.name]),
+            "seconds": round(seconds, 6),
+            "peak_mb": None if peak_mb is None else round(peak_mb, 3),
+            "max_rss_mb": None if (rss := max_rss_mb()) is None else round(rss, 1),
+            "rows": None if rows is None else int(rows),
+        }
+        self.records.append(record)
+        self.logger.info(json.dumps(record))
+
+    def frame(self):
+        """Finished stages as a DataFrame, in completion order."""
+        columns = ["stage", "seconds", "peak_mb", "max_rss_mb", "rows"]
+        return pd.DataFrame(self.records, columns=columns) if self.records else pd.DataFrame(columns=columns)
+
+    def total_seconds(self):
+        # Only top-level stages; nested ones are already inside their parent.
+        return sum(r["seconds"] for r in self.records if "." not in r["stage"])
@@ -0,0 +1,296 @@
+import itertools
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .instrument import StageTimer
+from .result_cache import _nbytes
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+# A session counts as watching a job if it polled or attached within this many seconds.
+SESSION_TIMEOUT = 10.0
+_NO_TIMER = StageTimer(enabled=False)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's function by `Job.check()` once the job is cancelled."""
+
+
+class Job:
+    """One background simulation: its state, progress, latest partial result and outcome.
+
+    The job's function receives the `Job` as its first argument and calls
+    `report()` to publish progress and `check()` at safe points to honour
+    cancellation; `stage()` times its steps on the job's `timer`, if any.
+    Every field is safe to read from another thread.
+    """
+
+    def __init__(self, job_id, name, key, cleanup=None, timer=None):
+        self.id = job_id
+        self.name = name
+        self.key = key
+        self.state = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.nbytes = 0
+        self.timer = timer
+        self._cleanup = cleanup
+        self._cancel = threading.Event()
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    # --- Called from the job's function ---
+    def report(self, progress=None, message=None, partial=None):
+        """Publish progress (0-1), a status message and/or a partial result; also checks for cancellation."""
+        if progress is not None:
+            self.progress = min(max(float(progress), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+        if partial is not None:
+            self.partial = partial
+        self.check()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    def stage(self, name, rows=None):
+        """`StageTimer.stage` on the job's timer; a no-op when it has none."""
+        return (self.timer or _NO_TIMER).stage(name, rows)
+
+    # --- Called from the UI ---
+    def cancel(self):
+        """Ask the job to stop at its next `check()`; a queued job never starts."""
+        self._cancel.set()
+
+    def attach(self, session):
+        """Record that `session` is watching this job (again)."""
+        with self._lock:
+            self._sessions[session] = time.time()
+
+    def release(self, session):
+        """Stop `session` watching; cancel the job only if no other session still is.
+
+        Returns True if the job was cancelled.
+        """
+        with self._lock:
+            self._sessions.pop(session, None)
+            now = time.time()
+            watched = any(now - seen < SESSION_TIMEOUT for seen in self._sessions.values())
+        if not watched:
+            self.cancel()
+        return not watched
+
+    @property
+    def is_finished(self):
+        return self.state in FINISHED
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def _run(self, fn, args, kwargs):
+        if self._cancel.is_set():
+            self._finish(CANCELLED)
+            return
+        self.state = RUNNING
+        self.started = time.time()
+        try:
+            result = fn(self, *args, **kwargs)
+        except JobCancelled:
+            self._finish(CANCELLED)
+        except Exception as e:
+            self.error = e
+            self._finish(FAILED)
+        else:
+            self.result = result
+            self.nbytes = _nbytes(result)
+            self.progress = 1.0
+            self._finish(DONE)
+
+    def _finish(self, state):
+        self.finished = time.time()
+        self.state = state
+
+    def discard(self):
+        """Release the result (running the job's cleanup on it, e.g. deleting a temp file)."""
+        if self._cleanup is not None and self.result is not None:
+            self._cleanup(self.result)
+        self.result = self.partial = None
+        self.nbytes = 0
+
+
+class JobStore:
+    """Thread pool plus an in-process registry of jobs, shared by every session.
+
+    Jobs submitted with a `key` (e.g. a fingerprint of the inputs) are
+    deduplicated: while a job with that key is queued, running or done,
+    `submit` returns it instead of starting another, so reruns and other
+    sessions reattach to the same run and finished results are reused.
+    At most `max_finished` finished jobs, holding at most `max_bytes` of
+    results, are kept, oldest discarded first; the newest finished job is
+    always kept so its session can show it.
+    """
+
+    def __init__(self, max_workers=2, max_finished=32, max_bytes=1024 ** 3):
+        self.max_finished = max_finished
+        self.max_bytes = max_bytes
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="incentive-sim-job")
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, key=None, name=None, cleanup=None, timer=None, **kwargs):
+        """Run `fn(job, *args, **kwargs)` in the background and return its `Job`."""
+        with self._lock:
+            existing = self.find(key) if key is not None else None
+            if existing is not None:
+                return existing
+            job = Job(f"job-{next(self._ids)}", name or getattr(fn, "__name__", "job"), key, cleanup, timer)
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job._run(fn, args, kwargs)
+        with self._lock:
+            self._prune()
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def find(self, key):
+        """Newest queued, running or successful job submitted with `key`, if any."""
+        for job in reversed(list(self._jobs.values())):
+            if job.key == key and job.state not in (FAILED, CANCELLED):
+                return job
+        return None
+
+    def jobs(self):
+        """All known jobs, newest first."""
+        return list(reversed(list(self._jobs.values())))
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def _prune(self):
+        finished = sorted((job for job in self._jobs.values() if job.is_finished), key=lambda job: job.finished)
+        excess = max(0, len(finished) - self.max_finished)
+        held = sum(job.nbytes for job in finished)
+        for i, job in enumerate(finished[:-1]):
+            if i >= excess and held <= self.max_bytes:
+                break
+            held -= job.nbytes
+            del self._jobs[job.id]
+            job.discard()
+
+
+# One store per server process, so any session can reattach to any job.
+JOB_STORE = JobStore()
+
+
+def _session(state):
+    # Identifies the Streamlit session that attaches to jobs.
+    return state.setdefault("_job_session", uuid.uuid4().hex)
+
+
+def attach_job(state, slot, fn, *args, key, name=None, cleanup=None, timer=None, store=JOB_STORE, rejoin=False, **kwargs):
+    """The job this session keeps in `state[slot]`, submitting one when `key` changed.
+
+    A failed or cancelled job stays attached until its inputs change or the
+    user asks to run it again (see `show_job`), so a cancel is not undone by
+    the next rerun. After this session stopped following a job that other
+    sessions still watch, it returns None for the same `key` unless
+    `rejoin` (e.g. on an explicit "Run" click).
+    """
+    session = _session(state)
+    if rejoin:
+        state.pop(f"{slot}_detached", None)
+    job = store.get(state.get(slot))
+    if job is None or job.key != key:
+        if state.get(f"{slot}_detached") == key:
+            return None
+        job = store.submit(fn, *args, key=key, name=name, cleanup=cleanup, timer=timer, **kwargs)
+        state[slot] = job.id
+        state.pop(f"{slot}_detached", None)
+    job.attach(session)
+    return job
+
+
+def show_job(job, slot, partial=None, poll_seconds=0.5):
+    """Render a job's progress in Streamlit and return its result once done.
+
+    While the job runs this shows a progress bar, a cancel button and, via
+    `partial(job.partial)`, its latest partial result, then sleeps
+    `poll_seconds` and reruns the script. Widget changes in the meantime only
+    rerun the page; they reattach to the same job instead of restarting it.
+    Failed or cancelled jobs return None and offer to run again, which drops
+    the job from the session's `slot` so `attach_job` submits a new one.
+
+    Cancel only stops the job if no other session is watching it; otherwise
+    this session stops following it (`attach_job` then returns None, and
+    `show_job(None, slot)` offers to follow it again).
+    """
+    import streamlit as st
+
+    if job is None:
+        if st.session_state.get(f"{slot}_detached") is not None:
+            st.info("You stopped following this run; it continues for the other sessions watching it.")
+            if st.button("🔁 Follow again", key=f"{slot}_rejoin"):
+                st.session_state.pop(f"{slot}_detached", None)
+                st.rerun()
+        return None
+    session = _session(st.session_state)
+    job.attach(session)
+    if job.state == DONE:
+        return job.result
+    if job.state in (FAILED, CANCELLED):
+        if job.state == FAILED:
+            st.error(f"⚠️ {job.name} failed: {job.error}")
+        else:
+            st.warning(f"{job.name} was cancelled.")
+        if st.button("🔁 Run again", key=f"{slot}_rerun"):
+            st.session_state.pop(slot, None)
+            st.rerun()
+        return None
+
+    st.progress(job.progress, text=f"{job.name}: {job.message or job.state} ({job.elapsed:.0f} s)")
+    if st.button("✖️ Cancel", key=f"{slot}_cancel") and not job.release(session):
+        st.session_state[f"{slot}_detached"] = job.key
+        st.session_state.pop(slot, None)
+        st.rerun()
+    if partial is not None and job.partial is not None:
+        partial(job.partial)
+    time.sleep(poll_seconds)
+    st.rerun()
+
+
+def show_jobs(store=JOB_STORE):
+    """Sidebar table of background jobs with their state and progress."""
+    import pandas as pd
+    import streamlit as st
+
+    jobs = store.jobs()
+    if not jobs:
+        return
+    with st.sidebar.expander(f"⚙️ Background jobs ({sum(not job.is_finished for job in jobs)} running)"):
+        st.dataframe(pd.DataFrame({
+            "Job": [job.name for job in jobs],
+            "State": [job.state for job in jobs],
+            "Progress": [f"{job.progress:.0%}" for job in jobs],
+            "Seconds": [round(job.elapsed, 1) for job in jobs],
+        }, index=[job.id for job in jobs]), use_container_width=True)
@@ -0,0 +1,8 @@
+def kpi_component_payouts(kpi_df, base_incentive):
+    """Per-KPI payout of one employee: base x performance x multiplier x normalised weight.
+
+    Returns a Series aligned to `kpi_df`; its sum is the payout per employee.
+    """
+    weight = kpi_df["Weightage %"] / kpi_df["Weightage %"].sum()
+    payouts = base_incentive * (kpi_df["Performance %"] / 100) * kpi_df["Multiplier"] * weight
+    return payouts.rename("Payout")
@@ -0,0 +1,301 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .cb_grid import GROUP_KEYS
+
+DISTRIBUTIONS = ["normal", "beta", "empirical"]
+DEFAULT_DISTRIBUTION = {"dist": "normal", "sd": 10.0}
+
+# Upper bound on the (draws x groups x KPIs) elements held in memory per chunk.
+MAX_CHUNK_ELEMENTS = 2_000_000
+HISTOGRAM_BINS = 2048
+
+
+class BudgetRisk:
+    """Outcome of a Monte Carlo run: total budget draws, their quantiles and a per-group table."""
+
+    def __init__(self, totals, quantiles, groups, tail, tail_threshold):
+        self.totals = totals
+        self.quantiles = quantiles
+        self.groups = groups
+        self.tail = tail
+        self.tail_threshold = tail_threshold
+
+
+def correlation_matrix(correlation, kpis):
+    """KPI correlation as a full matrix; accepts None, a scalar rho or a KPI-labelled DataFrame."""
+    k = len(kpis)
+    if correlation is None:
+        return np.eye(k)
+    if np.isscalar(correlation):
+        corr = np.full((k, k), float(correlation))
+        np.fill_diagonal(corr, 1.0)
+        return corr
+    corr = pd.DataFrame(correlation).reindex(index=kpis, columns=kpis).to_numpy(dtype=float)
+    corr = np.where(np.isnan(corr), np.eye(k), corr)
+    return corr
+
+
+def _uniform(z):
+    from scipy.special import ndtr
+
+    return ndtr(z)
+
+
+def _transform(z, mean, spec):
+    """Map correlated standard normals to achievement % for one KPI."""
+    dist = spec.get("dist", "normal")
+    if dist == "normal":
+        return np.maximum(mean + spec.get("sd", DEFAULT_DISTRIBUTION["sd"]) * z, 0.0)
+    if dist == "beta":
+        from scipy.special import betaincinv
+
+        low, high = spec.get("low", 0.0), spec.get("high", 200.0)
+        span = high - low
+        m = np.clip((mean - low) / span, 1e-6, 1 - 1e-6)
+        var = np.minimum((spec.get("sd", DEFAULT_DISTRIBUTION["sd"]) / span) ** 2, m * (1 - m) * 0.999)
+        k = m * (1 - m) / var - 1
+        return low + span * betaincinv(m * k, (1 - m) * k, _uniform(z))
+    if dist == "empirical":
+        # Deviations from the historical mean, re-centred on this group's expected achievement.
+        history = np.sort(np.asarray(spec["history"], dtype=float))
+        history = history[~np.isnan(history)]
+        positions = _uniform(z) * (len(history) - 1)
+        sample = np.interp(positions, np.arange(len(history)), history)
+        return np.maximum(mean + sample - history.mean(), 0.0)
+    raise ValueError(f"Unknown distribution '{dist}', expected one of {DISTRIBUTIONS}")
+
+
+class _GroupModel:
+    """The C&B grid reshaped into (groups x KPIs) arrays for batched payout evaluation."""
+
+    def __init__(self, grid, target_incentive, plan=None):
+        grid = grid.dropna(subset=["KPI"])
+        employees = grid.groupby(GROUP_KEYS, sort=False, observed=True)["Employees"].first().fillna(0)
+        values = ["Target %", "Achieved %", "Weight %", "Multiplier"]
+        wide = (
+            grid.groupby(GROUP_KEYS + ["KPI"], sort=False, observed=True)[values].first()
+            .unstack("KPI")
+            .reindex(employees.index)
+        )
+        self.index = employees.index
+        self.kpis = list(wide["Achieved %"].columns)
+        present = wide["Weight %"].notna().to_numpy()
+        self.achieved = wide["Achieved %"].fillna(0).to_numpy(dtype=float)
+        self.target = wide["Target %"].fillna(100).to_numpy(dtype=float)
+        self.weight = np.where(present, wide["Weight %"].fillna(0).to_numpy(dtype=float), 0.0) / 100
+        self.multiplier = wide["Multiplier"].fillna(0).to_numpy(dtype=float)
+        self.employees = employees.to_numpy(dtype=float)
+        self.target_incentive = float(target_incentive)
+        self.plan = plan
+
+    def payouts(self, achieved):
+        """Group payouts (draws x groups) for achievement draws (draws x groups x KPIs)."""
+        ratio = achieved / self.target
+        if self.plan is not None:
+            mult = np.empty_like(ratio)
+            for j, kpi in enumerate(self.kpis):
+                mult[..., j] = self.plan.multipliers(kpi, ratio[..., j] * 100)
+        else:
+            mult = self.multiplier
+        score = (ratio * mult * self.weight).sum(axis=-1)
+        return score * self.target_incentive * self.employees
+
+
+def simulate_budget_risk(
+    grid,
+    target_incentive,
+    n_draws=100_000,
+    distributions=None,
+    correlation=None,
+    plan=None,
+    quantiles=(0.5, 0.9, 0.99),
+    tail=0.99,
+    seed=0,
+    workers=None,
+    chunk_size=None,
+    progress=None,
+):
+    """Monte Carlo distribution of the total incentive budget for a C&B grid.
+
+    Every draw samples each Region x Role x Band group's KPI achievements
+    around the grid's `Achieved %` from `distributions` (KPI -> spec dict,
+    "*" for the default), correlated across KPIs through a Gaussian copula.
+    Draws are processed in chunks of bounded size on a thread pool, and each
+    chunk has its own seed, so results do not depend on `workers`.
+
+    Group quantiles come from fixed-width histograms built in a second pass
+    over the same chunks, which keeps memory independent of `n_draws` x groups.
+    `progress(fraction_done)` is called from the worker threads after each
+    chunk of either pass; an exception it raises aborts the run.
+    """
+    model = _GroupModel(grid, target_incentive, plan)
+    n_groups, n_kpis = model.achieved.shape
+    distributions = distributions or {}
+    specs = [distributions.get(kpi, distributions.get("*", DEFAULT_DISTRIBUTION)) for kpi in model.kpis]
+    try:
+        chol = np.linalg.cholesky(correlation_matrix(correlation, model.kpis))
+    except np.linalg.LinAlgError:
+        raise ValueError("KPI correlation matrix is not positive definite") from None
+
+    chunk_size = chunk_size or max(1, MAX_CHUNK_ELEMENTS // max(1, n_groups * n_kpis))
+    starts = range(0, n_draws, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    chunks = [(start, min(chunk_size, n_draws - start), s) for start, s in zip(starts, seeds)]
+    lock = threading.Lock()
+    finished = [0]
+    # The first exception from `progress`; chunks not yet started re-raise it instead of drawing.
+    aborted = []
+
+    def report():
+        if progress is None:
+            return
+        with lock:
+            finished[0] += 1
+            done = finished[0] / (2 * len(chunks))
+        try:
+            progress(done)
+        except BaseException as e:
+            aborted.append(e)
+            raise
+
+    def draw(chunk):
+        if aborted:
+            raise aborted[0]
+        _, size, chunk_seed = chunk
+        z = np.random.default_rng(chunk_seed).standard_normal((size, n_groups, n_kpis)) @ chol.T
+        achieved = np.empty_like(z)
+        for j, spec in enumerate(specs):
+            achieved[..., j] = _transform(z[..., j], model.achieved[:, j], spec)
+        return model.payouts(achieved)
+
+    def first_pass(chunk):
+        payouts = draw(chunk)
+        report()
+        return payouts.sum(axis=1), payouts.min(axis=0), payouts.max(axis=0), payouts.sum(axis=0)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        results = list(pool.map(first_pass, chunks))
+        totals = np.concatenate([r[0] for r in results])
+        low = np.min([r[1] for r in results], axis=0)
+        high = np.max([r[2] for r in results], axis=0)
+        mean = np.sum([r[3] for r in results], axis=0) / n_draws
+        tail_threshold = np.quantile(totals, tail)
+        width = np.where(high > low, (high - low) / HISTOGRAM_BINS, 1.0)
+        offsets = np.arange(n_groups) * HISTOGRAM_BINS
+
+        def second_pass(chunk):
+            start, size, _ = chunk
+            payouts = draw(chunk)
+            bins = np.clip(((payouts - low) / width).astype(np.int64), 0, HISTOGRAM_BINS - 1)
+            counts = np.bincount((bins + offsets).ravel(), minlength=n_groups * HISTOGRAM_BINS)
+            in_tail = totals[start:start + size] >= tail_threshold
+            report()
+            return counts, payouts[in_tail].sum(axis=0), in_tail.sum()
+
+        results = list(pool.map(second_pass, chunks))
+    counts = np.sum([r[0] for r in results], axis=0).reshape(n_groups, HISTOGRAM_BINS)
+    tail_sum = np.sum([r[1] for r in results], axis=0)
+    tail_count = max(1, sum(r[2] for r in results))
+
+    labels = [f"P{q * 100:g}" for q in quantiles]
+    groups = model.index.to_frame(index=False)
+    groups["Employees"] = model.employees
+    groups["Mean Payout"] = mean
+    bin_width = np.where(high > low, width, 0.0)
+    for label, q in zip(labels, quantiles):
+        groups[label] = _histogram_quantile(counts, low, bin_width, q)
+    groups["Tail Contribution"] = tail_sum / tail_count
+    tail_total = groups["Tail Contribution"].sum()
+    groups["Tail Share %"] = groups["Tail Contribution"] / tail_total * 100 if tail_total else 0.0
+
+    total_quantiles = pd.Series(np.quantile(totals, quantiles), index=labels, name="Total Budget")
+    return BudgetRisk(totals, total_quantiles, groups, tail, tail_threshold)
+
+
+def _histogram_quantile(counts, low, width, q):
+    """Per-row quantile of (groups x bins) histograms, interpolated inside the bin."""
+    cumulative = np.cumsum(counts, axis=1)
+    rank = q * cumulative[:, -1]
+    bin_idx = np.minimum((cumulative < rank[:, None]).sum(axis=1), counts.shape[1] - 1)
+    rows = np.arange(len(counts))
+    before = np.where(bin_idx > 0, cumulative[rows, bin_idx - 1], 0)
+    inside = np.where(counts[rows, bin_idx] > 0, (rank - before) / np.maximum(counts[rows, bin_idx], 1), 0)
+    return low + (bin_idx + inside) * width
+
+
+def _budget_risk_job(job, grid, target_incentive, **kwargs):
+    with job.stage("monte_carlo", rows=kwargs.get("n_draws")):
+        return simulate_budget_risk(
+            grid, target_incentive,
+            progress=lambda done: job.report(done, f"{done:.0%} of draws"),
+            **kwargs,
+        )
+
+
+def show_budget_risk(grid, target_incentive, plan=None, key="mc", timer=None, background=False, currency="₹", version=None):
+    """Render the Monte Carlo budget-risk panel in Streamlit: settings in, P50/P90/P99 budgets out.
+
+    With `background`, the run is a job in `JOB_STORE` kept in
+    `st.session_state[f"{key}_job"]`: the page polls its progress and can
+    cancel it, and the same grid and settings from any session reattach to
+    the result. Otherwise it runs in the page, memoized. Stages are timed on
+    `timer`. `version`, if given, changes whenever `grid` does, so the grid
+    is hashed for the run key once per version rather than on every rerun.
+    Returns the `BudgetRisk`, or None until a run has finished.
+    """
+    import streamlit as st
+
+    from .instrument import StageTimer
+    from .jobs import JOB_STORE, attach_job, show_job
+    from .result_cache import fingerprint, memoize, state_cached
+
+    timer = timer or StageTimer(enabled=False)
+    n_draws = st.select_slider("Number of draws", options=[10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000], value=100_000, key=f"{key}_draws")
+    dist = st.selectbox("Achievement distribution", DISTRIBUTIONS, key=f"{key}_dist")
+    sd = st.number_input("Std. deviation of Achieved % (points)", min_value=0.0, value=10.0, step=1.0, key=f"{key}_sd")
+    rho = st.slider("Correlation between KPIs", min_value=-0.45, max_value=0.95, value=0.0, step=0.05, key=f"{key}_rho")
+    distributions = {"*": {"dist": "normal" if dist == "empirical" else dist, "sd": sd}}
+    if dist == "empirical":
+        history_file = st.file_uploader("Historical Achievement % (CSV, one column per KPI)", type=["csv"], key=f"{key}_history")
+        if history_file:
+            history = pd.read_csv(history_file)
+            distributions.update({kpi: {"dist": "empirical", "history": history[kpi].to_numpy()} for kpi in history.columns})
+    kwargs = {"n_draws": n_draws, "distributions": distributions, "correlation": rho, "plan": plan}
+
+    risk = None
+    if background:
+        slot = f"{key}_job"
+        grid_hash = fingerprint(grid) if version is None else state_cached(st.session_state, f"{key}_grid_hash", version, lambda: fingerprint(grid))
+        run_key = ("monte_carlo", fingerprint(grid_hash, target_incentive, n_draws, distributions, rho, plan))
+        if st.button("Run Monte Carlo", key=f"{key}_run"):
+            job_timer = StageTimer(enabled=timer.enabled, trace_memory=timer.trace_memory, context={**timer.context, "job": "monte_carlo"})
+            attach_job(
+                st.session_state, slot, _budget_risk_job, grid.copy(), target_incentive,
+                key=run_key, name=f"Monte Carlo ({n_draws:,} draws)", rejoin=True, timer=job_timer, **kwargs,
+            )
+        job = JOB_STORE.get(st.session_state.get(slot))
+        if job is not None and job.key == run_key:
+            risk = show_job(job, slot)
+        elif job is None:
+            show_job(None, slot)
+    elif st.button("Run Monte Carlo", key=f"{key}_run"):
+        try:
+            with timer.stage("monte_carlo", rows=n_draws):
+                risk = memoize(simulate_budget_risk)(grid, target_incentive, **kwargs)
+        except ValueError as e:
+            st.error(f"⚠️ {e}")
+    if risk is None:
+        return None
+
+    for col, (label, value) in zip(st.columns(len(risk.quantiles)), risk.quantiles.items()):
+        col.metric(f"{label} Budget", f"{currency}{value:,.0f}")
+    counts, edges = np.histogram(risk.totals, bins=60)
+    st.bar_chart(pd.Series(counts, index=(edges[:-1] + edges[1:]) / 2, name="Draws"))
+    st.caption(f"Tail contribution = average group payout in draws where the total exceeds its P{risk.tail * 100:g} ({currency}{risk.tail_threshold:,.0f}).")
+    st.dataframe(risk.groups, use_container_width=True)
+    return risk
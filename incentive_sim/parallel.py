@@ -0,0 +1,136 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .payout_engine import kpi_counts, kpi_matrices, weighted_scores
+from .slab_plan import IncentivePlan
+
+# Rows per task. Shard boundaries depend only on this, never on the worker
+# count, so totals are reduced in the same order however many workers run.
+DEFAULT_SHARD_ROWS = 250_000
+
+
+class _SharedArrays:
+    """Named NumPy arrays packed into one shared-memory block.
+
+    Only the block name and this layout are pickled to workers; the data
+    itself is never copied between processes.
+    """
+
+    def __init__(self, specs):
+        self.layout = []
+        offset = 0
+        for name, shape, dtype in specs:
+            dtype = np.dtype(dtype)
+            nbytes = int(np.prod(shape)) * dtype.itemsize
+            self.layout.append((name, shape, dtype.str, offset))
+            offset += -(-nbytes // 8) * 8
+        self.size = max(offset, 1)
+        self.name = None
+
+    def create(self):
+        shm = shared_memory.SharedMemory(create=True, size=self.size)
+        self.name = shm.name
+        return shm
+
+    def views(self, buf):
+        return {
+            name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=buf, offset=offset)
+            for name, shape, dtype, offset in self.layout
+        }
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers every attach with the resource tracker. Pool
+        # workers share the parent's tracker, so the block is still unlinked
+        # exactly once, by the parent.
+        return shared_memory.SharedMemory(name=name)
+
+
+def _payout_shard(arrays, kpis, plan, plan_index, start, stop, formula=None):
+    """Worker task: payouts of rows [start, stop) under one plan, written in place."""
+    shm = _attach(arrays.name)
+    try:
+        views = arrays.views(shm.buf)
+        scores = weighted_scores(
+            views["achievement"][start:stop],
+            views["weight"][start:stop],
+            views["counts"][start:stop],
+            kpis,
+            plan,
+            formula,
+        )
+        payouts = views["target"][start:stop] * scores
+        views["payouts"][plan_index, start:stop] = payouts
+        partial = float(np.nansum(payouts))
+        del views, scores, payouts
+        return partial
+    finally:
+        shm.close()
+
+
+def parallel_simulate_payouts(df, plans, workers=None, shard_rows=DEFAULT_SHARD_ROWS, executor=None, formula=None):
+    """Evaluate one or more plans over a bulk table on a process pool.
+
+    The dense achievement/weight/count arrays are built once and placed in
+    shared memory; every (plan, row shard) pair is one task. Partial totals
+    are combined in shard order with `math.fsum`, so the result does not
+    depend on scheduling.
+
+    Returns a frame of payouts with one column per plan (aligned to `df`) and
+    a Series of total payout per plan. Pass `executor` to reuse a pool
+    across calls. `formula` is a `PayoutFormula` applied under every plan.
+    """
+    if isinstance(plans, IncentivePlan):
+        plans = [plans]
+    names = [plan.name for plan in plans]
+    names = [name if names.count(name) == 1 else f"{name} ({i + 1})" for i, name in enumerate(names)]
+    n = len(df)
+    kpis, counts = kpi_counts(df["KPIs"])
+    k = len(kpis)
+
+    arrays = _SharedArrays([
+        ("target", (n,), np.float64),
+        ("achievement", (n, k), np.float64),
+        ("weight", (n, k), np.float64),
+        ("counts", (n, k), np.int16),
+        ("payouts", (len(plans), n), np.float64),
+    ])
+    shm = arrays.create()
+    views = None
+    try:
+        views = arrays.views(shm.buf)
+        views["target"][:] = df["Target Payout"].to_numpy(dtype=float)
+        views["achievement"][:], views["weight"][:] = kpi_matrices(df, kpis)
+        views["counts"][:] = counts
+        del counts
+
+        shards = [(start, min(start + shard_rows, n)) for start in range(0, n, shard_rows)]
+        tasks = [(i, start, stop) for i in range(len(plans)) for start, stop in shards]
+        own_pool = executor is None
+        pool = executor or ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+        try:
+            futures = [pool.submit(_payout_shard, arrays, kpis, plans[i], i, start, stop, formula) for i, start, stop in tasks]
+            partials = [future.result() for future in futures]
+        finally:
+            if own_pool:
+                pool.shutdown()
+
+        payouts = pd.DataFrame(views["payouts"].T.copy(), index=df.index, columns=names)
+        totals = pd.Series(
+            [math.fsum(partials[i * len(shards):(i + 1) * len(shards)]) for i in range(len(plans))],
+            index=names,
+            name="Total Payout",
+        )
+        return payouts, totals
+    finally:
+        views = None
+        shm.close()
+        shm.unlink()
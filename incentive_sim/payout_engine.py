@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from .slab_plan import DEFAULT_PLAN
+
+# Separator of the compact `KPIs` encoding, e.g. "Revenue|Pipeline".
+KPI_DELIMITER = "|"
+
+
+# --- Scalar (row-wise) reference implementation ---
+def get_multiplier(achievement):
+    if achievement < 90:
+        return 0
+    elif 90 <= achievement < 100:
+        return 1.0
+    elif 100 <= achievement < 110:
+        return 1.2
+    else:
+        return 1.5
+
+
+def simulate_payout(row):
+    total_weighted_score = 0
+    for kpi in row['KPIs']:
+        ach = row[f"{kpi}_Achievement"]
+        weight = row[f"{kpi}_Weight"]
+        multiplier = get_multiplier(ach)
+        score = (ach / 100) * weight * multiplier
+        total_weighted_score += score
+    payout = row['Target Payout'] * total_weighted_score
+    return payout
+
+
+# --- Vectorized implementation ---
+def get_multipliers(achievement, plan=DEFAULT_PLAN, kpi=None):
+    """Slab multiplier for every element of an achievement array."""
+    return plan.multipliers(kpi, achievement)
+
+
+def split_kpis(encoded):
+    return encoded.split(KPI_DELIMITER) if encoded else []
+
+
+def kpi_counts(kpi_lists):
+    """KPI names used across all rows, and a (rows x KPIs) count matrix.
+
+    `kpi_lists` holds either Python lists or a categorical of delimited
+    strings (see bulk_loader). Most rows share one of a handful of KPI lists,
+    so each distinct combination is expanded only once.
+    """
+    kpi_lists = pd.Series(kpi_lists)
+    if isinstance(kpi_lists.dtype, pd.CategoricalDtype):
+        codes = kpi_lists.cat.codes.to_numpy()
+        combos = [split_kpis(encoded) for encoded in kpi_lists.cat.categories]
+    else:
+        codes, combos = pd.factorize(kpi_lists.map(tuple))
+    kpis = list(dict.fromkeys(kpi for combo in combos for kpi in combo))
+    position = {kpi: j for j, kpi in enumerate(kpis)}
+    # The extra all-zero last row is what missing values (code -1) pick up.
+    combo_counts = np.zeros((len(combos) + 1, len(kpis)), dtype=np.int64)
+    for i, combo in enumerate(combos):
+        for kpi in combo:
+            combo_counts[i, position[kpi]] += 1
+    return kpis, combo_counts[codes]
+
+
+def kpi_matrices(df, kpis):
+    """Dense (rows x KPIs) achievement and weight arrays from the `<KPI>_*` columns."""
+    achievement = df[[f"{kpi}_Achievement" for kpi in kpis]].to_numpy(dtype=float)
+    weight = df[[f"{kpi}_Weight" for kpi in kpis]].to_numpy(dtype=float)
+    return achievement, weight
+
+
+def weighted_scores(achievement, weight, counts, kpis, plan=DEFAULT_PLAN, formula=None):
+    """Sum of (ach / 100) * weight * slab multiplier over the KPIs each row uses.
+
+    A `PayoutFormula` over `BULK_VARIABLES` replaces the per-KPI term.
+    """
+    if formula is None:
+        score = (achievement / 100) * weight * plan.multiplier_matrix(kpis, achievement)
+    else:
+        score = formula.evaluate(
+            {"ach": achievement, "target": 100.0, "weight": weight},
+            slab=lambda ach: plan.multiplier_matrix(kpis, np.broadcast_to(ach, achievement.shape)),
+            shape=achievement.shape,
+        )
+    # KPIs a row does not list may hold NaN or junk; keep them out of the sum.
+    score = np.where(counts > 0, score * counts, 0.0)
+    return score.sum(axis=1)
+
+
+def simulate_payouts(df, plan=DEFAULT_PLAN, formula=None):
+    """Vectorized `df.apply(simulate_payout, axis=1)`; returns a Series aligned to df.
+
+    `formula` optionally replaces the per-KPI payout term (see `weighted_scores`).
+    """
+    kpis, counts = kpi_counts(df['KPIs'])
+    achievement, weight = kpi_matrices(df, kpis)
+    total_weighted_score = weighted_scores(achievement, weight, counts, kpis, plan, formula)
+    payout = df['Target Payout'].to_numpy(dtype=float) * total_weighted_score
+    return pd.Series(payout, index=df.index, name='Simulated Payout')
@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+
+from .payout_engine import kpi_counts, kpi_matrices
+from .slab_plan import DEFAULT_PLAN, IncentivePlan, load_plan
+from .sweep import bonus_penalty_payout
+
+PLAN_TYPES = ["linear", "bonus_penalty", "equal_weight", "normalized_weight", "slab"]
+
+
+class WorkforceInputs:
+    """Parsed bulk inputs and the intermediates every plan shape draws on.
+
+    Built once per comparison; each array is computed on first use and then
+    shared, and slab multipliers are cached per grid so plans that reuse a
+    grid evaluate it once.
+    """
+
+    def __init__(self, df):
+        self.index = df.index
+        self.kpis, counts = kpi_counts(df["KPIs"])
+        achievement, weight = kpi_matrices(df, self.kpis)
+        self.used = counts > 0
+        self.counts = counts
+        self.achievement = achievement
+        # Unused KPI columns may hold NaN or junk; zero them once for every plan.
+        self.ratio = np.where(self.used, achievement / 100, 0.0)
+        self.weight = np.where(self.used, weight * counts, 0.0)
+        self.target = df["Target Payout"].to_numpy(dtype=float)
+        self._cache = {}
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    @property
+    def weight_sum(self):
+        return self._cached("weight_sum", lambda: self.weight.sum(axis=1))
+
+    @property
+    def kpi_count(self):
+        return self._cached("kpi_count", lambda: self.counts.sum(axis=1))
+
+    @property
+    def score(self):
+        """Weight-averaged achievement % per employee."""
+        def compute():
+            total = (self.ratio * self.weight).sum(axis=1)
+            return np.divide(total, self.weight_sum, out=np.zeros_like(total), where=self.weight_sum > 0) * 100
+        return self._cached("score", compute)
+
+    @property
+    def normalized_weight(self):
+        return self._cached(
+            "normalized_weight",
+            lambda: np.divide(self.weight, self.weight_sum[:, None], out=np.zeros_like(self.weight), where=self.weight_sum[:, None] > 0),
+        )
+
+    def multipliers(self, grid):
+        """(employees x KPIs) multipliers: a slab plan's grid, or 1.0 when `grid` is None."""
+        if grid is None:
+            return self._cached("unit_multipliers", lambda: self.used.astype(float))
+        return self._cached(("multipliers", id(grid)), lambda: np.where(self.used, grid.multiplier_matrix(self.kpis, self.achievement), 0.0))
+
+    def base(self, base_incentive):
+        return self.target if base_incentive is None else np.full(len(self.target), float(base_incentive))
+
+
+class LinearPlan:
+    """Base incentive x weight-averaged achievement (streamlit_incentive_simulator.py)."""
+
+    kind = "linear"
+
+    def __init__(self, name="Linear", base_incentive=None):
+        self.name = name
+        self.base_incentive = base_incentive
+
+    def evaluate(self, inputs):
+        return inputs.base(self.base_incentive) * inputs.score / 100
+
+
+class BonusPenaltyPlan:
+    """Linear payout plus a flat bonus above, and a penalty below, score thresholds."""
+
+    kind = "bonus_penalty"
+
+    def __init__(self, name="Bonus/penalty", bonus_threshold=90.0, bonus_amount=10_000.0,
+                 penalty_threshold=75.0, penalty=5_000.0, base_incentive=None):
+        self.name = name
+        self.bonus_threshold = bonus_threshold
+        self.bonus_amount = bonus_amount
+        self.penalty_threshold = penalty_threshold
+        self.penalty = penalty
+        self.base_incentive = base_incentive
+
+    def evaluate(self, inputs):
+        return bonus_penalty_payout(
+            inputs.score, inputs.base(self.base_incentive), self.bonus_threshold,
+            self.bonus_amount, self.penalty, self.penalty_threshold,
+        )
+
+
+class EqualWeightPlan:
+    """Every KPI an employee has counts equally, each scaled by its grid multiplier."""
+
+    kind = "equal_weight"
+
+    def __init__(self, name="Equal weight", multipliers=None, base_incentive=None):
+        self.name = name
+        self.multipliers = multipliers
+        self.base_incentive = base_incentive
+
+    def evaluate(self, inputs):
+        total = (inputs.ratio * inputs.multipliers(self.multipliers) * inputs.counts).sum(axis=1)
+        share = np.divide(total, inputs.kpi_count, out=np.zeros_like(total), where=inputs.kpi_count > 0)
+        return inputs.base(self.base_incentive) * share
+
+
+class NormalizedWeightPlan:
+    """KPI weights rescaled to sum to 1 per employee, times grid multipliers."""
+
+    kind = "normalized_weight"
+
+    def __init__(self, name="Normalized weight", multipliers=None, base_incentive=None):
+        self.name = name
+        self.multipliers = multipliers
+        self.base_incentive = base_incentive
+
+    def evaluate(self, inputs):
+        score = (inputs.ratio * inputs.normalized_weight * inputs.multipliers(self.multipliers)).sum(axis=1)
+        return inputs.base(self.base_incentive) * score
+
+
+class SlabPlan:
+    """Slab multipliers on the stated KPI weights (the bulk simulator's plan)."""
+
+    kind = "slab"
+
+    def __init__(self, plan=DEFAULT_PLAN, name=None, base_incentive=None):
+        self.plan = plan
+        self.name = name or plan.name
+        self.base_incentive = base_incentive
+
+    def evaluate(self, inputs):
+        score = (inputs.ratio * inputs.weight * inputs.multipliers(self.plan)).sum(axis=1)
+        return inputs.base(self.base_incentive) * score
+
+
+def plan_from_dict(spec):
+    """Plan of any shape from a dict with a `type` in PLAN_TYPES.
+
+    Slab grids (`grid` for slab plans, defaulting to the standard slabs;
+    optional `multipliers` for the equal/normalized-weight shapes) use the
+    `IncentivePlan.from_dict` layout.
+    """
+    spec = dict(spec)
+    kind = spec.pop("type", "slab")
+    if kind == "slab":
+        grid = IncentivePlan.from_dict(spec["grid"]) if spec.get("grid") else DEFAULT_PLAN
+        return SlabPlan(grid, name=spec.get("name"), base_incentive=spec.get("base_incentive"))
+    if kind in ("equal_weight", "normalized_weight") and spec.get("multipliers") is not None:
+        spec["multipliers"] = IncentivePlan.from_dict(spec["multipliers"])
+    shapes = {"linear": LinearPlan, "bonus_penalty": BonusPenaltyPlan, "equal_weight": EqualWeightPlan, "normalized_weight": NormalizedWeightPlan}
+    if kind not in shapes:
+        raise ValueError(f"Unknown plan type '{kind}', expected one of {PLAN_TYPES}")
+    return shapes[kind](**spec)
+
+
+def load_plan_set(source):
+    """Plans from a YAML file with a top-level `plans:` list, or a single slab plan file."""
+    import yaml
+
+    filename = getattr(source, "name", str(source))
+    if filename.lower().endswith((".yaml", ".yml")):
+        if hasattr(source, "read"):
+            spec = yaml.safe_load(source.read())
+            source.seek(0)
+        else:
+            with open(source, encoding="utf-8") as f:
+                spec = yaml.safe_load(f)
+        if isinstance(spec, dict) and "plans" in spec:
+            return [plan_from_dict(plan) for plan in spec["plans"]]
+    return [SlabPlan(load_plan(source))]
+
+
+class PlanComparison:
+    """Per-employee payouts of several plans side by side, with summary statistics."""
+
+    def __init__(self, payouts, baseline=None):
+        self.payouts = payouts
+        self.baseline = baseline if baseline is not None else payouts.columns[0]
+        if self.baseline not in payouts.columns:
+            raise ValueError(f"Unknown baseline plan '{self.baseline}', expected one of {list(payouts.columns)}")
+
+    def summary(self):
+        values = self.payouts.to_numpy()
+        totals = np.nansum(values, axis=0)
+        p10, p50, p90 = np.nanpercentile(values, [10, 50, 90], axis=0) if len(values) else np.full((3, values.shape[1]), np.nan)
+        summary = pd.DataFrame({
+            "Total Payout": totals,
+            "Mean Payout": np.nanmean(values, axis=0) if len(values) else np.nan,
+            "P10": p10,
+            "Median": p50,
+            "P90": p90,
+            "Max Payout": np.nanmax(values, axis=0) if len(values) else np.nan,
+            "Zero Payout %": (values == 0).mean(axis=0) * 100 if len(values) else np.nan,
+        }, index=pd.Index(self.payouts.columns, name="Plan"))
+        base = summary.at[self.baseline, "Total Payout"]
+        summary[f"Δ vs {self.baseline}"] = summary["Total Payout"] - base
+        summary["Δ %"] = summary[f"Δ vs {self.baseline}"] / base * 100 if base else np.nan
+        return summary
+
+    def distribution(self, bins=40):
+        """Employee counts per payout band, one column per plan, on shared bin edges."""
+        values = self.payouts.to_numpy()
+        finite = values[np.isfinite(values)]
+        edges = np.histogram_bin_edges(finite if finite.size else [0.0], bins=bins)
+        counts = {plan: np.histogram(values[:, j], bins=edges)[0] for j, plan in enumerate(self.payouts.columns)}
+        return pd.DataFrame(counts, index=pd.Index((edges[:-1] + edges[1:]) / 2, name="Payout"))
+
+
+def compare_plans(df, plans, baseline=None):
+    """Evaluate plans of any shape on one bulk employee table.
+
+    The workforce is parsed once into shared arrays and every plan is a few
+    vectorized operations over them. Returns a `PlanComparison` whose first
+    plan is the baseline unless `baseline` names another.
+    """
+    inputs = WorkforceInputs(df)
+    names = [plan.name for plan in plans]
+    names = [name if names.count(name) == 1 else f"{name} ({i + 1})" for i, name in enumerate(names)]
+    payouts = pd.DataFrame({name: plan.evaluate(inputs) for name, plan in zip(names, plans)}, index=inputs.index)
+    return PlanComparison(payouts, baseline)
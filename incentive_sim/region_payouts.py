@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+
+def compute_region_payouts(kpi_df, region_target_map):
+    """Score every KPI row in one pass and total them per region.
+
+    Returns the scored rows, grouped by region in order of first appearance,
+    and a per-region frame with `Total Region Payout` and `Total KPI Weight`.
+    """
+    codes, _ = pd.factorize(kpi_df["Region"])
+    result = kpi_df.iloc[np.argsort(codes, kind="stable")].copy()
+    target = result["Region"].map(pd.Series(region_target_map, dtype=float))
+
+    result["Score"] = (result["Achieved %"] / result["Target %"]) * result["Multiplier"]
+    result["Weighted Score"] = result["Score"] * (result["Weight %"] / 100)
+    result["Payout Component"] = result["Weighted Score"] * target
+
+    totals = result.groupby("Region", sort=False).agg(
+        **{"Total Region Payout": ("Payout Component", "sum"), "Total KPI Weight": ("Weight %", "sum")}
+    )
+    return result, totals
+
+
+def region_slices(result):
+    """Positional slice of each region's rows in a `compute_region_payouts` result.
+
+    The rows are grouped by region, so each region is one contiguous block
+    and its rows are `result.iloc[slices[region]]`, without a filter pass.
+    """
+    regions = result["Region"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, regions[1:] != regions[:-1]]) if len(regions) else np.array([], dtype=int)
+    stops = np.r_[starts[1:], len(regions)]
+    return {regions[start]: slice(int(start), int(stop)) for start, stop in zip(starts, stops)}
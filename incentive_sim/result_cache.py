@@ -0,0 +1,173 @@
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def fingerprint(*values):
+    """Stable hex digest of tables, arrays, plans and plain scalars/containers."""
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        _update(digest, value)
+    return digest.hexdigest()
+
+
+def state_cached(state, key, version, compute):
+    """`compute()` kept in `state[key]` (e.g. `st.session_state`) and reused while `version` is unchanged."""
+    stored = state.get(key)
+    if stored is None or stored[0] != version:
+        stored = state[key] = (version, compute())
+    return stored[1]
+
+
+def _hash_pandas(value):
+    try:
+        return pd.util.hash_pandas_object(value, index=True).to_numpy()
+    except TypeError:
+        # Unhashable cells (e.g. Python lists in an object column) hash by their text.
+        return pd.util.hash_pandas_object(value.astype(str), index=True).to_numpy()
+
+
+def _update(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(b"frame")
+        digest.update(repr((list(value.columns), [str(t) for t in value.dtypes])).encode())
+        digest.update(_hash_pandas(value).tobytes())
+    elif isinstance(value, (pd.Series, pd.Index)):
+        digest.update(b"series")
+        digest.update(repr((value.name, str(value.dtype))).encode())
+        digest.update(_hash_pandas(value).tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(b"array")
+        digest.update(repr((value.shape, str(value.dtype))).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        digest.update(b"bytes")
+        digest.update(value)
+    elif isinstance(value, dict):
+        digest.update(b"dict")
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"seq{len(value)}".encode())
+        for item in value:
+            _update(digest, item)
+    elif hasattr(value, "to_dict"):
+        # Plan-like objects describe themselves as plain data.
+        digest.update(type(value).__name__.encode())
+        _update(digest, value.to_dict())
+    else:
+        digest.update(repr(value).encode())
+
+
+def _nbytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(item) for item in value)
+    if hasattr(value, "__dict__"):
+        return sum(_nbytes(item) for item in vars(value).values())
+    return 64
+
+
+def _copy(value):
+    # Callers routinely add columns to returned frames; never hand out the cached object itself.
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+class ResultCache:
+    """Thread-safe LRU cache for simulation results, bounded by entry count and bytes."""
+
+    def __init__(self, max_entries=128, max_bytes=512 * 1024 ** 2):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy(self._entries[key][0])
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"Result cache: {self.hits} hits / {self.misses} misses ({rate:.0f}% hit rate), {len(self)} entries"
+
+    def memoize(self, fn):
+        """Cache `fn` on a fingerprint of its arguments."""
+        # Streamlit pages all run as __main__, so the source file disambiguates them.
+        code = getattr(fn, "__code__", None)
+        name = f"{fn.__module__}.{fn.__qualname__}:{code.co_filename if code else ''}"
+        missing = object()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (name, fingerprint(args, kwargs))
+            result = self.get(key, missing)
+            if result is missing:
+                result = fn(*args, **kwargs)
+                self.put(key, result)
+                result = _copy(result)
+            return result
+
+        wrapper.cache = self
+        return wrapper
+
+
+# One cache per process, shared by every simulator page and session.
+RESULT_CACHE = ResultCache()
+memoize = RESULT_CACHE.memoize
@@ -0,0 +1,151 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE = 500
+# Columns with at most this many distinct values get a value filter in the viewer.
+MAX_FILTER_CHOICES = 200
+
+
+class ResultView:
+    """Server-side sort, filter, search and paging over a computed result frame.
+
+    Sort orders, filter masks and query results are cached, so after the
+    first request for a given sort or filter, turning pages costs only the
+    rows on the page. Formatting (`format_page`) is applied to the page alone.
+    """
+
+    def __init__(self, df, max_queries=8):
+        self.df = df
+        self.max_queries = max_queries
+        self._orders = {}
+        self._masks = OrderedDict()
+        self._queries = OrderedDict()
+        self._choices = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    # --- Masks and orders ---
+    def _cached(self, cache, key, compute):
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        value = cache[key] = compute()
+        while len(cache) > self.max_queries:
+            cache.popitem(last=False)
+        return value
+
+    def text_columns(self):
+        return [col for col in self.df.columns if not pd.api.types.is_numeric_dtype(self.df[col]) and not pd.api.types.is_bool_dtype(self.df[col])]
+
+    def _search_mask(self, text):
+        mask = np.zeros(len(self.df), dtype=bool)
+        for col in self.text_columns():
+            values = self.df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Match each category once, then broadcast through the codes.
+                hits = values.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+                mask |= np.append(hits, False)[values.cat.codes.to_numpy()]
+            else:
+                mask |= values.astype(str).str.contains(text, case=False, regex=False).to_numpy(dtype=bool)
+        return mask
+
+    def _filter_mask(self, col, condition):
+        values = self.df[col]
+        if condition[0] == "range":
+            return values.between(condition[1], condition[2]).to_numpy(dtype=bool)
+        return values.isin(list(condition[1])).to_numpy(dtype=bool)
+
+    def _order(self, sort_by, ascending):
+        key = (sort_by, ascending)
+        if key not in self._orders:
+            values = self.df[sort_by].reset_index(drop=True)
+            self._orders[key] = values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+        return self._orders[key]
+
+    def choices(self, col):
+        """Distinct values of a column for a filter widget, or None if there are too many."""
+        if col not in self._choices:
+            values = self.df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                uniques = list(values.cat.categories)
+            else:
+                uniques = values.dropna().unique()
+                uniques = sorted(uniques, key=str) if len(uniques) <= MAX_FILTER_CHOICES else uniques
+            self._choices[col] = list(uniques) if len(uniques) <= MAX_FILTER_CHOICES else None
+        return self._choices[col]
+
+    # --- Queries ---
+    def rows(self, search=None, filters=None, sort_by=None, ascending=True):
+        """Positions of the matching rows, in display order.
+
+        `filters` maps a column to a collection of allowed values or a
+        (low, high) range.
+        """
+        conditions = []
+        for col, cond in (filters or {}).items():
+            if cond is None or not len(cond):
+                continue
+            if isinstance(cond, tuple):
+                conditions.append((col, ("range", *cond)))
+            else:
+                conditions.append((col, ("in", tuple(sorted(cond, key=str)))))
+        key = (search or None, tuple(sorted(conditions, key=str)), sort_by, ascending)
+        return self._cached(self._queries, key, lambda: self._rows(*key))
+
+    def _rows(self, search, filters, sort_by, ascending):
+        mask = None
+        if search:
+            mask = self._cached(self._masks, ("search", search), lambda: self._search_mask(search))
+        for col, cond in filters:
+            part = self._cached(self._masks, ("filter", col, cond), lambda: self._filter_mask(col, cond))
+            mask = part if mask is None else mask & part
+        if sort_by is None:
+            return np.arange(len(self.df)) if mask is None else np.flatnonzero(mask)
+        order = self._order(sort_by, ascending)
+        return order if mask is None else order[mask[order]]
+
+    def page(self, positions, number, size=PAGE_SIZE):
+        """Rows of the zero-based page `number` of a `rows()` result."""
+        return self.df.iloc[positions[number * size:(number + 1) * size]]
+
+    @staticmethod
+    def format_page(frame, formats=None):
+        """Styler for one page; cell formatting never touches rows off the page."""
+        return frame.style.format(formats) if formats else frame
+
+
+def get_view(state, key, df, version):
+    """Reuse the `ResultView` stored under `key` in `state` while `version` is unchanged."""
+    from .result_cache import state_cached
+
+    return state_cached(state, key, version, lambda: ResultView(df))
+
+
+def show_result_view(view, key, formats=None, filters=None, page_size=PAGE_SIZE):
+    """Render a searchable, sortable, paginated table in Streamlit.
+
+    Only the current page is sent to the browser. `filters` are fixed
+    conditions applied in addition to the user's choices.
+    """
+    import streamlit as st
+
+    search_col, sort_col, order_col, filter_col = st.columns([3, 2, 1, 2])
+    search = search_col.text_input("Search", key=f"{key}_search", placeholder="Text in any column")
+    sort_by = sort_col.selectbox("Sort by", [None] + list(view.df.columns), key=f"{key}_sort", format_func=lambda c: "—" if c is None else c)
+    descending = order_col.checkbox("Descending", key=f"{key}_desc")
+    filterable = [col for col in view.text_columns() if col not in (filters or {}) and view.choices(col) is not None]
+    filter_by = filter_col.selectbox("Filter column", [None] + filterable, key=f"{key}_filter_col", format_func=lambda c: "—" if c is None else c)
+    conditions = dict(filters or {})
+    if filter_by is not None:
+        conditions[filter_by] = st.multiselect(f"{filter_by} is any of", view.choices(filter_by), key=f"{key}_filter_{filter_by}")
+
+    positions = view.rows(search=search, filters=conditions, sort_by=sort_by, ascending=not descending)
+    page_count = max(1, -(-len(positions) // page_size))
+    # Keyed on the page count so a narrower query starts again from page 1.
+    number = st.number_input("Page", min_value=1, max_value=page_count, value=1, key=f"{key}_page_{page_count}")
+    st.dataframe(view.format_page(view.page(positions, number - 1, page_size), formats), use_container_width=True)
+    st.caption(f"{len(positions):,} of {len(view):,} rows · page {number:,} of {page_count:,} ({page_size} rows per page)")
+    return positions
@@ -0,0 +1,118 @@
+import itertools
+from collections import Counter
+
+import pandas as pd
+
+ROLLUP_DIMENSIONS = ["Region", "Role", "Band", "KPI"]
+TOTAL_LABEL = "Total"
+
+
+class _All:
+    """Coordinate meaning "every member of this dimension"."""
+
+    def __repr__(self):
+        return "ALL"
+
+    def __reduce__(self):
+        return "ALL"
+
+
+ALL = _All()
+
+
+class RollupCube:
+    """Payout subtotals for every grouping set of a dimension hierarchy.
+
+    Each leaf (one Region/Role/Band/KPI combination) contributes to all 2^d
+    cells obtained by replacing any subset of its coordinates with `ALL`, so
+    any subtotal, drill-down row or pivot cell is a single dict lookup.
+    `add` patches the cube when a leaf value changes; nothing is re-summed.
+    """
+
+    def __init__(self, dims=ROLLUP_DIMENSIONS):
+        self.dims = list(dims)
+        self._totals = {}
+        self._rows = Counter()
+        self._members = {dim: Counter() for dim in self.dims}
+        self._masks = list(itertools.product((False, True), repeat=len(self.dims)))
+
+    @classmethod
+    def from_frame(cls, frame, dims=ROLLUP_DIMENSIONS, measure="Total Payout"):
+        """Build every grouping set from one aggregation of the leaf rows."""
+        cube = cls(dims)
+        leaves = frame.groupby(cube.dims, dropna=False, sort=False, observed=True)[measure].agg(["sum", "size"]).reset_index()
+        for mask in cube._masks:
+            keep = [dim for dim, rolled in zip(cube.dims, mask) if not rolled]
+            if keep:
+                sums = leaves.groupby(keep, dropna=False, sort=False, observed=True)[["sum", "size"]].sum()
+                keys = sums.index if len(keep) > 1 else ((key,) for key in sums.index)
+            else:
+                sums, keys = leaves[["sum", "size"]].sum().to_frame().T, [()]
+            for key, total, rows in zip(keys, sums["sum"], sums["size"]):
+                coords = iter(_coord(v) for v in key)
+                cell = tuple(ALL if rolled else next(coords) for rolled in mask)
+                cube._totals[cell] = float(total)
+                cube._rows[cell] = int(rows)
+        for dim in cube.dims:
+            sizes = leaves.groupby(dim, dropna=False, sort=False, observed=True)["size"].sum()
+            cube._members[dim] = Counter({_coord(v): int(n) for v, n in sizes.items()})
+        return cube
+
+    def add(self, leaf, value, rows=1):
+        """Add `value` to a leaf and every subtotal above it; `rows` may be negative to remove."""
+        for mask in self._masks:
+            cell = tuple(ALL if rolled else coord for coord, rolled in zip(leaf, mask))
+            self._totals[cell] = self._totals.get(cell, 0.0) + value
+            self._rows[cell] += rows
+            if self._rows[cell] == 0:
+                del self._rows[cell], self._totals[cell]
+        for dim, coord in zip(self.dims, leaf):
+            self._members[dim][coord] += rows
+            if self._members[dim][coord] == 0:
+                del self._members[dim][coord]
+
+    def _cell(self, coords):
+        unknown = set(coords) - set(self.dims)
+        if unknown:
+            raise KeyError(f"Unknown dimension(s): {', '.join(sorted(unknown))}")
+        return tuple(coords.get(dim, ALL) for dim in self.dims)
+
+    def total(self, **coords):
+        """Subtotal for the given coordinates; omitted dimensions are rolled up."""
+        return self._totals.get(self._cell(coords), 0.0)
+
+    def rows(self, **coords):
+        """Number of grid rows under the given coordinates."""
+        return self._rows.get(self._cell(coords), 0)
+
+    def members(self, dim):
+        return list(self._members[dim])
+
+    def drill_down(self, dim, **coords):
+        """Subtotals one level down: one entry per member of `dim` under `coords`."""
+        values = {}
+        for member in self._members[dim]:
+            cell = self._cell({**coords, dim: member})
+            if cell in self._totals:
+                values[member] = self._totals[cell]
+        return pd.Series(values, name="Total Payout", dtype=float).rename_axis(dim)
+
+    def pivot(self, index, columns, **coords):
+        """`index` x `columns` subtotal table with a Total row and column."""
+        rows = self.members(index) + [ALL]
+        cols = self.members(columns) + [ALL]
+        data = [[self._totals.get(self._cell({**coords, index: r, columns: c}), 0.0) for c in cols] for r in rows]
+        return pd.DataFrame(
+            data,
+            index=pd.Index([_label(r) for r in rows], name=index),
+            columns=pd.Index([_label(c) for c in cols], name=columns),
+        )
+
+
+def _coord(value):
+    # NaN never equals itself, so blank dimension cells are keyed as None.
+    return None if pd.isna(value) else value
+
+
+def _label(value):
+    return TOTAL_LABEL if value is ALL else value
@@ -0,0 +1,310 @@
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from .result_cache import fingerprint
+
+STORE_ENV = "INCENTIVE_SIM_SCENARIOS"
+DEFAULT_ROOT = os.path.join("~", ".incentive_sim", "scenarios")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scenarios (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    app TEXT NOT NULL,
+    created REAL NOT NULL,
+    inputs TEXT NOT NULL REFERENCES blobs(hash),
+    results TEXT NOT NULL REFERENCES blobs(hash),
+    params TEXT NOT NULL,
+    group_keys TEXT NOT NULL,
+    value_column TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    total REAL
+);
+CREATE INDEX IF NOT EXISTS scenarios_created ON scenarios (app, created);
+"""
+LIST_COLUMNS = {"id": "ID", "name": "Name", "app": "App", "created": "Saved", "rows": "Rows", "total": "Total Payout"}
+DIFF_COLUMNS = ["Before", "After", "Change", "Change %"]
+# Stores opened by `shared_store`, by directory.
+_STORES = {}
+
+
+def default_root():
+    """Store directory: `$INCENTIVE_SIM_SCENARIOS`, else ~/.incentive_sim/scenarios."""
+    return os.path.expanduser(os.environ.get(STORE_ENV) or DEFAULT_ROOT)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return str(value)
+
+
+def _plain_params(params):
+    # Parameters are stored, hashed and compared as the JSON they round-trip to.
+    return json.loads(json.dumps(params or {}, default=_json_default, sort_keys=True))
+
+
+class Scenario:
+    """Index entry of a saved scenario; its input and result frames are read on demand."""
+
+    def __init__(self, store, row):
+        self.store = store
+        self.id = row["id"]
+        self.name = row["name"]
+        self.app = row["app"]
+        self.created = row["created"]
+        self.params = json.loads(row["params"])
+        self.group_keys = json.loads(row["group_keys"])
+        self.value_column = row["value_column"]
+        self.rows = row["rows"]
+        self.total = row["total"]
+        self.input_hash = row["inputs"]
+        self.result_hash = row["results"]
+
+    def inputs(self, columns=None):
+        return self.store.read_blob(self.input_hash, columns)
+
+    def results(self, columns=None):
+        return self.store.read_blob(self.result_hash, columns)
+
+    def group_totals(self, keys=None):
+        """`value_column` summed per `keys` (the scenario's group keys by default), reading only those columns."""
+        keys = list(keys or self.group_keys)
+        frame = self.results(keys + [self.value_column])
+        return frame.groupby(keys, sort=True, dropna=False)[self.value_column].sum()
+
+
+class ScenarioStore:
+    """Local scenario repository: an SQLite index plus content-addressed Parquet blobs.
+
+    A scenario is an input grid, its results and the run parameters. Frames
+    are stored once per content hash under `blobs/`, so scenarios sharing a
+    grid share its file; a scenario's ID is the hash of its app, inputs and
+    parameters, so saving an identical run again returns the existing entry
+    and `find` tells whether a run is already saved.
+    Listing reads the index only. Requires pyarrow.
+    """
+
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root or default_root())
+        os.makedirs(os.path.join(self.root, "blobs"), exist_ok=True)
+        self.path = os.path.join(self.root, "index.sqlite")
+        db = self._connect()
+        try:
+            db.executescript(SCHEMA)
+        finally:
+            db.close()
+
+    def _connect(self):
+        # One short-lived connection per call keeps the store safe to share between sessions and threads.
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def _query(self, sql, args=()):
+        db = self._connect()
+        try:
+            return db.execute(sql, args).fetchall()
+        finally:
+            db.close()
+
+    # --- Blobs ---
+    def blob_path(self, digest):
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.parquet")
+
+    def write_blob(self, df):
+        """Store a frame under its content hash (once) and return the hash."""
+        import pyarrow.parquet as pq
+
+        from .writers import to_arrow
+
+        digest = fingerprint(df)
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written aside under a name unique to this call and renamed, so a reader never sees
+            # a partial file and threads saving the same blob never write to the same file.
+            fd, tmp = tempfile.mkstemp(prefix=f"{digest}.", suffix=".tmp", dir=os.path.dirname(path))
+            os.close(fd)
+            try:
+                pq.write_table(to_arrow(df.reset_index(drop=True)), tmp)
+                os.replace(tmp, path)
+            except BaseException:
+                os.remove(tmp)
+                raise
+        db = self._connect()
+        try:
+            with db:
+                db.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)", (digest, len(df), os.path.getsize(path)))
+        finally:
+            db.close()
+        return digest
+
+    def read_blob(self, digest, columns=None):
+        """Frame stored under `digest`; with `columns`, only those are read from disk."""
+        import pyarrow.parquet as pq
+
+        return pq.read_table(self.blob_path(digest), columns=columns).to_pandas()
+
+    # --- Scenarios ---
+    @staticmethod
+    def scenario_id(app, inputs, params):
+        return fingerprint(app, inputs, params)
+
+    def save(self, name, app, inputs, results, params=None, group_keys=("Region",), value_column="Total Payout"):
+        """Save a run and return its `Scenario`; an identical run already saved is returned as is.
+
+        `group_keys` and `value_column` say how `diff` totals the results.
+        """
+        params = _plain_params(params)
+        scenario_id = self.scenario_id(app, inputs, params)
+        existing = self.get(scenario_id)
+        if existing is not None:
+            return existing
+        input_hash = self.write_blob(inputs)
+        result_hash = self.write_blob(results)
+        total = float(results[value_column].sum()) if value_column in results else None
+        db = self._connect()
+        try:
+            with db:
+                db.execute(
+                    "INSERT OR IGNORE INTO scenarios VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (scenario_id, name, app, time.time(), input_hash, result_hash, json.dumps(params, sort_keys=True),
+                     json.dumps(list(group_keys)), value_column, len(results), total),
+                )
+        finally:
+            db.close()
+        return self.get(scenario_id)
+
+    def get(self, scenario_id):
+        rows = self._query("SELECT * FROM scenarios WHERE id = ?", (scenario_id,))
+        return Scenario(self, rows[0]) if rows else None
+
+    def find(self, app, inputs, params=None):
+        """The saved scenario for exactly this run, if any, so its results need not be recomputed."""
+        return self.get(self.scenario_id(app, inputs, _plain_params(params)))
+
+    def rename(self, scenario_id, name):
+        db = self._connect()
+        try:
+            with db:
+                db.execute("UPDATE scenarios SET name = ? WHERE id = ?", (name, scenario_id))
+        finally:
+            db.close()
+
+    def delete(self, scenario_id):
+        """Drop a scenario and any blob no other scenario refers to."""
+        db = self._connect()
+        try:
+            with db:
+                db.execute("DELETE FROM scenarios WHERE id = ?", (scenario_id,))
+                orphans = [row["hash"] for row in db.execute(
+                    "SELECT hash FROM blobs WHERE hash NOT IN (SELECT inputs FROM scenarios UNION SELECT results FROM scenarios)"
+                )]
+                db.executemany("DELETE FROM blobs WHERE hash = ?", [(digest,) for digest in orphans])
+        finally:
+            db.close()
+        for digest in orphans:
+            if os.path.exists(self.blob_path(digest)):
+                os.remove(self.blob_path(digest))
+
+    def list(self, app=None, limit=None):
+        """Saved scenarios, newest first, from the index alone (no blob is opened)."""
+        sql = f"SELECT {', '.join(LIST_COLUMNS)} FROM scenarios"
+        args = []
+        if app is not None:
+            sql += " WHERE app = ?"
+            args.append(app)
+        sql += " ORDER BY created DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        rows = self._query(sql, args)
+        frame = pd.DataFrame([tuple(row) for row in rows], columns=list(LIST_COLUMNS.values()))
+        frame["Saved"] = pd.to_datetime(frame["Saved"], unit="s").dt.floor("s")
+        return frame.set_index("ID")
+
+    def diff(self, before, after, keys=None, changed_only=True, tolerance=1e-6):
+        """Group payouts of two scenarios side by side: Before, After, Change and Change %.
+
+        Only the group keys and the payout column of each result blob are
+        read. Groups present in one scenario only count as 0 in the other.
+        Rows are sorted by the size of the change; with `changed_only`,
+        groups that moved by no more than `tolerance` are left out.
+        """
+        before = before if isinstance(before, Scenario) else self.get(before)
+        after = after if isinstance(after, Scenario) else self.get(after)
+        keys = list(keys or before.group_keys)
+        out = pd.concat([before.group_totals(keys), after.group_totals(keys)], axis=1, keys=DIFF_COLUMNS[:2]).fillna(0.0)
+        out["Change"] = out["After"] - out["Before"]
+        out["Change %"] = (out["Change"] / out["Before"].where(out["Before"] != 0)) * 100
+        if changed_only:
+            out = out[out["Change"].abs() > tolerance]
+        return out.iloc[np.argsort(-out["Change"].abs().to_numpy(), kind="stable")]
+
+
+def shared_store(root=None):
+    """One `ScenarioStore` per directory for the whole process, so reruns do not reopen the index."""
+    root = os.path.abspath(root or default_root())
+    if root not in _STORES:
+        _STORES[root] = ScenarioStore(root)
+    return _STORES[root]
+
+
+def show_scenario_store(store, app, inputs, results, params, group_keys, value_column, key, version=None):
+    """Streamlit panel to save the current run, browse saved scenarios and diff two of them.
+
+    `version`, if given, changes whenever the inputs or parameters do, so
+    they are hashed once per version rather than on every rerun. Two
+    scenarios are diffed only on request. Returns the `Scenario` chosen to
+    view, or None.
+    """
+    import streamlit as st
+
+    from .result_cache import state_cached
+
+    def run_id():
+        return store.scenario_id(app, inputs, _plain_params(params))
+
+    saved = store.get(run_id() if version is None else state_cached(st.session_state, f"{key}_id", version, run_id))
+    col_name, col_save = st.columns([3, 1])
+    name = col_name.text_input("Scenario name", value=saved.name if saved else "", key=f"{key}_name")
+    if saved is not None:
+        col_save.caption(f"Saved as '{saved.name}'")
+    elif col_save.button("💾 Save scenario", key=f"{key}_save", disabled=not name):
+        saved = store.save(name, app, inputs, results, params, group_keys, value_column)
+        st.success(f"Saved '{saved.name}' ({saved.id[:8]})")
+
+    listing = store.list(app)
+    if listing.empty:
+        st.caption(f"No saved scenarios yet in {store.root}")
+        return None
+    st.dataframe(listing.style.format({"Total Payout": "₹{:,.0f}"}), use_container_width=True)
+    labels = {sid: f"{row['Name']} · {row['Saved']:%Y-%m-%d %H:%M} · {sid[:8]}" for sid, row in listing.iterrows()}
+    col_a, col_b = st.columns(2)
+    base = col_a.selectbox("Compare", list(labels), format_func=labels.get, key=f"{key}_before")
+    other = col_b.selectbox("against", list(labels), index=min(1, len(labels) - 1), format_func=labels.get, key=f"{key}_after")
+    # Saved scenarios never change, so a diff stays valid for as long as the same pair is selected.
+    if base != other and col_b.button("🔍 Compare", key=f"{key}_compare"):
+        st.session_state[f"{key}_diff"] = ((base, other), store.diff(base, other))
+    pair, changes = st.session_state.get(f"{key}_diff", (None, None))
+    if pair == (base, other):
+        st.metric("Budget change", f"₹{changes['Change'].sum():,.0f}", help=f"{len(changes)} groups changed")
+        st.dataframe(changes.style.format({**{col: "₹{:,.0f}" for col in DIFF_COLUMNS[:3]}, "Change %": "{:+.1f}%"}, na_rep="—"), use_container_width=True)
+    view = st.selectbox("Open saved results", [None] + list(labels), format_func=lambda sid: "—" if sid is None else labels[sid], key=f"{key}_open")
+    return store.get(view) if view else None
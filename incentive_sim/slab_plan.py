@@ -0,0 +1,158 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Key under which a plan stores the grid used for KPIs without their own.
+DEFAULT_KPI = "*"
+
+
+class SlabGrid:
+    """Piecewise multiplier schedule for one KPI.
+
+    Each slab starts at `from` (achievement %) and pays `multiplier`, plus
+    `accelerator` per achievement point above the slab start. Achievement
+    below the first slab pays nothing. The result is clamped to
+    [`floor`, `cap`] when those are set.
+    """
+
+    def __init__(self, slabs, floor=None, cap=None):
+        slabs = sorted(slabs, key=lambda slab: float(slab["from"]))
+        starts = np.array([float(slab["from"]) for slab in slabs])
+        if len(starts) == 0:
+            raise ValueError("A slab grid needs at least one slab")
+        if np.any(np.diff(starts) == 0):
+            raise ValueError(f"Duplicate slab start in {starts.tolist()}")
+        self.slabs = slabs
+        self.floor = floor
+        self.cap = cap
+        # Slot 0 is the implicit zero slab below the first threshold.
+        self.thresholds = starts
+        self.starts = np.concatenate([[starts[0]], starts])
+        self.base = np.concatenate([[0.0], [float(slab["multiplier"]) for slab in slabs]])
+        self.slope = np.concatenate([[0.0], [float(slab.get("accelerator") or 0) for slab in slabs]])
+
+    def multipliers(self, achievement):
+        """Multiplier for every element of an achievement array."""
+        ach = np.asarray(achievement, dtype=float)
+        # side="right" puts a value equal to a threshold into the slab it opens.
+        idx = np.searchsorted(self.thresholds, ach, side="right")
+        mult = self.base[idx] + self.slope[idx] * (ach - self.starts[idx])
+        if self.floor is not None or self.cap is not None:
+            mult = np.clip(mult, self.floor, self.cap)
+        return mult
+
+    def to_dict(self):
+        grid = {"slabs": [dict(slab) for slab in self.slabs]}
+        if self.floor is not None:
+            grid["floor"] = self.floor
+        if self.cap is not None:
+            grid["cap"] = self.cap
+        return grid
+
+
+class IncentivePlan:
+    """Named set of per-KPI slab grids, with an optional default grid."""
+
+    def __init__(self, name, grids):
+        self.name = name
+        self.grids = dict(grids)
+
+    def grid(self, kpi):
+        try:
+            return self.grids[kpi] if kpi in self.grids else self.grids[DEFAULT_KPI]
+        except KeyError:
+            raise KeyError(f"Plan '{self.name}' has no slab grid for KPI '{kpi}'") from None
+
+    def multipliers(self, kpi, achievement):
+        return self.grid(kpi).multipliers(achievement)
+
+    def multiplier_matrix(self, kpis, achievement):
+        """Multipliers for a (rows x KPIs) achievement array, column j using kpis[j]."""
+        achievement = np.asarray(achievement, dtype=float)
+        mult = np.empty_like(achievement)
+        for j, kpi in enumerate(kpis):
+            mult[:, j] = self.multipliers(kpi, achievement[:, j])
+        return mult
+
+    def multipliers_for(self, kpi_labels, achievement):
+        """Multipliers for a long table where row i uses the grid of kpi_labels[i]."""
+        achievement = np.asarray(achievement, dtype=float)
+        codes, kpis = pd.factorize(pd.Series(kpi_labels))
+        mult = np.full(achievement.shape, np.nan)
+        for j, kpi in enumerate(kpis):
+            rows = codes == j
+            mult[rows] = self.multipliers(kpi, achievement[rows])
+        return mult
+
+    # --- Loading ---
+    @classmethod
+    def from_dict(cls, spec):
+        grids = {kpi: SlabGrid(**grid) for kpi, grid in (spec.get("kpis") or {}).items()}
+        if spec.get("default"):
+            grids[DEFAULT_KPI] = SlabGrid(**spec["default"])
+        return cls(spec.get("name", "Unnamed plan"), grids)
+
+    def to_dict(self):
+        spec = {"name": self.name}
+        if DEFAULT_KPI in self.grids:
+            spec["default"] = self.grids[DEFAULT_KPI].to_dict()
+        spec["kpis"] = {kpi: grid.to_dict() for kpi, grid in self.grids.items() if kpi != DEFAULT_KPI}
+        return spec
+
+    @classmethod
+    def from_yaml(cls, source):
+        import yaml
+
+        if hasattr(source, "read"):
+            return cls.from_dict(yaml.safe_load(source.read()))
+        with open(source, encoding="utf-8") as f:
+            return cls.from_dict(yaml.safe_load(f))
+
+    @classmethod
+    def from_csv(cls, source, name=None):
+        """Long-format grid: one row per slab with columns KPI, From, Multiplier
+        and optional Accelerator, Floor, Cap. Use KPI "*" for the default grid."""
+        table = pd.read_csv(source)
+        for col in ("Accelerator", "Floor", "Cap"):
+            if col not in table.columns:
+                table[col] = np.nan
+        grids = {}
+        for kpi, slabs in table.groupby("KPI", sort=False):
+            floor = slabs["Floor"].dropna()
+            cap = slabs["Cap"].dropna()
+            grids[str(kpi)] = SlabGrid(
+                [
+                    {"from": row.From, "multiplier": row.Multiplier,
+                     "accelerator": 0.0 if pd.isna(row.Accelerator) else row.Accelerator}
+                    for row in slabs.itertuples(index=False)
+                ],
+                floor=float(floor.iloc[0]) if len(floor) else None,
+                cap=float(cap.iloc[0]) if len(cap) else None,
+            )
+        if name is None:
+            name = os.path.splitext(os.path.basename(getattr(source, "name", str(source))))[0]
+        return cls(name, grids)
+
+
+def load_plan(source, name=None):
+    """Load a plan from a YAML or CSV path (or uploaded file with a `.name`)."""
+    filename = name or getattr(source, "name", str(source))
+    if filename.lower().endswith((".yaml", ".yml")):
+        return IncentivePlan.from_yaml(source)
+    if filename.lower().endswith(".csv"):
+        return IncentivePlan.from_csv(source)
+    raise ValueError(f"Unsupported plan file '{filename}', expected .yaml, .yml or .csv")
+
+
+# The 90/100/110 slab plan the simulators have always used.
+DEFAULT_PLAN = IncentivePlan.from_dict({
+    "name": "Standard slabs",
+    "default": {
+        "slabs": [
+            {"from": 90, "multiplier": 1.0},
+            {"from": 100, "multiplier": 1.2},
+            {"from": 110, "multiplier": 1.5},
+        ],
+    },
+})
@@ -0,0 +1,111 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .bulk_loader import DEFAULT_CHUNKSIZE, iter_bulk_chunks
+from .payout_engine import simulate_payouts
+from .writers import ResultWriter
+
+# Largest streamed result served as one download; bigger ones are offered in parts.
+DOWNLOAD_PART_BYTES = 100 * 1024 ** 2
+
+
+class StreamedResult:
+    """Bulk payouts written to a CSV file chunk by chunk, plus running aggregates.
+
+    Only the aggregates and the chunk byte offsets stay in memory; `page`
+    reads any slice of rows back from disk and `read_part` one download-sized
+    block of it.
+    """
+
+    def __init__(self, path, columns, offsets):
+        self.path = path
+        self.columns = columns
+        self.offsets = offsets
+        self.rows = 0
+        self.total_payout = 0.0
+        self.min_payout = np.inf
+        self.max_payout = -np.inf
+        self.zero_payouts = 0
+
+    def update(self, payouts):
+        payouts = payouts.to_numpy(dtype=float)
+        valid = payouts[~np.isnan(payouts)]
+        self.rows += len(payouts)
+        self.total_payout += float(valid.sum())
+        if len(valid):
+            self.min_payout = min(self.min_payout, float(valid.min()))
+            self.max_payout = max(self.max_payout, float(valid.max()))
+        self.zero_payouts += int((valid == 0).sum())
+
+    @property
+    def mean_payout(self):
+        return self.total_payout / self.rows if self.rows else 0.0
+
+    def page(self, start, size):
+        """Rows [start, start + size) of the result, read from the chunk that holds `start`."""
+        if not self.offsets or start >= self.rows:
+            return pd.DataFrame(columns=self.columns)
+        chunk = max(i for i, (first, _) in enumerate(self.offsets) if first <= start)
+        first_row, offset = self.offsets[chunk]
+        with open(self.path, encoding="utf-8") as f:
+            f.seek(offset)
+            page = pd.read_csv(f, names=self.columns, header=None, skiprows=start - first_row, nrows=size)
+        page.index = pd.RangeIndex(start, start + len(page))
+        return page
+
+    def parts(self, max_bytes=DOWNLOAD_PART_BYTES):
+        """Split the rows at chunk boundaries into downloads of about `max_bytes` each.
+
+        Returns (first row, end row, start byte, end byte) per part; a part
+        exceeds `max_bytes` only when a single chunk does.
+        """
+        if not self.offsets:
+            return []
+        bounds = self.offsets + [(self.rows, os.path.getsize(self.path))]
+        parts, start = [], 0
+        for end in range(2, len(bounds)):
+            if bounds[end][1] - bounds[start][1] > max_bytes:
+                parts.append((*bounds[start], *bounds[end - 1]))
+                start = end - 1
+        parts.append((*bounds[start], *bounds[-1]))
+        return [(first, stop, begin, finish) for first, begin, stop, finish in parts]
+
+    def read_part(self, part):
+        """CSV bytes of one of `parts()`, with the header row, read straight from the file."""
+        _, _, begin, end = part
+        with open(self.path, "rb") as f:
+            header = f.read(self.offsets[0][1])
+            f.seek(begin)
+            return header + f.read(end - begin)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def stream_bulk_payouts(source, plan, chunksize=DEFAULT_CHUNKSIZE, output_path=None, progress=None, columns=None):
+    """Simulate payouts for a bulk file in fixed-size chunks, writing results to disk.
+
+    Peak memory is bounded by `chunksize`, not the size of the file. If no
+    `output_path` is given a temporary CSV is created; the caller owns it
+    (see `StreamedResult.remove`). `progress(rows_done)` is called after
+    each chunk. `columns` projects the read as in `iter_bulk_chunks`.
+    """
+    if output_path is None:
+        fd, output_path = tempfile.mkstemp(prefix="simulated_payouts_", suffix=".csv")
+        os.close(fd)
+    writer = ResultWriter(output_path)
+    result = None
+    with writer:
+        for chunk in iter_bulk_chunks(source, chunksize, columns):
+            chunk["Simulated Payout"] = simulate_payouts(chunk, plan)
+            if result is None:
+                result = StreamedResult(output_path, list(chunk.columns), writer.offsets)
+            writer.write(chunk)
+            result.update(chunk["Simulated Payout"])
+            if progress is not None:
+                progress(result.rows)
+    return result or StreamedResult(output_path, [], [])
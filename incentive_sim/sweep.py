@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+# Parameters of the bonus-and-penalty scheme, in sweep axis order.
+PARAMETERS = [
+    "avg_score",
+    "threshold_bonus_score",
+    "penalty_threshold",
+    "bonus_amount",
+    "underperformance_penalty",
+    "base_incentive",
+    "total_employees",
+]
+
+
+def bonus_penalty_payout(avg_score, base_incentive, threshold_bonus_score, bonus_amount,
+                         underperformance_penalty, penalty_threshold):
+    """Per-employee payout of the bonus-and-penalty scheme; arguments broadcast as NumPy arrays."""
+    avg_score = np.asarray(avg_score, dtype=float)
+    payout = base_incentive * (avg_score / 100)
+    payout = payout + np.where(avg_score >= threshold_bonus_score, bonus_amount, 0.0)
+    # The penalty can never push the payout below zero.
+    penalised = np.maximum(payout - underperformance_penalty, 0.0)
+    return np.where(avg_score < penalty_threshold, penalised, payout)
+
+
+class ParameterSweep:
+    """Bonus-and-penalty payouts over the Cartesian grid of parameter values.
+
+    Every parameter takes a scalar or a 1-D array of values; the grid is
+    evaluated in one broadcast NumPy call, with one array axis per parameter
+    in `PARAMETERS` order.
+    """
+
+    def __init__(self, **values):
+        unknown = set(values) - set(PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown sweep parameter(s): {sorted(unknown)}")
+        missing = set(PARAMETERS) - set(values)
+        if missing:
+            raise ValueError(f"Missing sweep parameter(s): {sorted(missing)}")
+        self.axes = {name: np.atleast_1d(np.asarray(values[name], dtype=float)) for name in PARAMETERS}
+        shape = [len(axis) for axis in self.axes.values()]
+        grids = {
+            name: axis.reshape([-1 if i == j else 1 for j in range(len(shape))])
+            for i, (name, axis) in enumerate(self.axes.items())
+        }
+        self.payout_per_employee = np.broadcast_to(
+            bonus_penalty_payout(
+                grids["avg_score"], grids["base_incentive"], grids["threshold_bonus_score"],
+                grids["bonus_amount"], grids["underperformance_penalty"], grids["penalty_threshold"],
+            ),
+            shape,
+        )
+        self.total_payout = self.payout_per_employee * grids["total_employees"]
+
+    @property
+    def shape(self):
+        return self.total_payout.shape
+
+    def _position(self, name, value):
+        return int(np.abs(self.axes[name] - value).argmin())
+
+    def _slice(self, keep, at):
+        """Index that keeps the `keep` axes and fixes the others at `at` (nearest value, else first)."""
+        at = at or {}
+        return tuple(
+            slice(None) if name in keep else (self._position(name, at[name]) if name in at else 0)
+            for name in PARAMETERS
+        )
+
+    def heatmap(self, x="avg_score", y="threshold_bonus_score", at=None, per_employee=False):
+        """2-D table of payouts over `x` (columns) and `y` (rows), other parameters fixed at `at`."""
+        values = self.payout_per_employee if per_employee else self.total_payout
+        plane = values[self._slice({x, y}, at)]
+        if PARAMETERS.index(x) < PARAMETERS.index(y):
+            plane = plane.T
+        return pd.DataFrame(
+            plane,
+            index=pd.Index(self.axes[y], name=y),
+            columns=pd.Index(self.axes[x], name=x),
+        )
+
+    def tornado(self, base):
+        """Swing in total payout when each swept parameter moves from its lowest to highest value.
+
+        `base` maps every parameter to the value the others are held at.
+        """
+        rows = []
+        base_total = self.total_payout[self._slice(set(), base)]
+        for name, axis in self.axes.items():
+            if len(axis) < 2:
+                continue
+            line = self.total_payout[self._slice({name}, base)]
+            rows.append({
+                "Parameter": name,
+                "Low Value": axis.min(),
+                "High Value": axis.max(),
+                "Payout at Low": line[axis.argmin()],
+                "Payout at High": line[axis.argmax()],
+            })
+        table = pd.DataFrame(rows, columns=["Parameter", "Low Value", "High Value", "Payout at Low", "Payout at High"])
+        table["Swing"] = (table["Payout at High"] - table["Payout at Low"]).abs()
+        table["Base Payout"] = base_total
+        return table.sort_values("Swing", ascending=False, ignore_index=True)
+
+    def to_frame(self):
+        """Long table with one row per grid point, for export."""
+        index = pd.MultiIndex.from_product(list(self.axes.values()), names=PARAMETERS)
+        return pd.DataFrame({
+            "payout_per_employee": self.payout_per_employee.ravel(),
+            "total_payout": self.total_payout.ravel(),
+        }, index=index).reset_index()
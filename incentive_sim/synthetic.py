@@ -0,0 +1,81 @@
+"""Seeded synthetic inputs for benchmarks and demos.
+
+Workforces follow realistic role mixes: each role has its own KPI set,
+weights and achievement spread, so multiplier slabs, KPI combinations and
+payout skew resemble a real sales organisation rather than uniform noise.
+"""
+import numpy as np
+import pandas as pd
+
+from .payout_engine import KPI_DELIMITER
+
+REGIONS = ["India", "USA", "Europe", "APAC", "MEA"]
+BANDS = ["B3", "B4", "B5", "B6"]
+KPIS = ["Revenue", "Pipeline", "CSAT", "Collections", "NewLogos"]
+
+# role: (share of headcount, {KPI: weight %}, mean achievement %, sd)
+ROLE_MIX = {
+    "Field Sales": (0.35, {"Revenue": 50, "Pipeline": 25, "NewLogos": 25}, 98.0, 18.0),
+    "Inside Sales": (0.30, {"Revenue": 40, "Pipeline": 40, "CSAT": 20}, 101.0, 14.0),
+    "Account Manager": (0.20, {"Revenue": 40, "CSAT": 30, "Collections": 30}, 103.0, 10.0),
+    "Sales Manager": (0.15, {"Revenue": 30, "Pipeline": 20, "CSAT": 20, "Collections": 15, "NewLogos": 15}, 100.0, 8.0),
+}
+BAND_TARGETS = {"B3": 60_000, "B4": 90_000, "B5": 140_000, "B6": 220_000}
+
+
+def make_workforce(n_rows, seed=0, kpi_lists=False):
+    """Bulk employee table in the `bulk_loader` layout.
+
+    `KPIs` is a categorical of delimited names (the compact form the loader
+    produces); pass `kpi_lists=True` for Python lists, which the row-wise
+    `simulate_payout` expects.
+    """
+    rng = np.random.default_rng(seed)
+    roles = list(ROLE_MIX)
+    role = rng.choice(len(roles), size=n_rows, p=[ROLE_MIX[r][0] for r in roles])
+    band = rng.choice(len(BANDS), size=n_rows, p=[0.4, 0.3, 0.2, 0.1])
+    target = np.asarray([BAND_TARGETS[b] for b in BANDS], dtype=float)[band]
+
+    data = {
+        "Employee": np.arange(n_rows, dtype=np.int64),
+        "Region": pd.Categorical.from_codes(rng.integers(0, len(REGIONS), n_rows), categories=REGIONS),
+        "Role": pd.Categorical.from_codes(role, categories=roles),
+        "Band": pd.Categorical.from_codes(band, categories=BANDS),
+        "Target Payout": (target * rng.uniform(0.9, 1.1, n_rows)).round(-2),
+        "KPIs": pd.Categorical.from_codes(role, categories=[KPI_DELIMITER.join(ROLE_MIX[r][1]) for r in roles]),
+    }
+    for kpi in KPIS:
+        weights = np.asarray([ROLE_MIX[r][1].get(kpi, np.nan) / 100 for r in roles])[role]
+        means = np.asarray([ROLE_MIX[r][2] for r in roles])[role]
+        sds = np.asarray([ROLE_MIX[r][3] for r in roles])[role]
+        achievement = np.maximum(rng.normal(means, sds), 0.0).round(1)
+        data[f"{kpi}_Achievement"] = np.where(np.isnan(weights), np.nan, achievement)
+        data[f"{kpi}_Weight"] = weights
+    df = pd.DataFrame(data)
+    if kpi_lists:
+        df["KPIs"] = [combo.split(KPI_DELIMITER) for combo in df["KPIs"].astype(str)]
+    return df
+
+
+def make_region_kpi_table(n_rows, seed=0, regions=REGIONS):
+    """Multi-region KPI table in the layout of `compute_region_payouts`."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Region": pd.Categorical.from_codes(rng.integers(0, len(regions), n_rows), categories=list(regions)),
+        "KPI": pd.Categorical.from_codes(rng.integers(0, len(KPIS), n_rows), categories=KPIS),
+        "Target %": np.full(n_rows, 100.0),
+        "Achieved %": np.maximum(rng.normal(100, 12, n_rows), 0.0).round(1),
+        "Multiplier": rng.choice([0.8, 1.0, 1.2, 1.5], n_rows),
+        "Weight %": rng.choice([20.0, 30.0, 40.0], n_rows),
+    })
+
+
+def make_kpi_table(n_kpis, seed=0):
+    """Single-employee KPI table in the layout of `kpi_component_payouts`."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "KPI": [f"KPI {i + 1}" for i in range(n_kpis)],
+        "Performance %": np.maximum(rng.normal(95, 10, n_kpis), 0.0).round(1),
+        "Multiplier": rng.choice([0.9, 1.0, 1.1, 1.2], n_kpis),
+        "Weightage %": rng.integers(5, 40, n_kpis),
+    })
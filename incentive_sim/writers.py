@@ -0,0 +1,134 @@
+import gzip
+import importlib.util
+import io
+import os
+
+import pandas as pd
+
+OUTPUT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".feather": "feather", ".arrow": "feather"}
+MIME_TYPES = {
+    "csv": "text/csv",
+    "csv.gz": "application/gzip",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+    "feather": "application/vnd.apache.arrow.file",
+}
+# Rows per sheet allowed by Excel, header included.
+XLSX_MAX_ROWS = 1_048_576
+
+
+def _installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+# Download formats whose optional writer is installed, in menu order.
+EXPORT_FORMATS = ["csv", "csv.gz"]
+if _installed("openpyxl") or _installed("xlsxwriter"):
+    EXPORT_FORMATS.append("xlsx")
+if _installed("pyarrow"):
+    EXPORT_FORMATS += ["parquet", "feather"]
+
+
+def export_formats(n_rows):
+    """`EXPORT_FORMATS` that can hold `n_rows` rows; XLSX is left out above the sheet limit."""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "xlsx" or n_rows < XLSX_MAX_ROWS]
+
+
+def to_arrow(df):
+    """Arrow table over the frame's columns; numeric columns are wrapped without copying."""
+    import pyarrow as pa
+
+    # Categorical codes differ between chunks and frames; store KPI lists as plain strings.
+    df = df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def export_bytes(df, fmt):
+    """Serialize a result frame to CSV, gzipped CSV, XLSX, Parquet or Feather (Arrow IPC) bytes."""
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    buffer = io.BytesIO()
+    if fmt == "csv.gz":
+        # mtime=0 keeps the bytes identical for identical frames.
+        with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6, mtime=0) as gz:
+            with io.TextIOWrapper(gz, encoding="utf-8", newline="") as text:
+                df.to_csv(text, index=False)
+    elif fmt == "xlsx":
+        if len(df) >= XLSX_MAX_ROWS:
+            raise ValueError(f"{len(df):,} rows exceed the XLSX sheet limit; use CSV or Parquet")
+        df.to_excel(buffer, index=False)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(to_arrow(df), buffer)
+    elif fmt == "feather":
+        import pyarrow.feather as feather
+
+        feather.write_feather(to_arrow(df), buffer, compression="uncompressed")
+    else:
+        raise ValueError(f"Unsupported export format '{fmt}'")
+    return buffer.getvalue()
+
+
+def cached_export(df, fmt):
+    """`export_bytes` through the shared result cache, keyed by the frame's content hash.
+
+    Call it only once a download is requested: hashing is far cheaper than
+    serializing, and repeat requests for unchanged results reuse the bytes.
+    """
+    from .result_cache import memoize
+
+    return memoize(export_bytes)(df, fmt)
+
+
+class ResultWriter:
+    """Append result chunks to a CSV, Parquet or Feather (Arrow IPC) file as they are computed."""
+
+    def __init__(self, path):
+        self.path = path
+        self.format = OUTPUT_FORMATS.get(os.path.splitext(str(path))[1].lower())
+        if self.format is None:
+            raise ValueError(f"Unsupported output '{path}', expected one of {sorted(OUTPUT_FORMATS)}")
+        self.rows = 0
+        # (first row, byte offset) of every CSV chunk, so pages can be read back with a seek.
+        self.offsets = []
+        self._file = None
+        self._arrow = None
+        self._schema = None
+
+    def write(self, chunk):
+        if self.format == "csv":
+            if self._file is None:
+                self._file = open(self.path, "w", encoding="utf-8", newline="")
+                chunk.iloc[:0].to_csv(self._file, index=False)
+            self._file.flush()
+            self.offsets.append((self.rows, self._file.tell()))
+            chunk.to_csv(self._file, header=False, index=False)
+        else:
+            table = to_arrow(chunk)
+            if self._arrow is None:
+                self._schema = table.schema
+                self._arrow = self._open_arrow(table.schema)
+            self._arrow.write_table(table.cast(self._schema))
+        self.rows += len(chunk)
+
+    def _open_arrow(self, schema):
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetWriter(self.path, schema)
+        import pyarrow as pa
+
+        return pa.ipc.new_file(self.path, schema)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._arrow is not None:
+            self._arrow.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -2,6 +2,11 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
+from incentive_sim.instrument import StageTimer, enable_json_logging, profiling_default
+from incentive_sim.region_payouts import compute_region_payouts, region_slices
+from incentive_sim.result_cache import RESULT_CACHE, fingerprint, memoize
+from incentive_sim.result_view import get_view, show_result_view
+
 st.set_page_config(page_title="Incentive Simulator", layout="wide")
 st.title("🌍 Multi-Region Incentive Payout Simulator")
 
@@ -9,6 +14,8 @@ st.markdown("""
 This simulator allows internal C&B teams to simulate incentive payouts across multiple countries or regions by entering hypothetical KPI achievements, multipliers, and weights.
 """)
 
+RESULT_FORMATS = {"Score": "{:.2f}", "Weighted Score": "{:.2f}", "Payout Component": "₹{:.2f}"}
+
 # --- Define Default KPI Table ---
 def get_default_kpi_table():
     return pd.DataFrame({
@@ -43,30 +50,42 @@ kpi_df = st.data_editor(
 # --- Filter for selected regions only ---
 kpi_df = kpi_df[kpi_df['Region'].isin(regions)]
 
-# --- Compute Payout Logic ---
-output = []
-for region in kpi_df['Region'].unique():
-    sub_df = kpi_df[kpi_df['Region'] == region].copy()
-    total_weight = sub_df["Weight %"].sum()
-
-    sub_df["Score"] = (sub_df["Achieved %"] / sub_df["Target %"]) * sub_df["Multiplier"]
-    sub_df["Weighted Score"] = sub_df["Score"] * (sub_df["Weight %"] / 100)
-    sub_df["Payout Component"] = sub_df["Weighted Score"] * region_target_map[region]
-    total_payout = sub_df["Payout Component"].sum()
+profile = st.sidebar.checkbox("⏱️ Profile stages", value=profiling_default())
+trace_memory = profile and st.sidebar.checkbox("Trace peak memory (slower)", value=False)
+if profile:
+    enable_json_logging()
+timer = StageTimer(enabled=profile, trace_memory=trace_memory, context={"app": "incentive_simulator_2"})
 
-    output.append((region, sub_df, total_weight, total_payout))
+# --- Compute Payout Logic ---
+with timer.stage("compute", rows=len(kpi_df)):
+    result, region_totals = memoize(compute_region_payouts)(kpi_df, region_target_map)
+st.sidebar.caption(RESULT_CACHE.summary())
 
 # --- Display Results ---
-for region, sub_df, total_weight, total_payout in output:
-    st.subheader(f"🌐 {region} – Payout Summary")
+with timer.stage("render", rows=len(result)):
+    for region in region_totals.index:
+        total_weight = region_totals.at[region, "Total KPI Weight"]
+        total_payout = region_totals.at[region, "Total Region Payout"]
+        st.subheader(f"🌐 {region} – Payout Summary")
+
+        if total_weight != 100:
+            st.warning(f"⚠️ Total KPI weight for {region} is {total_weight}%. It should be exactly 100%.")
 
-    if total_weight != 100:
-        st.warning(f"⚠️ Total KPI weight for {region} is {total_weight}%. It should be exactly 100%.")
+        st.success(f"✅ Total Projected Payout for {region}: ₹{total_payout:,.2f}")
 
-    st.dataframe(sub_df.style.format({
-        "Score": "{:.2f}",
-        "Weighted Score": "{:.2f}",
-        "Payout Component": "₹{:.2f}"
-    }), use_container_width=True)
+    # One table for the chosen region: its rows are a contiguous block of the result,
+    # so only that slice is viewed and only its visible page is formatted and sent
+    if len(region_totals):
+        version = fingerprint(result)
+        if st.session_state.get("region_slices_version") != version:
+            st.session_state.region_slices = region_slices(result)
+            st.session_state.region_slices_version = version
+        shown = st.selectbox("Show KPI rows for", list(region_totals.index), key="region_rows")
+        rows = result.iloc[st.session_state.region_slices[shown]]
+        show_result_view(get_view(st.session_state, "region_view", rows, (version, shown)), "region", formats=RESULT_FORMATS)
 
-    st.success(f"✅ Total Projected Payout for {region}: ₹{total_payout:,.2f}")
+# --- Stage timings (opt-in) ---
+if profile:
+    with st.sidebar.expander("⏱️ Stage timings", expanded=True):
+        st.dataframe(timer.frame(), hide_index=True, use_container_width=True)
+        st.caption(f"Total: {timer.total_seconds():.3f} s")
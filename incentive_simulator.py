@@ -1,36 +1,93 @@
+import io
+import os
+import tempfile
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
 
+from incentive_sim.accrual import ACCRUAL_COLUMNS, MONTHS, accrual_arrays, default_period_order, simulate_accrual
+from incentive_sim.budget_solver import bulk_budget_model, show_budget_solver
+from incentive_sim.bulk_loader import input_columns, projected_columns, read_bulk_table
+from incentive_sim.instrument import StageTimer, enable_json_logging, profiling_default
+from incentive_sim.jobs import DONE, JOB_STORE, attach_job, show_job, show_jobs
+from incentive_sim.payout_engine import simulate_payouts
+from incentive_sim.plan_compare import SlabPlan, compare_plans, load_plan_set
+from incentive_sim.result_view import get_view, show_result_view
+from incentive_sim.result_cache import RESULT_CACHE, fingerprint, memoize
+from incentive_sim.slab_plan import DEFAULT_PLAN, load_plan
+from incentive_sim.streaming import StreamedResult, stream_bulk_payouts
+from incentive_sim.writers import MIME_TYPES, cached_export, export_formats
+
+# Uploads above this size default to the chunked streaming pipeline
+STREAMING_THRESHOLD_BYTES = 50 * 1024 ** 2
+PAGE_SIZE = 500
+# Rows simulated between progress updates (and cancellation checks) of a background run
+JOB_CHUNK_ROWS = 100_000
+
+
+def _upload_copy(uploaded_file):
+    # Background jobs read their own copy, never the widget's file object.
+    source = io.BytesIO(uploaded_file.getvalue())
+    source.name = uploaded_file.name
+    return source
+
+
+def simulate_upload(job, uploaded_file, plan, project):
+    job.report(0.0, "Reading file")
+    with job.stage("read") as stage:
+        df = read_bulk_table(_upload_copy(uploaded_file), project=project)
+        stage["rows"] = len(df)
+    payouts, total = [], 0.0
+    with job.stage("simulate", rows=len(df)):
+        for start in range(0, len(df), JOB_CHUNK_ROWS):
+            payouts.append(simulate_payouts(df.iloc[start:start + JOB_CHUNK_ROWS], plan))
+            total += float(payouts[-1].sum())
+            done = min(start + JOB_CHUNK_ROWS, len(df))
+            job.report(done / len(df), f"{done:,} of {len(df):,} rows", partial={"rows": done, "total": total})
+    df['Simulated Payout'] = pd.concat(payouts) if payouts else pd.Series(dtype=float)
+    return df
+
+
+def stream_upload(job, uploaded_file, plan, project):
+    source = _upload_copy(uploaded_file)
+    size = max(len(source.getbuffer()), 1)
+    columns = projected_columns(input_columns(source)) if project else None
+    fd, path = tempfile.mkstemp(prefix="simulated_payouts_", suffix=".csv")
+    os.close(fd)
+    try:
+        with job.stage("stream_simulate") as stage:
+            result = stream_bulk_payouts(
+                source,
+                plan,
+                output_path=path,
+                progress=lambda rows: job.report(source.tell() / size, f"{rows:,} rows simulated"),
+                columns=columns,
+            )
+            stage["rows"] = result.rows
+        return result
+    except BaseException:
+        os.remove(path)
+        raise
+
 st.set_page_config(page_title="Incentive Simulator", layout="wide")
 st.title("💰 Incentive Payout Simulator for C&B Teams")
 
 # --- Sidebar for Mode Selection ---
-mode = st.sidebar.radio("Choose Input Mode", ["Single Employee Simulation", "Upload for Budgeting (Bulk)"])
-
-# --- Define Slab Function ---
-def get_multiplier(achievement):
-    if achievement < 90:
-        return 0
-    elif 90 <= achievement < 100:
-        return 1.0
-    elif 100 <= achievement < 110:
-        return 1.2
-    else:
-        return 1.5
-
-# --- Define Simulation Function ---
-def simulate_payout(row):
-    total_weighted_score = 0
-    for kpi in row['KPIs']:
-        ach = row[f"{kpi}_Achievement"]
-        weight = row[f"{kpi}_Weight"]
-        multiplier = get_multiplier(ach)
-        score = (ach / 100) * weight * multiplier
-        total_weighted_score += score
-    payout = row['Target Payout'] * total_weighted_score
-    return payout
+mode = st.sidebar.radio("Choose Input Mode", ["Single Employee Simulation", "Upload for Budgeting (Bulk)", "Time-Phased Accrual (Bulk)"])
+
+# --- Slab Plan (defaults to the standard 90/100/110 slabs) ---
+plan_file = st.sidebar.file_uploader("Slab Plan (YAML/CSV, optional)", type=["yaml", "yml", "csv"])
+plan = load_plan(plan_file) if plan_file else DEFAULT_PLAN
+st.sidebar.caption(f"Using slab plan: {plan.name}")
+st.sidebar.caption(RESULT_CACHE.summary())
+show_jobs()
+profile = st.sidebar.checkbox("⏱️ Profile stages", value=profiling_default())
+trace_memory = profile and st.sidebar.checkbox("Trace peak memory (slower)", value=False)
+if profile:
+    enable_json_logging()
+timer = StageTimer(enabled=profile, trace_memory=trace_memory, context={"app": "incentive_simulator", "mode": mode})
 
 # --- Mode 1: Single Employee Simulation ---
 if mode == "Single Employee Simulation":
@@ -57,7 +114,7 @@ if mode == "Single Employee Simulation":
     else:
         total_score = 0
         for kpi in kpi_data:
-            mult = get_multiplier(kpi['Achievement'])
+            mult = float(plan.multipliers(kpi['KPI'], kpi['Achievement']))
             score = (kpi['Achievement'] / 100) * kpi['Weight'] * mult
             total_score += score
         payout = target_payout * total_score
@@ -81,7 +138,7 @@ elif mode == "Upload for Budgeting (Bulk)":
     sample = pd.DataFrame({
         'Employee': ['John Doe', 'Jane Smith'],
         'Target Payout': [100000, 120000],
-        'KPIs': [['Revenue', 'Pipeline'], ['Revenue', 'Pipeline']],
+        'KPIs': ['Revenue|Pipeline', 'Revenue|Pipeline'],
         'Revenue_Achievement': [95, 110],
         'Revenue_Weight': [0.5, 0.6],
         'Pipeline_Achievement': [100, 105],
@@ -89,12 +146,186 @@ elif mode == "Upload for Budgeting (Bulk)":
     })
     st.download_button("📄 Download Sample Excel", data=sample.to_csv(index=False), file_name="sample_simulation.csv")
 
-    uploaded_file = st.file_uploader("Upload CSV File", type=["csv"])
+    uploaded_file = st.file_uploader("Upload CSV, Parquet or Feather File", type=["csv", "parquet", "feather", "arrow"])
     if uploaded_file:
-        df = pd.read_csv(uploaded_file, converters={"KPIs": eval})
-        df['Simulated Payout'] = df.apply(simulate_payout, axis=1)
-        st.dataframe(df)
+        project = st.checkbox("Load only payout columns (Employee, Target Payout, KPIs, <KPI>_*)", value=True)
+        streaming = st.checkbox(
+            "Stream in chunks (constant memory, for very large files)",
+            value=uploaded_file.size > STREAMING_THRESHOLD_BYTES,
+        )
+        # Runs in the background: widget changes rerun the page without restarting it, and the
+        # same file contents and plan from any session reattach to the same job. The upload is
+        # hashed once; reruns reuse the digest until a new file is uploaded.
+        upload_id = getattr(uploaded_file, "file_id", (uploaded_file.name, uploaded_file.size))
+        if st.session_state.get("upload_digest", (None,))[0] != upload_id:
+            with uploaded_file.getbuffer() as data:
+                st.session_state.upload_digest = (upload_id, fingerprint(data))
+        run_key = ("bulk", st.session_state.upload_digest[1], fingerprint(plan), project, streaming)
+        job = attach_job(
+            st.session_state, "bulk_job", stream_upload if streaming else simulate_upload, uploaded_file, plan, project,
+            key=run_key, name=f"Bulk run: {uploaded_file.name}", cleanup=StreamedResult.remove if streaming else None,
+            timer=StageTimer(enabled=profile, trace_memory=trace_memory, context={**timer.context, "job": uploaded_file.name}),
+        )
+    else:
+        finished = [j for j in JOB_STORE.jobs() if j.state == DONE and isinstance(j.key, tuple) and j.key[0] == "bulk"]
+        job = st.selectbox("…or reattach to a finished run", [None] + finished, format_func=lambda j: "—" if j is None else f"{j.name} ({j.id})")
+    result = show_job(job, "bulk_job", partial=lambda p: st.metric("Running Total", f"₹{p['total']:,.0f}", f"{p['rows']:,} rows")) if job or uploaded_file else None
+
+    if isinstance(result, pd.DataFrame):
+        df = result
+        with timer.stage("render", rows=len(df)):
+            show_result_view(get_view(st.session_state, "bulk_view", df, job.id), "bulk", formats={"Simulated Payout": "₹{:,.0f}"})
 
         st.metric("📊 Total Projected Budget", f"₹{df['Simulated Payout'].sum():,.0f}")
-        csv = df.to_csv(index=False).encode('utf-8')
-        st.download_button("⬇️ Download Results", csv, "simulated_payouts.csv", "text/csv")
+        # Results are serialized only when a download is requested, then reused by content hash
+        fmt = st.selectbox("Download Format", export_formats(len(df)))
+        if st.button("📦 Prepare Download"):
+            with timer.stage(f"export_{fmt}", rows=len(df)):
+                try:
+                    data = cached_export(df, fmt)
+                except (ValueError, ImportError) as e:
+                    data = None
+                    st.error(f"⚠️ Could not export {fmt.upper()}: {e}")
+            if data is not None:
+                st.download_button("⬇️ Download Results", data, f"simulated_payouts.{fmt}", MIME_TYPES[fmt])
+
+        with st.expander("🎯 Budget Goal-Seek"):
+            st.caption("Solve the slab multipliers, or a scale on all of them, for a target total payout.")
+            # Keyed on the job rather than hashed from the result frame, which costs ~0.2 s per rerun at 1M rows.
+            budget_key = (job.id, fingerprint(plan))
+            if st.session_state.get("budget_model_key") != budget_key:
+                st.session_state.budget_model = bulk_budget_model(df, plan)
+                st.session_state.budget_model_key = budget_key
+            show_budget_solver(st.session_state.budget_model, "goal_seek", df['Simulated Payout'].sum())
+
+        # --- Plan comparison: the current slab plan against any number of alternatives ---
+        with st.expander("⚖️ Compare Plans"):
+            plan_set_files = st.file_uploader(
+                "Alternative plans (YAML plan sets with a 'plans:' list, or slab plan files)",
+                type=["yaml", "yml", "csv"],
+                accept_multiple_files=True,
+            )
+            if plan_set_files:
+                # Recomputed only for a new run, plan or plan set; other widget changes reuse it.
+                compare_key = (job.id, fingerprint(plan), tuple(getattr(f, "file_id", (f.name, f.size)) for f in plan_set_files))
+                if st.session_state.get("comparison_key") != compare_key:
+                    alternatives = [p for f in plan_set_files for p in load_plan_set(f)]
+                    with timer.stage("compare", rows=len(df) * (len(alternatives) + 1)):
+                        st.session_state.comparison = compare_plans(df, [SlabPlan(plan)] + alternatives)
+                    st.session_state.comparison_key = compare_key
+                comparison = st.session_state.comparison
+                summary = comparison.summary()
+                st.dataframe(summary.style.format("{:,.0f}").format("{:+.1f}%", subset=["Δ %"]).format("{:.1f}%", subset=["Zero Payout %"]), use_container_width=True)
+                dist = comparison.distribution().reset_index().melt("Payout", var_name="Plan", value_name="Employees")
+                chart = alt.Chart(dist).mark_line(interpolate="step-after").encode(
+                    x=alt.X("Payout", title="Payout (₹)"),
+                    y="Employees",
+                    color="Plan",
+                ).properties(height=300)
+                st.altair_chart(chart, use_container_width=True)
+
+    elif isinstance(result, StreamedResult):
+        # Results live in a temp file written chunk by chunk; reruns (paging, downloads) read it back
+        streamed = result
+        col1, col2, col3 = st.columns(3)
+        col1.metric("📊 Total Projected Budget", f"₹{streamed.total_payout:,.0f}")
+        col2.metric("👥 Employees", f"{streamed.rows:,}")
+        col3.metric("Average Payout", f"₹{streamed.mean_payout:,.0f}")
+
+        page_count = max(1, -(-streamed.rows // PAGE_SIZE))
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1)
+        with timer.stage("render_page", rows=PAGE_SIZE):
+            st.dataframe(streamed.page((page - 1) * PAGE_SIZE, PAGE_SIZE))
+        st.caption(f"Page {page} of {page_count:,} ({PAGE_SIZE} rows per page)")
+
+        # A download button holds its data in memory, so large results are offered in parts
+        # read straight from the result file, one part per request, only in this session.
+        parts = streamed.parts()
+        part = 0
+        if len(parts) > 1:
+            part = st.selectbox(
+                "Download Part", range(len(parts)), key="streamed_part",
+                format_func=lambda i: f"Part {i + 1} of {len(parts)}: rows {parts[i][0] + 1:,}–{parts[i][1]:,}",
+            )
+        if parts and st.button("📦 Prepare Download"):
+            with timer.stage("read_part", rows=parts[part][1] - parts[part][0]):
+                data = streamed.read_part(parts[part])
+            name = "simulated_payouts.csv" if len(parts) == 1 else f"simulated_payouts_part{part + 1}.csv"
+            st.download_button("⬇️ Download Results", data, name, "text/csv")
+
+# --- Mode 3: Time-Phased Accrual ---
+elif mode == "Time-Phased Accrual (Bulk)":
+    st.subheader("🗓️ Monthly Accrual with True-ups")
+    sample = pd.DataFrame({
+        'Employee': ['John Doe'] * 4,
+        'Period': ['Jan', 'Jan', 'Feb', 'Feb'],
+        'KPI': ['Revenue', 'Pipeline', 'Revenue', 'Pipeline'],
+        'Achievement %': [95, 100, 110, 105],
+        'Weight': [0.6, 0.4, 0.6, 0.4],
+        'Target Payout': [100000] * 4,
+    })[ACCRUAL_COLUMNS]
+    st.download_button("📄 Download Sample CSV", data=sample.to_csv(index=False), file_name="sample_accrual.csv")
+
+    accrual_file = st.file_uploader("Upload Employee x KPI x Period CSV", type=["csv"], key="accrual_file")
+    cadence = {"Monthly": 1, "Quarterly": 3, "Half-yearly": 6, "Annual": 12}
+    true_up = st.selectbox("True-up Frequency (periods)", list(cadence), index=1)
+    annual_cap = st.number_input("Annual Cap (× target payout, 0 for none)", min_value=0.0, value=2.0, step=0.1)
+    if accrual_file:
+        with timer.stage("read") as stage:
+            long = pd.read_csv(accrual_file)
+            stage["rows"] = len(long)
+
+        # Order of appearance in the file is not the order of the year, and a YTD file is not the whole year
+        order = default_period_order(long["Period"])
+        order_text = st.text_input("Period Order (first to last, comma-separated)", ", ".join(map(str, order)), key=f"accrual_order_{accrual_file.file_id}")
+        periods = list(dict.fromkeys(label.strip() for label in order_text.split(",") if label.strip()))
+        months = all(str(label)[:3].title() in MONTHS for label in order)
+        if not periods:
+            st.warning("Enter the period order to accrue.")
+            st.stop()
+        periods_per_year = st.number_input(
+            "Periods in the Plan Year", min_value=len(periods), value=max(len(periods), 12 if months else len(periods)), step=1,
+            help="More periods than the file has means the file is year-to-date: entitlement is pro-rated to the year elapsed.",
+        )
+        st.caption(f"{len(periods)} of {periods_per_year} periods; the annual target and cap cover all {periods_per_year}.")
+        with timer.stage("accrue", rows=len(long)):
+            try:
+                inputs = memoize(accrual_arrays)(long.astype({"Period": str}), periods=periods)
+            except ValueError as e:
+                st.error(f"⚠️ {e}")
+                st.stop()
+            schedule = simulate_accrual(
+                plan=plan, true_up_every=cadence[true_up], annual_cap=annual_cap or None,
+                periods_per_year=periods_per_year, **inputs,
+            )
+            totals = schedule.period_totals()
+
+        st.metric("📊 Annual Booked Payout" if len(periods) == periods_per_year else "📊 Booked Payout YTD", f"₹{totals['Booked YTD'].iloc[-1]:,.0f}")
+        chart_df = totals.reset_index().assign(Period=lambda d: d["Period"].astype(str))
+        bars = alt.Chart(chart_df).mark_bar().encode(x=alt.X('Period', sort=None), y='Accrual', color=alt.Color('True-up'))
+        line = alt.Chart(chart_df).mark_line(point=True, color='black').encode(x=alt.X('Period', sort=None), y='Booked YTD')
+        st.altair_chart(alt.layer(bars, line).resolve_scale(y='independent').properties(height=300), use_container_width=True)
+        st.dataframe(totals.style.format({"Accrual": "₹{:,.0f}", "Booked YTD": "₹{:,.0f}", "Entitlement YTD": "₹{:,.0f}"}), use_container_width=True)
+
+        fmt = st.selectbox("Download Format", export_formats(len(schedule.employees)), key="accrual_format")
+        if st.button("📦 Prepare Download", key="accrual_download"):
+            accruals = schedule.employee_accruals()
+            accruals.columns = accruals.columns.astype(str)
+            with timer.stage(f"export_{fmt}", rows=len(accruals)):
+                try:
+                    data = cached_export(accruals.reset_index(), fmt)
+                except (ValueError, ImportError) as e:
+                    data = None
+                    st.error(f"⚠️ Could not export {fmt.upper()}: {e}")
+            if data is not None:
+                st.download_button("⬇️ Download Employee Accruals", data, f"accruals.{fmt}", MIME_TYPES[fmt])
+
+# --- Stage timings (opt-in) ---
+if profile:
+    with st.sidebar.expander("⏱️ Stage timings", expanded=True):
+        st.dataframe(timer.frame(), hide_index=True, use_container_width=True)
+        st.caption(f"Total: {timer.total_seconds():.3f} s")
+        bulk_job = JOB_STORE.get(st.session_state.get("bulk_job"))
+        if bulk_job is not None and bulk_job.timer is not None and bulk_job.timer.records:
+            st.caption(f"Background job stages ({bulk_job.name})")
+            st.dataframe(bulk_job.timer.frame(), hide_index=True, use_container_width=True)
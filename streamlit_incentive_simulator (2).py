@@ -1,7 +1,15 @@
 # 💻 Streamlit App – Advanced Incentive Simulation Tool
 
+import altair as alt
+import numpy as np
 import streamlit as st
 
+from incentive_sim.budget_solver import BonusPenaltyModel, show_budget_solver
+from incentive_sim.instrument import StageTimer, enable_json_logging, profiling_default
+from incentive_sim.result_cache import RESULT_CACHE, memoize
+from incentive_sim.sweep import ParameterSweep, bonus_penalty_payout
+from incentive_sim.writers import MIME_TYPES, cached_export, export_formats
+
 st.set_page_config(page_title="Advanced Incentive Simulator", layout="centered")
 st.title("📊 Advanced Incentive Payout Simulator")
 
@@ -27,20 +35,19 @@ bonus_amount = st.number_input("Bonus Amount per Employee (₹)", min_value=0.0,
 underperformance_penalty = st.number_input("Penalty Deduction for Underperformance (₹)", min_value=0.0, value=5000.0, step=1000.0)
 penalty_threshold = st.slider("Penalty Applies Below (%)", min_value=50, max_value=90, value=75)
 
-if st.button("Run Simulation"):
-    multiplier = avg_score / 100
-    payout_per_employee = base_incentive * multiplier
-
-    # Apply bonus if above bonus threshold
-    if avg_score >= threshold_bonus_score:
-        payout_per_employee += bonus_amount
-
-    # Apply penalty if below penalty threshold
-    if avg_score < penalty_threshold:
-        payout_per_employee -= underperformance_penalty
-        payout_per_employee = max(0, payout_per_employee)  # No negative payout
+profile = st.sidebar.checkbox("⏱️ Profile stages", value=profiling_default())
+trace_memory = profile and st.sidebar.checkbox("Trace peak memory (slower)", value=False)
+if profile:
+    enable_json_logging()
+timer = StageTimer(enabled=profile, trace_memory=trace_memory, context={"app": "streamlit_incentive_simulator_2"})
 
-    total_payout = payout_per_employee * total_employees
+if st.button("Run Simulation"):
+    with timer.stage("simulate", rows=total_employees):
+        payout_per_employee = float(bonus_penalty_payout(
+            avg_score, base_incentive, threshold_bonus_score,
+            bonus_amount, underperformance_penalty, penalty_threshold,
+        ))
+        total_payout = payout_per_employee * total_employees
 
     # Output Results
     st.success("✅ Simulation Complete")
@@ -54,3 +61,92 @@ if st.button("Run Simulation"):
     - **− Penalty ₹{underperformance_penalty:,.0f}** if Avg Score < {penalty_threshold}%
     - **Total Payout** = Adjusted Payout per Employee × Total Employees
     """)
+
+# Reverse solve: which parameter value keeps total spend at the target budget
+st.header("🎯 Budget Goal-Seek")
+with st.expander("Solve scheme parameters for a target total payout"):
+    budget_model = BonusPenaltyModel(
+        avg_score, base_incentive, threshold_bonus_score, bonus_amount,
+        underperformance_penalty, penalty_threshold, employees=total_employees,
+    )
+    show_budget_solver(budget_model, "goal_seek", budget_model.total())
+
+# Sensitivity sweep over the full parameter grid
+st.header("📈 Sensitivity Sweep")
+with st.expander("Sweep payout across score, bonus and penalty thresholds"):
+    score_range = st.slider("Average Score Range (%)", 0.0, 200.0, (0.0, 200.0), step=1.0)
+    bonus_range = st.slider("Bonus Threshold Range (%)", 80, 120, (80, 120))
+    penalty_range = st.slider("Penalty Threshold Range (%)", 50, 90, (50, 90))
+    bonus_amount_range = st.slider("Bonus Amount Range (₹)", 0.0, max(50000.0, bonus_amount), (bonus_amount, bonus_amount), step=1000.0)
+    penalty_amount_range = st.slider("Penalty Amount Range (₹)", 0.0, max(50000.0, underperformance_penalty), (underperformance_penalty, underperformance_penalty), step=1000.0)
+    score_points = st.number_input("Score Grid Points", min_value=2, max_value=1000, value=100)
+    threshold_points = st.number_input("Threshold Grid Points", min_value=2, max_value=200, value=40)
+    amount_points = st.number_input("Amount Grid Points", min_value=1, max_value=50, value=5)
+
+    with timer.stage("sweep") as stage:
+        sweep = memoize(ParameterSweep)(
+            avg_score=np.linspace(*score_range, score_points),
+            threshold_bonus_score=np.linspace(*bonus_range, threshold_points),
+            penalty_threshold=np.linspace(*penalty_range, threshold_points),
+            bonus_amount=np.unique(np.linspace(*bonus_amount_range, amount_points)),
+            underperformance_penalty=np.unique(np.linspace(*penalty_amount_range, amount_points)),
+            base_incentive=base_incentive,
+            total_employees=total_employees,
+        )
+        stage["rows"] = sweep.total_payout.size
+    current = {
+        "avg_score": avg_score,
+        "threshold_bonus_score": threshold_bonus_score,
+        "penalty_threshold": penalty_threshold,
+        "bonus_amount": bonus_amount,
+        "underperformance_penalty": underperformance_penalty,
+        "base_incentive": base_incentive,
+        "total_employees": total_employees,
+    }
+
+    st.subheader("Total Payout by Avg Score and Bonus Threshold")
+    st.caption(f"Penalty threshold, bonus and penalty amounts held at the current inputs ({penalty_threshold}%, ₹{bonus_amount:,.0f}, ₹{underperformance_penalty:,.0f}).")
+    with timer.stage("heatmap"):
+        heat = sweep.heatmap("avg_score", "threshold_bonus_score", at=current).stack().rename("total_payout").reset_index()
+    st.altair_chart(alt.Chart(heat).mark_rect().encode(
+        x=alt.X("avg_score:Q", bin=alt.Bin(maxbins=60), title="Avg Score (%)"),
+        y=alt.Y("threshold_bonus_score:Q", bin=alt.Bin(maxbins=40), title="Bonus Threshold (%)"),
+        color=alt.Color("mean(total_payout):Q", title="Total Payout (₹)"),
+    ), use_container_width=True)
+
+    st.subheader("Sensitivity Around Current Inputs")
+    with timer.stage("tornado"):
+        tornado = sweep.tornado(current)
+    bars = tornado.melt(id_vars=["Parameter", "Base Payout"], value_vars=["Payout at Low", "Payout at High"], var_name="End", value_name="Payout")
+    st.altair_chart(alt.Chart(bars).mark_bar().encode(
+        y=alt.Y("Parameter:N", sort=list(tornado["Parameter"])),
+        x=alt.X("Payout:Q", title="Total Payout (₹)"),
+        x2="Base Payout:Q",
+        color="End:N",
+    ), use_container_width=True)
+    st.dataframe(tornado, use_container_width=True)
+
+    # The full sweep grid is only flattened and serialized when a download is requested
+    fmt = st.selectbox("Download Format", export_formats(sweep.total_payout.size))
+    if st.button("📦 Prepare Sweep Download"):
+        with timer.stage(f"export_{fmt}", rows=sweep.total_payout.size):
+            try:
+                data = cached_export(sweep.to_frame(), fmt)
+            except (ValueError, ImportError) as e:
+                data = None
+                st.error(f"⚠️ Could not export {fmt.upper()}: {e}")
+        if data is not None:
+            st.download_button(
+                label=f"⬇️ Download Sweep Grid as {fmt.upper()}",
+                data=data,
+                file_name=f"bonus_penalty_sweep.{fmt}",
+                mime=MIME_TYPES[fmt],
+            )
+
+st.caption(RESULT_CACHE.summary())
+
+# --- Stage timings (opt-in) ---
+if profile:
+    with st.sidebar.expander("⏱️ Stage timings", expanded=True):
+        st.dataframe(timer.frame(), hide_index=True, use_container_width=True)
+        st.caption(f"Total: {timer.total_seconds():.3f} s")
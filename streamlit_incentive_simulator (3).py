@@ -2,6 +2,9 @@
 
 import streamlit as st
 
+from incentive_sim.instrument import StageTimer, enable_json_logging, profiling_default
+from incentive_sim.slab_plan import load_plan
+
 st.set_page_config(page_title="Client KPI Incentive Simulator", layout="centered")
 st.title("📊 KPI-Based Incentive Payout Simulator")
 
@@ -17,6 +20,15 @@ This is ideal for C&B teams to simulate payouts using hypothetical values.
 st.header("📥 Input Parameters")
 total_employees = st.number_input("Total Eligible Employees", min_value=0, max_value=10000, value=100, step=1)
 base_incentive = st.number_input("Base Incentive per Employee (₹)", min_value=0.0, value=50000.0, step=1000.0)
+profile = st.sidebar.checkbox("⏱️ Profile stages", value=profiling_default())
+trace_memory = profile and st.sidebar.checkbox("Trace peak memory (slower)", value=False)
+if profile:
+    enable_json_logging()
+timer = StageTimer(enabled=profile, trace_memory=trace_memory, context={"app": "streamlit_incentive_simulator_3"})
+
+plan_file = st.file_uploader("Client Multiplier Grid (YAML/CSV, optional)", type=["yaml", "yml", "csv"])
+with timer.stage("load_plan"):
+    plan = load_plan(plan_file) if plan_file else None
 
 st.subheader("KPI Performance and Multipliers")
 
@@ -26,19 +38,24 @@ kpi_names = ["KPI 1", "KPI 2", "KPI 3", "KPI 4"]
 for i, kpi in enumerate(kpi_names):
     st.markdown(f"### {kpi}")
     perf = st.number_input(f"Average Performance Score for {kpi} (%)", min_value=0.0, max_value=200.0, value=90.0, step=0.5, key=f"perf_{i}")
-    multiplier = st.number_input(f"Multiplier for {kpi} (based on client grid)", min_value=0.0, max_value=5.0, value=1.0, step=0.1, key=f"multiplier_{i}")
+    if plan is not None:
+        multiplier = float(plan.multipliers(kpi, perf))
+        st.caption(f"Multiplier for {kpi} from {plan.name}: {multiplier:.2f}")
+    else:
+        multiplier = st.number_input(f"Multiplier for {kpi} (based on client grid)", min_value=0.0, max_value=5.0, value=1.0, step=0.1, key=f"multiplier_{i}")
     kpi_inputs.append({"performance": perf, "multiplier": multiplier})
 
 if st.button("Run Simulation"):
-    total_payout_per_employee = 0
-    kpi_details = []
+    with timer.stage("simulate", rows=len(kpi_inputs)):
+        total_payout_per_employee = 0
+        kpi_details = []
 
-    for i, kpi in enumerate(kpi_inputs):
-        component_payout = base_incentive * (kpi["performance"] / 100) * kpi["multiplier"] / len(kpi_names)
-        total_payout_per_employee += component_payout
-        kpi_details.append((kpi_names[i], component_payout))
+        for i, kpi in enumerate(kpi_inputs):
+            component_payout = base_incentive * (kpi["performance"] / 100) * kpi["multiplier"] / len(kpi_names)
+            total_payout_per_employee += component_payout
+            kpi_details.append((kpi_names[i], component_payout))
 
-    total_projected_payout = total_payout_per_employee * total_employees
+        total_projected_payout = total_payout_per_employee * total_employees
 
     st.success("✅ Simulation Complete")
     st.metric(label="Total Payout per Employee (₹)", value=f"₹ {total_payout_per_employee:,.2f}")
@@ -55,3 +72,9 @@ if st.button("Run Simulation"):
     - **Total Payout per Employee** = Sum of all KPI payouts
     - **Total Projected Payout** = Total per employee × Total eligible employees
     """)
+
+# --- Stage timings (opt-in) ---
+if profile:
+    with st.sidebar.expander("⏱️ Stage timings", expanded=True):
+        st.dataframe(timer.frame(), hide_index=True, use_container_width=True)
+        st.caption(f"Total: {timer.total_seconds():.3f} s")
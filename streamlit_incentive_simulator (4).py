@@ -3,6 +3,10 @@
 import streamlit as st
 import pandas as pd
 
+from incentive_sim.instrument import StageTimer, enable_json_logging, profiling_default
+from incentive_sim.kpi_table import kpi_component_payouts
+from incentive_sim.slab_plan import load_plan
+
 st.set_page_config(page_title="Client KPI Incentive Simulator", layout="centered")
 st.title("📊 Weighted KPI-Based Incentive Payout Simulator")
 
@@ -18,6 +22,15 @@ Useful for C&B teams to test various hypothetical scenarios.
 # Input Parameters
 total_employees = st.number_input("Total Eligible Employees", min_value=0, max_value=10000, value=100, step=1)
 base_incentive = st.number_input("Base Incentive per Employee (₹)", min_value=0.0, value=50000.0, step=1000.0)
+profile = st.sidebar.checkbox("⏱️ Profile stages", value=profiling_default())
+trace_memory = profile and st.sidebar.checkbox("Trace peak memory (slower)", value=False)
+if profile:
+    enable_json_logging()
+timer = StageTimer(enabled=profile, trace_memory=trace_memory, context={"app": "streamlit_incentive_simulator_4"})
+
+plan_file = st.file_uploader("Client Multiplier Grid (YAML/CSV, optional)", type=["yaml", "yml", "csv"])
+with timer.stage("load_plan"):
+    plan = load_plan(plan_file) if plan_file else None
 
 # KPI Table Setup
 st.subheader("🔢 KPI Performance Table")
@@ -30,21 +43,16 @@ kpi_data = pd.DataFrame({
 
 edited_data = st.data_editor(kpi_data, use_container_width=True, num_rows="fixed")
 
+# Multipliers come from the client grid when one is uploaded
+if plan is not None:
+    edited_data["Multiplier"] = plan.multipliers_for(edited_data["KPI"], edited_data["Performance %"])
+
 # Run Simulation
 if st.button("Run Simulation"):
-    kpi_details = []
-    total_weight = sum(edited_data["Weightage %"])
-    payout_per_employee = 0
-
-    for _, row in edited_data.iterrows():
-        kpi_name = row["KPI"]
-        perf = row["Performance %"]
-        multiplier = row["Multiplier"]
-        weight = row["Weightage %"] / total_weight  # Normalize weight
-
-        payout = base_incentive * (perf / 100) * multiplier * weight
-        kpi_details.append((kpi_name, payout))
-        payout_per_employee += payout
+    with timer.stage("simulate", rows=len(edited_data)):
+        components = kpi_component_payouts(edited_data, base_incentive)
+        kpi_details = list(zip(edited_data["KPI"], components))
+        payout_per_employee = components.sum()
 
     total_projected_payout = payout_per_employee * total_employees
 
@@ -64,3 +72,9 @@ if st.button("Run Simulation"):
     - **Total per Employee** = Sum of all KPI payouts
     - **Total Projected** = Total per employee × Eligible employees
     """)
+
+# --- Stage timings (opt-in) ---
+if profile:
+    with st.sidebar.expander("⏱️ Stage timings", expanded=True):
+        st.dataframe(timer.frame(), hide_index=True, use_container_width=True)
+        st.caption(f"Total: {timer.total_seconds():.3f} s")
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from incentive_sim.accrual import accrual_arrays, default_period_order, simulate_accrual
+from incentive_sim.payout_engine import get_multiplier
+
+
+def period_loop(achievement, weight, target, share, true_up_every, annual_cap):
+    """Period-by-period reference of `simulate_accrual` for one employee; `share` covers the whole year."""
+    k, t = achievement.shape
+    year = len(share)
+    share = np.asarray(share, dtype=float) / np.sum(share)
+    cap = np.inf if annual_cap is None else annual_cap * target
+    booked, out = 0.0, []
+    weighted, elapsed = np.zeros(k), 0.0
+    for p in range(t):
+        weighted += achievement[:, p] * share[p]
+        elapsed += share[p]
+        ytd = weighted / elapsed
+        entitlement = min(sum(weight[j] * ytd[j] / 100 * get_multiplier(ytd[j]) for j in range(k)) * elapsed * target, cap)
+        if (p + 1) % true_up_every == 0 or p == year - 1:
+            booked = entitlement
+        else:
+            booked = min(booked + sum(share[p] * achievement[j, p] * weight[j] / 100 for j in range(k)) * target, cap)
+        out.append(booked)
+    return np.asarray(out)
+
+
+@pytest.mark.parametrize("true_up_every, annual_cap, share", [
+    (3, None, None),
+    (1, None, None),
+    (4, 1.2, None),
+    (2, 1.5, [1, 1, 2, 2, 1, 1, 3, 1, 1, 1, 2, 1]),
+])
+def test_accrual_matches_period_loop(true_up_every, annual_cap, share):
+    rng = np.random.default_rng(true_up_every)
+    n, k, t = 40, 3, 12
+    achievement = rng.normal(100, 20, (n, k, t)).clip(0)
+    weight = rng.dirichlet(np.ones(k), n)
+    target = rng.uniform(50_000, 150_000, n)
+    schedule = simulate_accrual(achievement, weight, target, period_share=share, true_up_every=true_up_every, annual_cap=annual_cap)
+    share = np.ones(t) if share is None else share
+    for i in range(n):
+        booked = period_loop(achievement[i], weight[i], target[i], share, true_up_every, annual_cap)
+        np.testing.assert_allclose(schedule.booked[i], booked, rtol=1e-9)
+        np.testing.assert_allclose(schedule.accrual[i], np.diff(booked, prepend=0.0), rtol=1e-9, atol=1e-6)
+
+
+def test_accrual_arrays_follow_the_given_period_order():
+    df = pd.DataFrame({
+        "Employee": ["A", "A", "A", "B"],
+        "Period": ["Feb", "Jan", "Mar", "Jan"],
+        "KPI": ["Revenue"] * 4,
+        "Achievement %": [110.0, 90.0, 100.0, 120.0],
+        "Weight": [1.0] * 4,
+        "Target Payout": [1000.0, 1000.0, 1000.0, 2000.0],
+    })
+    inputs = accrual_arrays(df, periods=["Jan", "Feb", "Mar"])
+    assert inputs["periods"] == ["Jan", "Feb", "Mar"]
+    np.testing.assert_array_equal(inputs["achievement"][0, 0], [90.0, 110.0, 100.0])
+    # B has no Feb or Mar rows; those periods count as 0%.
+    np.testing.assert_array_equal(inputs["achievement"][1, 0], [120.0, 0.0, 0.0])
+    with pytest.raises(ValueError, match="Apr"):
+        accrual_arrays(df.assign(Period=["Apr", "Jan", "Feb", "Jan"]), periods=["Jan", "Feb", "Mar"])
+
+
+@pytest.mark.parametrize("true_up_every, annual_cap, periods_per_year, share", [
+    (3, None, 12, None),
+    (4, 0.4, 12, None),
+    (2, None, None, [1, 1, 2, 2, 1, 1, 3, 1, 1, 1, 2, 1]),
+])
+def test_year_to_date_accrual_matches_period_loop(true_up_every, annual_cap, periods_per_year, share):
+    rng = np.random.default_rng(7)
+    n, k, t = 30, 2, 5
+    achievement = rng.normal(110, 20, (n, k, t)).clip(0)
+    weight = rng.dirichlet(np.ones(k), n)
+    target = rng.uniform(50_000, 150_000, n)
+    schedule = simulate_accrual(
+        achievement, weight, target, period_share=share, true_up_every=true_up_every,
+        annual_cap=annual_cap, periods_per_year=periods_per_year,
+    )
+    share = np.ones(periods_per_year) if share is None else share
+    for i in range(n):
+        booked = period_loop(achievement[i], weight[i], target[i], share, true_up_every, annual_cap)
+        np.testing.assert_allclose(schedule.booked[i], booked, rtol=1e-9)
+
+
+def test_year_to_date_is_pro_rated_to_the_year():
+    achievement = np.full((1, 1, 3), 105.0)
+    full = simulate_accrual(achievement, [[1.0]], [120_000.0], true_up_every=3)
+    ytd = simulate_accrual(achievement, [[1.0]], [120_000.0], true_up_every=3, periods_per_year=12)
+    # At 105% the full-year entitlement is 1.05 x 1.2 x target; three months of twelve earn a quarter of it.
+    assert full.booked[0, -1] == pytest.approx(151_200.0)
+    assert ytd.booked[0, -1] == pytest.approx(37_800.0)
+    # The last YTD period is a true-up only when the cadence says so.
+    assert list(simulate_accrual(achievement, [[1.0]], [1.0], true_up_every=6, periods_per_year=12).true_up) == [False] * 3
+
+
+def test_year_length_must_cover_the_periods():
+    with pytest.raises(ValueError, match="12-period year"):
+        simulate_accrual(np.ones((1, 1, 13)), [[1.0]], [1.0], periods_per_year=12)
+    with pytest.raises(ValueError, match="4 entries"):
+        simulate_accrual(np.ones((1, 1, 3)), [[1.0]], [1.0], period_share=[1, 1, 1, 1], periods_per_year=12)
+
+
+def test_default_period_order():
+    assert default_period_order(["Mar", "Jan", "Feb", "Jan"]) == ["Jan", "Feb", "Mar"]
+    assert default_period_order(["October", "april"]) == ["april", "October"]
+    assert default_period_order([10, 2, 1]) == [1, 2, 10]
+    assert default_period_order(["2024-02", "2024-01"]) == ["2024-01", "2024-02"]
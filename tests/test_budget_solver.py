@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from incentive_sim.budget_solver import bulk_budget_model, cb_budget_model, solve_budget
+from incentive_sim.cb_grid import PayoutGrid, build_grid
+from incentive_sim.payout_engine import simulate_payouts
+from incentive_sim.slab_plan import DEFAULT_PLAN, IncentivePlan
+from incentive_sim.synthetic import make_workforce
+
+CAPPED_PLAN = IncentivePlan.from_dict({
+    "name": "Capped",
+    "default": {
+        "slabs": [{"from": 90, "multiplier": 1.0, "accelerator": 0.1}, {"from": 110, "multiplier": 1.5}],
+        "floor": 0.5,
+        "cap": 2.0,
+    },
+})
+
+
+def capped_grid(plan):
+    base, headcount = build_grid(["India", "USA"], ["Field Sales"], ["B3", "B4"], {"Revenue": 40, "Pipeline": 30, "CSAT": 30})
+    base["Achieved %"] = np.linspace(80, 140, len(base))
+    return PayoutGrid(base, 100_000, plan, headcount=headcount)
+
+
+@pytest.mark.parametrize("plan", [None, DEFAULT_PLAN, CAPPED_PLAN])
+def test_cb_model_matches_grid_total(plan):
+    grid = capped_grid(plan)
+    assert cb_budget_model(grid.frame, 100_000, plan).total() == pytest.approx(grid.grand_total)
+
+
+def test_cb_model_scales_payout_after_cap():
+    grid = capped_grid(CAPPED_PLAN)
+    model = cb_budget_model(grid.frame, 100_000, CAPPED_PLAN)
+    assert model.total(target_incentive=200_000) == pytest.approx(2 * grid.grand_total)
+
+
+@pytest.mark.parametrize("plan", [DEFAULT_PLAN, CAPPED_PLAN])
+def test_bulk_model_matches_simulate_payouts(plan):
+    df = make_workforce(2_000, seed=7)
+    assert bulk_budget_model(df, plan).total() == pytest.approx(simulate_payouts(df, plan).sum())
+
+
+def test_solved_target_incentive_meets_budget():
+    grid = capped_grid(CAPPED_PLAN)
+    model = cb_budget_model(grid.frame, 100_000, CAPPED_PLAN)
+    solution = solve_budget(model, 1.5 * grid.grand_total, ["target_incentive"])
+    assert solution.converged
+    assert solution.parameters["target_incentive"] == pytest.approx(150_000, rel=1e-6)
+    assert solution.total <= 1.5 * grid.grand_total
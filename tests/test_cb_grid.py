@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from incentive_sim.cb_grid import PayoutGrid, build_grid
+from incentive_sim.slab_plan import DEFAULT_PLAN
+
+KPI_WEIGHTS = {"Revenue": 40, "Pipeline": 30, "CSAT": 30}
+NEW_ROW = {"Region": "USA", "Role": "Field Sales", "Band": "B4", "KPI": "Revenue",
+           "Target %": 100, "Achieved %": 105, "Weight %": 40, "Multiplier": 1.0}
+
+
+def make_grid(plan=None):
+    base, headcount = build_grid(["India", "Europe"], ["Field Sales", "Inside Sales"], ["B3", "B4"], KPI_WEIGHTS, employees=10)
+    base["Achieved %"] = np.linspace(80, 130, len(base))
+    return base, headcount, PayoutGrid(base, 100_000, plan, headcount=headcount)
+
+
+def full_recompute(base, headcount, state, plan=None):
+    """The grid an unpatched PayoutGrid computes from the edited table."""
+    rows = base.astype({col: object for col in ["Region", "Role", "Band", "KPI"]})
+    for i, values in state.get("edited_rows", {}).items():
+        for col, value in values.items():
+            rows.loc[i, col] = value
+    rows = rows.drop(index=state.get("deleted_rows", []))
+    rows = pd.concat([rows, pd.DataFrame(state.get("added_rows", []))], ignore_index=True)
+    return PayoutGrid(rows, 100_000, plan, headcount=headcount)
+
+
+@pytest.mark.parametrize("plan", [None, DEFAULT_PLAN])
+def test_deltas_match_full_recompute(plan):
+    base, headcount, grid = make_grid(plan)
+    states = [
+        {"edited_rows": {0: {"Achieved %": 120.0}, 5: {"Weight %": 50.0}}},
+        {"edited_rows": {0: {"Achieved %": 95.0}}, "deleted_rows": [3]},
+        {"edited_rows": {0: {"Achieved %": 95.0}}, "deleted_rows": [3], "added_rows": [{**NEW_ROW, "Region": "India"}]},
+        {},
+    ]
+    for state in states:
+        grid.apply_delta(state)
+        expected = full_recompute(base, headcount, state, plan)
+        assert grid.grand_total == pytest.approx(expected.grand_total)
+        assert grid.frame["Total Payout"].sum() == pytest.approx(expected.frame["Total Payout"].sum())
+        assert grid.cube.total() == pytest.approx(expected.grand_total)
+
+
+def test_headcount_edit_rescales_group():
+    base, headcount, grid = make_grid()
+    before = grid.group_totals
+    grid.apply_headcount_delta({"edited_rows": {0: {"Employees": 30}}})
+    after = grid.group_totals
+    group = headcount.index[0]
+    assert after.loc[group] == pytest.approx(3 * before.loc[group])
+    assert grid.grand_total == pytest.approx(after.sum())
+
+
+def test_added_row_of_new_group_takes_its_headcount():
+    _, _, grid = make_grid()
+    total = grid.grand_total
+    grid.apply_delta({"added_rows": [{**NEW_ROW, "Employees": 25}]})
+    added = grid.frame.iloc[-1]
+    assert added["Employees"] == 25
+    assert added["Total Payout"] == pytest.approx(1.05 * 0.4 * 100_000 * 25)
+    assert grid.grand_total == pytest.approx(total + added["Total Payout"])
@@ -0,0 +1,68 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from incentive_sim.cb_grid import PayoutGrid, build_grid
+from incentive_sim.formula import BULK_FORMULA, GRID_FORMULA, GRID_VARIABLES, FormulaError, PayoutFormula, compile_formula
+from incentive_sim.payout_engine import simulate_payouts
+from incentive_sim.slab_plan import DEFAULT_PLAN
+from incentive_sim.synthetic import make_workforce
+
+ACH = np.array([[70.0, 95.0], [120.0, 200.0]])
+WEIGHT = np.full((2, 2), 0.5)
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os')", "open('x')", "ach.real", "ach[0]", "'text'", "True", "lambda: 1", "x + 1",
+    "(a for a in ach)", "foo(ach)", "slab(ach, 2)", "min(ach)", "sqrt(ach, weight)", "exp(target, ach)",
+    "where(ach)", "clip(ach, 0)", "round(ach, weight)", "round(ach, 2.5)", "round(ach, 99)", "abs(*ach)",
+    "min(ach, key=1)", "ach +",
+])
+def test_rejects_unsafe_or_malformed_formulas(expression):
+    with pytest.raises(FormulaError):
+        PayoutFormula(expression)
+
+
+def test_evaluates_conditionals_and_chained_comparisons():
+    formula = PayoutFormula("min(ach / target, 1.5) * weight * slab(ach) if ach > 80 and not weight == 0 else 0")
+    result = formula.evaluate({"ach": ACH, "target": 100.0, "weight": WEIGHT}, slab=np.ones_like)
+    assert np.allclose(result, [[0.0, 0.475], [0.6, 0.75]])
+    assert np.array_equal(PayoutFormula("80 < ach <= 120").evaluate({"ach": ACH}), [[0, 1], [1, 0]])
+
+
+def test_round_keeps_integer_decimals():
+    result = PayoutFormula("round(ach / 3, 2)").evaluate({"ach": np.array([100.0])})
+    assert result[0] == pytest.approx(33.33)
+
+
+def test_functions_never_write_into_inputs():
+    ach = np.array([4.0, 9.0])
+    PayoutFormula("sqrt(ach) + exp(0) + abs(-ach)").evaluate({"ach": ach})
+    assert np.array_equal(ach, [4.0, 9.0])
+
+
+def test_numeric_failures_surface_as_formula_errors():
+    with pytest.raises(FormulaError):
+        PayoutFormula("9 ** 9 ** 9").evaluate({}, shape=(1,))
+    with pytest.raises(FormulaError):
+        PayoutFormula("slab(ach)").evaluate({"ach": ACH})
+
+
+def test_pickles_by_expression():
+    formula = PayoutFormula(BULK_FORMULA)
+    assert pickle.loads(pickle.dumps(formula)).expression == formula.expression
+    assert compile_formula("  ") is None
+
+
+def test_bulk_formula_matches_hand_coded_payouts():
+    df = make_workforce(3_000, seed=11)
+    assert np.allclose(simulate_payouts(df, formula=PayoutFormula(BULK_FORMULA)), simulate_payouts(df), equal_nan=True)
+
+
+def test_grid_formula_matches_hand_coded_grid():
+    base, headcount = build_grid(["India", "USA"], ["Field Sales"], ["B4"], {"Revenue": 40, "CSAT": 60})
+    base["Achieved %"] = np.linspace(70, 130, len(base))
+    formula = PayoutFormula(GRID_FORMULA, GRID_VARIABLES)
+    expected = PayoutGrid(base, 100_000, DEFAULT_PLAN, headcount=headcount).grand_total
+    assert PayoutGrid(base, 100_000, DEFAULT_PLAN, headcount=headcount, formula=formula).grand_total == pytest.approx(expected)
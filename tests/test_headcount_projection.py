@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from incentive_sim.cb_grid import PayoutGrid, build_grid
+from incentive_sim.headcount_projection import project_payouts
+from incentive_sim.slab_plan import DEFAULT_PLAN
+
+
+def make_grid(multiplier=1.2, plan=None):
+    base, headcount = build_grid(["India", "USA"], ["Field Sales"], ["B4"], {"Revenue": 40, "CSAT": 60},
+                                 employees=200, achieved=105.0, multiplier=multiplier)
+    return PayoutGrid(base, 100_000, plan, headcount=headcount)
+
+
+def test_without_plan_scalar_is_the_grid_budget():
+    grid = make_grid(multiplier=1.2)
+    projected = project_payouts(grid.frame, 100_000)
+    assert projected["Scalar Payout"].sum() == pytest.approx(grid.grand_total)
+    # A flat multiplier is linear in achievement, so spreading people has no convexity.
+    assert projected["Projected Payout"].sum() == pytest.approx(grid.grand_total, rel=1e-3)
+
+
+def test_slab_plan_scalar_matches_grid_priced_on_the_same_plan():
+    grid = make_grid(plan=DEFAULT_PLAN)
+    projected = project_payouts(grid.frame, 100_000, DEFAULT_PLAN, {"*": {"dist": "normal", "sd": 0.0}})
+    assert projected["Scalar Payout"].sum() == pytest.approx(grid.grand_total)
+    assert projected["Projected Payout"].sum() == pytest.approx(grid.grand_total)
+
+
+def test_observed_achievement_is_relative_to_the_cell_target():
+    base, headcount = build_grid(["India"], ["Field Sales"], ["B4"], {"Revenue": 100}, employees=3, target=200.0, achieved=200.0)
+    grid = PayoutGrid(base, 100_000, DEFAULT_PLAN, headcount=headcount)
+    achievements = pd.DataFrame({"Region": "India", "Role": "Field Sales", "Band": "B4", "KPI": "Revenue", "Achievement %": [200.0] * 3})
+    projected = project_payouts(grid.frame, 100_000, DEFAULT_PLAN, achievements=achievements)
+    assert projected["Projected Payout"].iloc[0] == pytest.approx(projected["Scalar Payout"].iloc[0])
+    assert projected["Scalar Payout"].iloc[0] == pytest.approx(grid.grand_total)
+
+
+def test_synthetic_spread_matches_monte_carlo_on_slabs():
+    grid = make_grid(plan=DEFAULT_PLAN)
+    projected = project_payouts(grid.frame, 100_000, DEFAULT_PLAN, {"*": {"dist": "normal", "sd": 10.0}})
+    rng = np.random.default_rng(3)
+    ach = rng.normal(105.0, 10.0, 400_000).clip(min=0)
+    expected = (ach / 100 * DEFAULT_PLAN.multipliers("*", ach)).mean() * 100_000 * 200 * len(projected) / 2
+    assert projected["Projected Payout"].sum() == pytest.approx(expected, rel=2e-3)
@@ -0,0 +1,58 @@
+import threading
+import tracemalloc
+
+from incentive_sim.instrument import StageTimer
+
+
+def test_overlapping_timers_share_one_trace():
+    first, second = StageTimer(trace_memory=True), StageTimer(trace_memory=True)
+    with first.stage("outer"):
+        with second.stage("other"):
+            pass
+        # Closing the other timer's stage must not stop tracing under this one.
+        assert tracemalloc.is_tracing()
+        data = [0] * 100_000
+    assert not tracemalloc.is_tracing()
+    # The other timer reset the shared high-water mark, so neither peak is reported.
+    assert first.records[0]["peak_mb"] is None and second.records[0]["peak_mb"] is None
+    del data
+
+
+def test_peak_is_reported_for_a_timer_tracing_alone():
+    timer = StageTimer(trace_memory=True)
+    with timer.stage("outer"):
+        with timer.stage("inner"):
+            data = [0] * 100_000
+    assert timer.records[0]["peak_mb"] > 0.5
+    assert timer.records[1]["peak_mb"] >= timer.records[0]["peak_mb"]
+    del data
+
+
+def test_timers_in_threads_leave_tracing_off():
+    started, release = threading.Barrier(3), threading.Event()
+
+    def run():
+        timer = StageTimer(trace_memory=True)
+        with timer.stage("job"):
+            started.wait()
+            release.wait()
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    started.wait()
+    assert tracemalloc.is_tracing()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_started_elsewhere_is_left_running():
+    tracemalloc.start()
+    try:
+        with StageTimer(trace_memory=True).stage("stage"):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
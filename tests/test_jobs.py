@@ -0,0 +1,82 @@
+import threading
+
+import numpy as np
+
+from incentive_sim.instrument import StageTimer
+from incentive_sim.jobs import CANCELLED, DONE, JobStore, attach_job
+
+
+def _wait(job, timeout=10):
+    for _ in range(int(timeout / 0.01)):
+        if job.is_finished:
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError(f"{job.name} did not finish")
+
+
+def _blocking(job, gate):
+    while not gate.wait(0.01):
+        job.check()
+    return "done"
+
+
+def test_submit_dedupes_by_key():
+    store = JobStore(max_workers=1)
+    first = _wait(store.submit(lambda job, x: x * 2, 21, key="k"))
+    assert first.state == DONE and first.result == 42
+    assert store.submit(lambda job, x: x * 3, 21, key="k") is first
+
+
+def test_cancel_keeps_running_while_another_session_watches():
+    store = JobStore(max_workers=1)
+    gate = threading.Event()
+    a, b = {}, {}
+    job = attach_job(a, "slot", _blocking, gate, key="shared", store=store)
+    assert attach_job(b, "slot", _blocking, gate, key="shared", store=store) is job
+    assert not job.release(a["_job_session"])
+    assert attach_job(a, "slot", _blocking, gate, key="shared", store=store) is job
+    job.release(a["_job_session"])
+    assert job.release(b["_job_session"])
+    assert _wait(job).state == CANCELLED
+
+
+def test_detached_session_does_not_resubmit_until_rejoin():
+    store = JobStore(max_workers=1)
+    gate = threading.Event()
+    a, b = {}, {}
+    job = attach_job(a, "slot", _blocking, gate, key="shared", store=store)
+    attach_job(b, "slot", _blocking, gate, key="shared", store=store)
+    job.release(a["_job_session"])
+    a.pop("slot")
+    a["slot_detached"] = "shared"
+    assert attach_job(a, "slot", _blocking, gate, key="shared", store=store) is None
+    assert attach_job(a, "slot", _blocking, gate, key="shared", store=store, rejoin=True) is job
+    gate.set()
+    assert _wait(job).result == "done"
+
+
+def test_prune_bounds_finished_results_by_bytes():
+    store = JobStore(max_workers=1, max_bytes=3 * 8_000)
+    jobs = [_wait(store.submit(lambda job, n: np.zeros(n), 1_000, key=i)) for i in range(6)]
+    kept = store.jobs()
+    assert sum(job.nbytes for job in kept) <= store.max_bytes
+    assert kept[0] is jobs[-1]
+    assert all(job.result is None for job in jobs if job not in kept)
+
+
+def test_prune_keeps_newest_even_when_over_budget():
+    store = JobStore(max_workers=1, max_bytes=1)
+    job = _wait(store.submit(lambda job: np.zeros(1_000), key="big"))
+    assert store.get(job.id) is job and job.result is not None
+
+
+def test_job_stage_records_on_its_timer():
+    def work(job):
+        with job.stage("simulate", rows=10):
+            return 1
+
+    timer = StageTimer(context={"job": "test"})
+    job = _wait(JobStore(max_workers=1).submit(work, timer=timer))
+    assert job.result == 1
+    assert [record["stage"] for record in timer.records] == ["simulate"]
+    assert _wait(JobStore(max_workers=1).submit(work)).result == 1
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from incentive_sim.cb_grid import PayoutGrid, build_grid
+from incentive_sim.instrument import StageTimer
+from incentive_sim.jobs import DONE, JobStore
+from incentive_sim.monte_carlo import _budget_risk_job, simulate_budget_risk
+
+
+def grid_frame():
+    base, headcount = build_grid(["India", "USA"], ["Field Sales"], ["B3", "B4"], {"Revenue": 60, "CSAT": 40})
+    return PayoutGrid(base, 100_000, headcount=headcount).frame
+
+
+def test_zero_spread_reproduces_the_grid_total():
+    frame = grid_frame()
+    risk = simulate_budget_risk(frame, 100_000, n_draws=1_000, distributions={"*": {"dist": "normal", "sd": 0.0}})
+    np.testing.assert_allclose(risk.totals, frame["Total Payout"].sum())
+
+
+def test_results_do_not_depend_on_workers():
+    frame = grid_frame()
+    one = simulate_budget_risk(frame, 100_000, n_draws=20_000, workers=1, chunk_size=3_000)
+    four = simulate_budget_risk(frame, 100_000, n_draws=20_000, workers=4, chunk_size=3_000)
+    np.testing.assert_array_equal(np.sort(one.totals), np.sort(four.totals))
+
+
+def test_background_job_times_its_stage_and_matches_a_direct_run():
+    frame = grid_frame()
+    timer = StageTimer(context={"job": "monte_carlo"})
+    job = JobStore(max_workers=1).submit(_budget_risk_job, frame, 100_000, n_draws=5_000, timer=timer)
+    for _ in range(1_000):
+        if job.is_finished:
+            break
+        job._cancel.wait(0.01)
+    assert job.state == DONE and job.progress == 1.0
+    direct = simulate_budget_risk(frame, 100_000, n_draws=5_000)
+    assert job.result.quantiles.to_dict() == pytest.approx(direct.quantiles.to_dict())
+    assert [(r["stage"], r["rows"]) for r in timer.records] == [("monte_carlo", 5_000)]
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from incentive_sim.payout_engine import get_multiplier, get_multipliers, simulate_payout, simulate_payouts
+from incentive_sim.synthetic import make_workforce
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_simulate_payouts_matches_scalar_reference(seed):
+    df = make_workforce(2_000, seed=seed, kpi_lists=True)
+    expected = df.apply(simulate_payout, axis=1)
+    got = simulate_payouts(df)
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-12)
+    assert got.index.equals(df.index)
+
+
+def test_categorical_kpis_match_lists():
+    lists = make_workforce(500, seed=3, kpi_lists=True)
+    compact = make_workforce(500, seed=3)
+    np.testing.assert_allclose(simulate_payouts(compact), simulate_payouts(lists), rtol=1e-12)
+
+
+def test_multipliers_match_scalar_at_slab_edges():
+    achievement = np.array([0.0, 89.99, 90.0, 99.99, 100.0, 109.99, 110.0, 250.0])
+    np.testing.assert_array_equal(get_multipliers(achievement), [get_multiplier(a) for a in achievement])
+
+
+def test_unlisted_kpis_are_ignored():
+    df = make_workforce(200, seed=4, kpi_lists=True)
+    expected = simulate_payouts(df)
+    # KPIs a row does not list must not leak into its payout, whatever they hold.
+    for column in [c for c in df.columns if c.endswith("_Achievement")]:
+        kpi = column[:-len("_Achievement")]
+        unused = ~df["KPIs"].map(lambda kpis: kpi in kpis)
+        df.loc[unused, column] = 500.0
+        df.loc[unused, f"{kpi}_Weight"] = 1.0
+    np.testing.assert_allclose(simulate_payouts(df), expected, rtol=1e-12)
@@ -0,0 +1,21 @@
+import pytest
+
+from incentive_sim.region_payouts import compute_region_payouts, region_slices
+from incentive_sim.synthetic import make_region_kpi_table
+
+
+def test_region_slices_select_each_regions_rows():
+    kpi_df = make_region_kpi_table(2_000, seed=1)
+    result, totals = compute_region_payouts(kpi_df, {region: 100_000 for region in kpi_df["Region"].unique()})
+    slices = region_slices(result)
+    assert list(slices) == list(totals.index)
+    for region, rows in slices.items():
+        block = result.iloc[rows]
+        assert (block["Region"] == region).all()
+        assert len(block) == (result["Region"] == region).sum()
+        assert block["Payout Component"].sum() == pytest.approx(totals.at[region, "Total Region Payout"])
+
+
+def test_region_slices_of_an_empty_result():
+    result, _ = compute_region_payouts(make_region_kpi_table(10).iloc[:0], {})
+    assert region_slices(result) == {}
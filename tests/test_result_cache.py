@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from incentive_sim.result_cache import ResultCache, _nbytes, fingerprint, state_cached
+
+
+def test_nbytes_counts_string_payloads():
+    names = pd.Series([f"employee-{i:06d}-" + "x" * 100 for i in range(1_000)], dtype=object)
+    frame = pd.DataFrame({"Employee": names, "Payout": np.zeros(len(names))})
+    # Object columns hold pointers; the strings themselves must count towards the byte bound.
+    assert _nbytes(names) > 100 * len(names)
+    assert _nbytes(frame) > _nbytes(names)
+    assert _nbytes(frame) >= frame.memory_usage(index=True, deep=True).sum()
+
+
+def test_byte_bound_evicts_frames_with_large_strings():
+    cache = ResultCache(max_bytes=200_000)
+    frame = pd.DataFrame({"Employee": pd.Series(["x" * 100] * 1_000, dtype=object)})
+    cache.put("a", frame)
+    cache.put("b", frame.copy())
+    assert cache.get("a") is None and cache.evictions >= 1
+    assert cache.bytes <= cache.max_bytes
+
+
+def test_fingerprint_hashes_byte_buffers_by_content():
+    data = b"Employee,Target Payout\nE1,100000\n"
+    assert fingerprint(data) == fingerprint(memoryview(bytearray(data)))
+    assert fingerprint(data) != fingerprint(data + b"E2,120000\n")
+
+
+def test_state_cached_recomputes_only_when_version_changes():
+    state, calls = {}, []
+    compute = lambda: calls.append(1) or len(calls)
+    assert state_cached(state, "k", 1, compute) == 1
+    assert state_cached(state, "k", 1, compute) == 1
+    assert state_cached(state, "k", 2, compute) == 2
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from incentive_sim.rollup import TOTAL_LABEL, RollupCube
+
+
+def leaf_frame():
+    rng = np.random.default_rng(0)
+    index = pd.MultiIndex.from_product([["India", "USA"], ["Sales", "Support"], ["B3", "B4"], ["Revenue", "CSAT"]])
+    frame = index.to_frame(index=False, name=["Region", "Role", "Band", "KPI"])
+    frame["Total Payout"] = rng.uniform(0, 1_000, len(frame))
+    return frame
+
+
+def test_pivot_matches_groupby_with_totals():
+    frame = leaf_frame()
+    cube = RollupCube.from_frame(frame)
+    table = cube.pivot("Region", "KPI", Role="Sales")
+    sales = frame[frame["Role"] == "Sales"]
+    expected = sales.pivot_table(index="Region", columns="KPI", values="Total Payout", aggfunc="sum", margins=True, margins_name=TOTAL_LABEL)
+    pd.testing.assert_frame_equal(table, expected.loc[table.index, table.columns], check_names=False)
+
+
+def test_add_patches_every_subtotal():
+    frame = leaf_frame()
+    cube = RollupCube.from_frame(frame)
+    cube.add(("India", "Sales", "B3", "Revenue"), 500.0)
+    assert cube.total() == pytest.approx(frame["Total Payout"].sum() + 500.0)
+    india_revenue = frame.query("Region == 'India' and KPI == 'Revenue'")["Total Payout"].sum()
+    assert cube.total(Region="India", KPI="Revenue") == pytest.approx(india_revenue + 500.0)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from incentive_sim.cb_grid import GROUP_KEYS, PayoutGrid, build_grid  # noqa: E402
+from incentive_sim.scenario_store import ScenarioStore  # noqa: E402
+
+PARAMS = {"scenario": "Expected", "target_incentive": 100_000}
+
+
+def make_grid(employees=10, achieved=100.0):
+    base, headcount = build_grid(["India", "USA"], ["Field Sales"], ["B3", "B4"], {"Revenue": 40, "CSAT": 60},
+                                 employees=employees, achieved=achieved)
+    return PayoutGrid(base, 100_000, headcount=headcount)
+
+
+def save(store, name, grid, params=PARAMS):
+    return store.save(name, "cb", grid.inputs, grid.frame, params, GROUP_KEYS, "Total Payout")
+
+
+def test_identical_run_is_stored_once(tmp_path):
+    store = ScenarioStore(tmp_path)
+    first = save(store, "first", make_grid())
+    again = save(store, "again", make_grid())
+    assert again.id == first.id and again.name == "first"
+    assert len(store.list()) == 1
+    assert store.find("cb", make_grid().inputs, PARAMS).id == first.id
+
+
+def test_headcount_is_part_of_the_run(tmp_path):
+    store = ScenarioStore(tmp_path)
+    save(store, "base", make_grid())
+    tripled = make_grid(employees=30)
+    assert store.find("cb", tripled.inputs, PARAMS) is None
+    saved = save(store, "tripled", tripled)
+    assert saved.total == pytest.approx(tripled.grand_total)
+    assert len(store.list()) == 2
+
+
+def test_diff_reports_changed_groups(tmp_path):
+    store = ScenarioStore(tmp_path)
+    before = save(store, "before", make_grid())
+    grid = make_grid()
+    grid.apply_delta({"edited_rows": {0: {"Achieved %": 120.0}}})
+    after = save(store, "after", grid)
+    changes = store.diff(before.id, after.id)
+    assert list(changes.index) == [("India", "Field Sales", "B3")]
+    assert changes["Change"].iloc[0] == pytest.approx(0.2 * 0.4 * 100_000 * 10)
+    assert changes["Change %"].iloc[0] == pytest.approx(changes["Change"].iloc[0] / changes["Before"].iloc[0] * 100)
+
+
+def test_list_and_delete(tmp_path):
+    store = ScenarioStore(tmp_path)
+    ids = [save(store, f"s{i}", make_grid(), {**PARAMS, "run": i}).id for i in range(5)]
+    listing = store.list()
+    assert list(listing.index) == ids[::-1]
+    assert np.allclose(listing["Total Payout"], make_grid().grand_total)
+    for scenario_id in ids:
+        store.delete(scenario_id)
+    assert store.list().empty
+    assert not any((tmp_path / "blobs").rglob("*.parquet"))
+
+
+def test_threads_writing_the_same_blob_do_not_collide(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    store = ScenarioStore(tmp_path)
+    frame = make_grid().frame
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        digests = set(pool.map(lambda _: store.write_blob(frame), range(16)))
+    (digest,) = digests
+    assert len(store.read_blob(digest)) == len(frame)
+    assert not list((tmp_path / "blobs").rglob("*.tmp"))
@@ -0,0 +1,14 @@
+import os
+
+import numpy as np
+
+from incentive_sim.slab_plan import DEFAULT_PLAN, load_plan
+
+PLANS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "plans")
+
+
+def test_standard_slabs_file_matches_the_built_in_default():
+    plan = load_plan(os.path.join(PLANS, "standard_slabs.yaml"))
+    achievement = np.linspace(0, 200, 2001)
+    for kpi in ["Revenue", "Pipeline", "CSAT"]:
+        np.testing.assert_array_equal(plan.multipliers(kpi, achievement), DEFAULT_PLAN.multipliers(kpi, achievement))
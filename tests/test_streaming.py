@@ -0,0 +1,32 @@
+import io
+
+import pandas as pd
+
+from incentive_sim.streaming import StreamedResult
+from incentive_sim.writers import ResultWriter
+
+
+def _streamed(tmp_path, chunks=5, rows=100):
+    path = tmp_path / "result.csv"
+    with ResultWriter(path) as writer:
+        result = StreamedResult(path, ["Employee", "Simulated Payout"], writer.offsets)
+        for i in range(chunks):
+            chunk = pd.DataFrame({"Employee": [f"E{n:05d}" for n in range(i * rows, (i + 1) * rows)], "Simulated Payout": 1000.0})
+            writer.write(chunk)
+            result.update(chunk["Simulated Payout"])
+    return path, result
+
+
+def test_parts_are_valid_csv_and_cover_every_row(tmp_path):
+    path, result = _streamed(tmp_path)
+    parts = result.parts(max_bytes=2 * (result.offsets[1][1] - result.offsets[0][1]))
+    assert len(parts) == 3
+    frames = [pd.read_csv(io.BytesIO(result.read_part(part))) for part in parts]
+    assert [len(frame) for frame in frames] == [stop - first for first, stop, _, _ in parts]
+    pd.testing.assert_frame_equal(pd.concat(frames, ignore_index=True), pd.read_csv(path))
+
+
+def test_small_result_is_one_part_holding_the_whole_file(tmp_path):
+    path, result = _streamed(tmp_path)
+    (part,) = result.parts()
+    assert result.read_part(part) == path.read_bytes()
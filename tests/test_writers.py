@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+
+from incentive_sim import writers
+from incentive_sim.writers import XLSX_MAX_ROWS, export_bytes, export_formats
+
+
+def test_xlsx_is_offered_only_below_the_sheet_limit(monkeypatch):
+    monkeypatch.setattr(writers, "EXPORT_FORMATS", ["csv", "xlsx", "parquet"])
+    assert export_formats(XLSX_MAX_ROWS - 1) == ["csv", "xlsx", "parquet"]
+    assert export_formats(XLSX_MAX_ROWS) == ["csv", "parquet"]
+
+
+def test_xlsx_over_the_limit_raises_before_writing():
+    frame = pd.DataFrame({"Payout": range(3)})
+    frame = frame.reindex(range(XLSX_MAX_ROWS))
+    with pytest.raises(ValueError, match="XLSX sheet limit"):
+        export_bytes(frame, "xlsx")
+
+
+@pytest.mark.parametrize("fmt", ["csv", "csv.gz"])
+def test_export_is_deterministic(fmt):
+    frame = pd.DataFrame({"Employee": ["a", "b"], "Payout": [1.5, 2.0]})
+    assert export_bytes(frame, fmt) == export_bytes(frame.copy(), fmt)